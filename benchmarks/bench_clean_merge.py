@@ -0,0 +1,99 @@
+# benchmarks/bench_clean_merge.py
+# Per-row cost of the clean_merge cleaning steps on a large synthetic frame,
+# compared with the former row-by-row implementations (kept below for reference).
+# Usage: PYTHONPATH=. python benchmarks/bench_clean_merge.py --rows 1000000
+
+import argparse
+import re
+import time
+import numpy as np
+import pandas as pd
+from src.clean_merge import clean_api_data, clean_string_series, create_class_attribute
+
+OUTCOMES = ['True ASDS', 'True RTLS', 'True Ocean', 'False ASDS', 'False Ocean', 'False RTLS',
+            'None ASDS', 'None None', None]
+VERSIONS = ['F9 v1.0[7]', 'F9 v1.1', 'F9 FT[a]', 'F9 B4♺', 'F9 B5 B1049.4[b]', 'F9 B5♺ B1060.2', None]
+BOOSTERS = ['Falcon 1', 'Falcon 9']
+
+
+# === Former row-by-row implementations === #
+
+def legacy_clean_string_series(Version):
+    return Version.apply(lambda x: re.sub(r'[^\w\s\.]', '', str(x)))
+
+
+def legacy_create_class_attribute(df):
+    bad_outcomes = {'False ASDS', 'False Ocean', 'False RTLS', 'None ASDS', 'None None'}
+    landing_class = []
+    for landing_outcome in df.outcome:
+        if landing_outcome in bad_outcomes:
+            landing_class.append(0)
+        else:
+            landing_class.append(1)
+    df['class'] = landing_class
+    return df
+
+
+def legacy_clean_api_data(df_api):
+    df_api = df_api.copy()
+    df_api['date'] = pd.to_datetime(df_api['date'])
+    df_api = df_api[df_api['BoosterVersion'] != 'Falcon 1'].copy()
+    df_api['payload_mass'] = df_api['payload_mass'].fillna(df_api['payload_mass'].mean())
+    return df_api
+
+
+# === Benchmark === #
+
+def synthetic_frame(rows, seed=0):
+    """Frame with the columns used by the cleaning steps, drawn at random."""
+    rng = np.random.default_rng(seed)
+    payload_mass = rng.uniform(0, 16000, rows)
+    payload_mass[rng.random(rows) < 0.1] = np.nan
+    dates = pd.Timestamp('2010-06-04') + pd.to_timedelta(rng.integers(0, 4600, rows), unit='D')
+    return pd.DataFrame({
+        'outcome': rng.choice(np.array(OUTCOMES, dtype=object), rows),
+        'Version Booster': pd.Series(rng.choice(np.array(VERSIONS, dtype=object), rows), dtype='str'),
+        'BoosterVersion': rng.choice(BOOSTERS, rows, p=[0.05, 0.95]),
+        'payload_mass': payload_mass,
+        'date': dates.strftime('%Y-%m-%d'),
+    })
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the clean_merge cleaning steps.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows of the synthetic frame (default: 1000000)')
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    steps = [
+        ('clean_string_series',
+         lambda: legacy_clean_string_series(df['Version Booster']),
+         lambda: clean_string_series(df['Version Booster'])),
+        ('create_class_attribute',
+         lambda: legacy_create_class_attribute(df[['outcome']].copy())['class'],
+         lambda: create_class_attribute(df[['outcome']].copy())['class']),
+        ('clean_api_data',
+         lambda: legacy_clean_api_data(df),
+         lambda: clean_api_data(df, remove_falcon_1=True)),
+    ]
+
+    print(f"{'step':<24}{'legacy ns/row':>15}{'vectorized ns/row':>20}{'speedup':>10}  identical")
+    for name, legacy, vectorized in steps:
+        expected, legacy_seconds = timed(legacy)
+        result, seconds = timed(vectorized)
+        if isinstance(expected, pd.DataFrame):
+            identical = expected.equals(result)
+        else:
+            identical = expected.astype(result.dtype).equals(result)
+        print(f"{name:<24}{legacy_seconds / args.rows * 1e9:>15.1f}{seconds / args.rows * 1e9:>20.1f}"
+              f"{legacy_seconds / seconds:>9.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
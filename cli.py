@@ -1,18 +1,32 @@
 # cli.py
+# Each subcommand imports its own stack (sklearn, dash, matplotlib, ...) only when it runs,
+# and only the invoked subcommand registers its arguments: 'cli.py --help' imports nothing heavy.
 import argparse
-import os
-from src.ml.train_model import train_and_save_model
-from src.eda.dashboard import launch_dashboard
+import sys
 
 
 def run_train(args):
+    from src.ml.train_model import train_and_save_model
     train_and_save_model(
         csv_file=args.data,
         model_name=args.model
     )
 
-def run_dashboard(_):
-    launch_dashboard()
+def run_dashboard(args):
+    if args.workers > 1:
+        from src.eda.serve import serve
+        serve(args.workers, host=args.host, port=args.port)
+    else:
+        from src.eda.dashboard import launch_dashboard
+        launch_dashboard(host=args.host, port=args.port)
+
+def run_etl(args):
+    from src import etl
+    etl.run(args)
+
+def run_sql_bench(args):
+    from src.eda import sql_bench
+    sql_bench.run(args)
 
 def run_eda(_):
     print("Running EDA: generating static visualizations...")
@@ -20,26 +34,51 @@ def run_eda(_):
     generate_all()
 
 
-def main():
-    parser = argparse.ArgumentParser(description="SpaceY CLI: Run ML, EDA, or Dashboard modules")
-    subparsers = parser.add_subparsers(dest="command", required=True)
+def add_train_arguments(parser):
+    parser.add_argument("--data", type=str, default="spacex_launch_dash.csv")
+    parser.add_argument("--model", type=str, default="logistic",
+                        choices=["logistic", "decision_tree", "svm", "random_forest"])
+
+def add_dashboard_arguments(parser):
+    from src.eda.serve import add_arguments
+    add_arguments(parser)
+
+def add_etl_arguments(parser):
+    from src.etl import add_arguments
+    add_arguments(parser)
 
-    # === train subcommand ===
-    train_parser = subparsers.add_parser("train", help="Train a machine learning model")
-    train_parser.add_argument("--data", type=str, default="spacex_launch_dash.csv")
-    train_parser.add_argument("--model", type=str, default="logistic",
-                              choices=["logistic", "decision_tree", "svm", "random_forest"])
-    train_parser.set_defaults(func=run_train)
+def add_sql_bench_arguments(parser):
+    from src.eda.sql_bench import add_arguments
+    add_arguments(parser)
 
-    # === dashboard subcommand ===
-    dash_parser = subparsers.add_parser("dashboard", help="Launch interactive Dash app")
-    dash_parser.set_defaults(func=run_dashboard)
 
-    # === eda subcommand ===
-    eda_parser = subparsers.add_parser("eda", help="Generate EDA plots to docs/ directory")
-    eda_parser.set_defaults(func=run_eda)
+# name -> (help, function registering the arguments or None, function running the subcommand)
+COMMANDS = {
+    "train": ("Train a machine learning model", add_train_arguments, run_train),
+    "dashboard": ("Launch interactive Dash app (--workers N: multi-process server)", add_dashboard_arguments,
+                  run_dashboard),
+    "eda": ("Generate EDA plots to docs/ directory", None, run_eda),
+    "etl": ("Run the ETL pipeline, skipping up-to-date stages", add_etl_arguments, run_etl),
+    "sql-bench": ("Profile the predefined SQL queries (plans and timings)", add_sql_bench_arguments, run_sql_bench),
+}
+
+
+def build_parser(argv):
+    """Parser of the CLI; only the subcommand named in argv registers its arguments (and imports its module)."""
+    parser = argparse.ArgumentParser(description="SpaceY CLI: Run ML, EDA, or Dashboard modules")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    invoked = next((arg for arg in argv if not arg.startswith("-")), None)
+    for name, (help, add_arguments, func) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help)
+        if add_arguments is not None and name == invoked:
+            add_arguments(subparser)
+        subparser.set_defaults(func=func)
+    return parser
+
 
-    args = parser.parse_args()
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser(argv).parse_args(argv)
     args.func(args)
 
 
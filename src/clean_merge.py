@@ -1,13 +1,50 @@
 # src/clean_merge.py
 
+import argparse
+import numpy as np
 import pandas as pd
 import os
 import re
 from src.utils.config_loader import load_config
+from src.utils.dtypes import optimize_dtypes
+from src.utils.artifacts import DEFAULT_CHUNK_SIZE, DEFAULT_FORMAT, ArtifactWriter, iter_artifact, read_artifact, write_artifact
+
+# characters removed from booster versions: anything but letters, digits, '_', whitespace and '.'
+NON_VERSION_CHARS = re.compile(r'[^\w\s\.]')
+# landing outcomes for which class is 0
+BAD_OUTCOMES = {'False ASDS', 'False Ocean', 'False RTLS', 'None ASDS', 'None None'}
+
+API_COLUMN_MAP = {
+    'BoosterVersion': 'booster' # Falcon 1, Falcon 9 etc.
+}
+WEB_COLUMN_MAP = {
+    'Flight No.': 'flight_number',
+    'Launch site': 'launch_site',
+    'Payload': 'payload',
+    'Payload Mass (kg)': 'payload_mass',
+    'Orbit': 'orbit',
+    'Customer': 'customer',
+    'Launch Outcome': 'launch_outcome',
+    'Version Booster': 'booster_version',
+    'Booster landing': 'booster_landing',
+    'Date': 'date',
+    'Time': 'time',
+}
+# columns kept from each source in the merged dataset
+API_MERGE_COLUMNS = ['flight_number', 'booster', 'payload_mass', 'outcome', 'date', 'longitude', 'latitude',
+                     'reused', 'reused_count', 'serial', 'landing_pad', 'gridfins', 'legs']
+WEB_MERGE_COLUMNS = ['flight_number', 'booster_version', 'orbit', 'launch_site', 'launch_outcome', 'customer']
+# source columns they come from (the only ones read in chunked mode)
+API_SOURCE_COLUMNS = ['flight_number', 'BoosterVersion', 'payload_mass', 'outcome', 'date', 'longitude', 'latitude',
+                      'reused', 'reused_count', 'serial', 'landing_pad', 'gridfins', 'legs']
+WEB_SOURCE_COLUMNS = ['Flight No.', 'Version Booster', 'Orbit', 'Launch site', 'Launch outcome', 'Customer']
 
 def load_data(api_path: str, web_path: str):
-    df_api = pd.read_csv(api_path)
-    df_web = pd.read_csv(web_path)
+    """
+    Loads the API and web datasets, whatever their format (see src/utils/artifacts.py).
+    """
+    df_api = read_artifact(api_path)
+    df_web = read_artifact(web_path)
     print(f"Loaded API data: {df_api.shape} rows")
     print(f"Loaded Web data: {df_web.shape} rows")
     return df_api, df_web
@@ -18,35 +55,52 @@ def extract_date(date_series):
 
 
 
-def clean_api_data(df_api, remove_falcon_1=True):
+def clean_api_data(df_api, remove_falcon_1=True, mean_payload=None):
     """"
     Input: pandas dataframe whose columns should be:
       rocket,payloads,launchpad,cores,flight_number,date_utc,date,BoosterVersion,
       longitude,latitude,launch_site,payload_mass,orbit,block,reused_count,serial,outcome,flights,
       gridfins,reused,legs,landing_pad
-    Output: same dataframe but with corrected types and removed falcon 1 flights by default
+    Output: new dataframe with corrected types and removed falcon 1 flights by default
+      (the input dataframe is left untouched)
+    mean_payload: value replacing missing payload masses; defaults to the mean over df_api
+      (chunked mode passes the mean over the whole dataset)
     """
     # Convert types
-    df_api['date'] = pd.to_datetime(df_api['date'])
+    df_api = df_api.assign(date=pd.to_datetime(df_api['date']))
     # df_api['outcome'] = df_api['outcome'].astype('Int64')  # Allows NaNs
 
     # Removes Falcon 1 boosters to keep only Falcon 9
     if remove_falcon_1:
-        df_api=df_api[df_api['BoosterVersion']!='Falcon 1']
+        df_api = df_api[df_api['BoosterVersion'] != 'Falcon 1']
         print("Falcon 1 entries have been removed.")
 
     # Calculate the mean of PayloadMass column to replace the np.nan values
-    mean_payload = df_api['payload_mass'].mean()
-    df_api['payload_mass'].fillna(mean_payload, inplace=True)
+    if mean_payload is None:
+        mean_payload = df_api['payload_mass'].mean()
+    df_api = df_api.assign(payload_mass=df_api['payload_mass'].fillna(mean_payload))
     print("Missing Payload Mass entries have been replaced by mean value.")
 
     return df_api
 
 
 def clean_string_series(Version):
-    """ cleans a pandas series of strings"""
-    Version = Version.apply(lambda x: re.sub(r'[^\w\s\.]', '', str(x)))
-    return Version
+    """
+    cleans a pandas series of strings: values are converted with str (e.g. NaN becomes 'nan')
+    and stripped of the characters matched by NON_VERSION_CHARS.
+    The pattern is applied once per distinct value, then broadcast back to the rows.
+    """
+    codes, uniques = pd.factorize(Version)
+    labels = pd.Series(uniques.astype(object), dtype=object).map(str).str.replace(NON_VERSION_CHARS, '', regex=True)
+    # code -1 (missing value) points to the trailing placeholder, filled below
+    cleaned = np.append(labels.to_numpy(dtype=object), None)[codes]
+    missing = codes == -1
+    if missing.any():
+        # str() of a missing value depends on its type (nan, None, <NA>...): only object
+        # series can mix several kinds, other dtypes have a single missing value
+        na_values = Version[missing] if Version.dtype == object else Version[missing].iloc[:1]
+        cleaned[missing] = na_values.map(str).str.replace(NON_VERSION_CHARS, '', regex=True).to_numpy(dtype=object)
+    return pd.Series(cleaned, index=Version.index, name=Version.name, dtype='str')
 
 
 def clean_web_data(df_web, remove_falcon_1=True):
@@ -59,11 +113,10 @@ def clean_web_data(df_web, remove_falcon_1=True):
     # Drop unnamed columns or footnotes if any
     df_web = df_web.loc[:, ~df_web.columns.str.contains('^Unnamed')]
 
-    # cleans the 'Version Booster' column
-    df_web['Version Booster'] = clean_string_series(df_web['Version Booster'])
-    df_web['Version Booster'] = df_web['Version Booster'].str.strip()
+    # cleans the 'Version Booster' column (assign returns a new frame, the input is left untouched)
+    df_web = df_web.assign(**{'Version Booster': clean_string_series(df_web['Version Booster']).str.strip()})
 
-    return df_web.copy()
+    return df_web
 
 
 def standardize_columns(df, column_map, lowercase=True):
@@ -74,12 +127,12 @@ def standardize_columns(df, column_map, lowercase=True):
     - column_map (dict): Dictionary mapping current column names to standardized ones.
     - lowercase (bool): Whether to lowercase all column names after renaming.
     Returns:
-    - pd.DataFrame: A copy of the DataFrame with standardized column names.
+    - pd.DataFrame: A new DataFrame (sharing the column data) with standardized column names.
     """
     df = df.rename(columns=column_map)
     if lowercase:
         df.columns = [col.lower().strip().replace(" ", "_") for col in df.columns]
-    return df.copy()
+    return df
 
 
 def create_class_attribute(df,verbose=False):
@@ -94,71 +147,177 @@ def create_class_attribute(df,verbose=False):
     if verbose:
         print("\nThe landing outcomes are listed as follows:\n", df.outcome.value_counts())
     
-    # define a set of bad outcomes (for which class is 0)
-    bad_outcomes={'False ASDS', 'False Ocean', 'False RTLS', 'None ASDS', 'None None'}
-
-    landing_class = []
-    # loop to assign
-    for landing_outcome in df.outcome:
-        if landing_outcome in bad_outcomes:
-            landing_class.append(0)
-        else:
-            landing_class.append(1)
-    df['class']=landing_class
+    # class is 0 for the outcomes in BAD_OUTCOMES, 1 otherwise (missing outcomes included)
+    df['class'] = (~df['outcome'].isin(BAD_OUTCOMES)).astype('int64')
 
     return df
 
 
 
+def prepare_api_data(df_api, mean_payload=None):
+    """Cleaned API rows with standardized names, restricted to API_MERGE_COLUMNS."""
+    df_api_clean = clean_api_data(df_api, remove_falcon_1=False, mean_payload=mean_payload)
+    return standardize_columns(df_api_clean, API_COLUMN_MAP)[API_MERGE_COLUMNS]
+
+
+def prepare_web_data(df_web):
+    """Cleaned web rows with standardized names, restricted to WEB_MERGE_COLUMNS."""
+    return standardize_columns(clean_web_data(df_web), WEB_COLUMN_MAP)[WEB_MERGE_COLUMNS]
+
+
+def merge_launches(df_api, df_web):
+    """Inner join of the prepared API and web rows on flight_number."""
+    return pd.merge(
+        df_api,
+        df_web,
+        on='flight_number',
+        how='inner' # keeps only the launches that are present in both frames
+    )
+
+
+# === Chunked mode: datasets larger than memory === #
+
+def payload_mean(api_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """First pass over the API dataset: mean payload mass of all launches."""
+    total, count = 0.0, 0
+    for chunk in iter_artifact(api_path, columns=['payload_mass'], chunk_size=chunk_size):
+        total += chunk['payload_mass'].sum()
+        count += chunk['payload_mass'].count()
+    return total / count if count else float('nan')
+
+
+def iter_sorted_chunks(chunks, key, name):
+    """
+    Pass through chunks of a dataset, checking that they are sorted by key (as the sort-merge join needs).
+    Raises ValueError otherwise.
+    """
+    last = None
+    for chunk in chunks:
+        keys = chunk[key]
+        if not keys.is_monotonic_increasing or (last is not None and len(keys) and keys.iloc[0] < last):
+            raise ValueError(f"{name} is not sorted by {key}: sort it before merging in chunked mode")
+        if len(keys):
+            last = keys.iloc[-1]
+        yield chunk
+
+
+def _read_chunk(buffer, chunks):
+    """Append the next chunk to buffer. Returns: (buffer, True if there are no more chunks)"""
+    chunk = next(chunks, None)
+    if chunk is None:
+        return buffer, True
+    return pd.concat([buffer, chunk], ignore_index=True), False
+
+
+def sort_merge_join(left_chunks, right_chunks, key, merge=merge_launches):
+    """
+    Inner join of two datasets given as chunks sorted by key, holding about one chunk of each in memory.
+    Rows whose key is below the last key read on every side that still has chunks are complete
+    (no row with that key can come later): they are joined and yielded, the others wait for the next chunks.
+    Returns: generator over joined dataframes, in key order
+    """
+    left_chunks, right_chunks = iter(left_chunks), iter(right_chunks)
+    left, right = next(left_chunks, None), next(right_chunks, None)
+    if left is None or right is None:
+        return
+    left_done = right_done = False
+    while True:
+        while not left_done and left.empty:
+            left, left_done = _read_chunk(left, left_chunks)
+        while not right_done and right.empty:
+            right, right_done = _read_chunk(right, right_chunks)
+        if (left_done and left.empty) or (right_done and right.empty):
+            return
+        if left_done and right_done:
+            yield merge(left, right)
+            return
+        bound = min(side[key].iloc[-1] for side, done in ((left, left_done), (right, right_done)) if not done)
+        left_ready, right_ready = left[key] < bound, right[key] < bound
+        if left_ready.any() and right_ready.any():
+            yield merge(left[left_ready], right[right_ready])
+        left, right = left[~left_ready], right[~right_ready]
+        # the sides still holding the bound key may have more rows with it: read their next chunk
+        if not left_done and left[key].iloc[-1] == bound:
+            left, left_done = _read_chunk(left, left_chunks)
+        if not right_done and right[key].iloc[-1] == bound:
+            right, right_done = _read_chunk(right, right_chunks)
+
+
+def merge_chunked(api_path, web_path, output_path, fmt=DEFAULT_FORMAT, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Clean and merge the two datasets chunk by chunk, appending the merged rows to the output,
+    so that peak memory depends on chunk_size rather than on the size of the datasets.
+    Both datasets must be sorted by flight number.
+    Returns: ArtifactWriter (path and number of rows of the output)
+    """
+    mean_payload = payload_mean(api_path, chunk_size)
+    api_chunks = (
+        prepare_api_data(chunk, mean_payload=mean_payload)
+        for chunk in iter_artifact(api_path, columns=API_SOURCE_COLUMNS, chunk_size=chunk_size)
+    )
+    web_chunks = (
+        prepare_web_data(chunk)
+        for chunk in iter_artifact(web_path, columns=WEB_SOURCE_COLUMNS, chunk_size=chunk_size)
+    )
+    with ArtifactWriter(output_path, fmt=fmt) as writer:
+        for merged in sort_merge_join(
+            iter_sorted_chunks(api_chunks, 'flight_number', api_path),
+            iter_sorted_chunks(web_chunks, 'flight_number', web_path),
+            'flight_number',
+        ):
+            writer.write(create_class_attribute(merged))
+        if not writer.rows:
+            writer.write(create_class_attribute(merge_launches(
+                pd.DataFrame(columns=API_MERGE_COLUMNS), pd.DataFrame(columns=WEB_MERGE_COLUMNS))))
+    return writer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Clean the API and web datasets and merge them on flight number.")
+    parser.add_argument('--chunked', action='store_true',
+                        help='Stream both datasets (sorted by flight number) chunk by chunk instead of loading them in memory')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows per chunk in chunked mode (default: {DEFAULT_CHUNK_SIZE})')
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     config = load_config()
     api_csv = os.path.join(config["output_dir"], config["api_output_file"])
     web_csv = os.path.join(config["output_dir"], config["web_output_file"])
     output_csv = os.path.join(config["output_dir"], config["launch_dash_file"])
+    fmt = config.get("artifact_format", DEFAULT_FORMAT)
+
+    if args.chunked:
+        writer = merge_chunked(api_csv, web_csv, output_csv, fmt=fmt, chunk_size=args.chunk_size)
+        print(f"\nData successfully cleaned and merged in chunks of {args.chunk_size} rows.")
+        print(f"\nData successfully saved to {writer.path} ({writer.rows} rows) for EDA & dashboard use.")
+        return
 
     # Loading the two tables
     df_api, df_web = load_data(api_csv, web_csv)
 
-    # cleaning df_api & renaming columns
-    df_api_clean = clean_api_data(df_api,remove_falcon_1=False)
-    api_column_map = {
-        'BoosterVersion': 'booster' # Falcon 1, Falcon 9 etc.
-    }
-    df_api_std = standardize_columns(df_api_clean, api_column_map)
-
-    # cleaning df_web & renaming columns
-    df_web_clean = clean_web_data(df_web)
-    web_column_map = {
-        'Flight No.': 'flight_number',
-        'Launch site': 'launch_site',
-        'Payload': 'payload',
-        'Payload Mass (kg)': 'payload_mass',
-        'Orbit': 'orbit',
-        'Customer': 'customer',
-        'Launch Outcome': 'launch_outcome',
-        'Version Booster': 'booster_version',
-        'Booster landing': 'booster_landing',
-        'Date': 'date',
-        'Time': 'time',
-    }
-    df_web_std = standardize_columns(df_web_clean, web_column_map)
-
-    # Merging along flight_number & keep only the desired columns
-    merged_df = pd.merge(
-        df_api_std[['flight_number', 'booster', 'payload_mass', 'outcome', 'date', 'longitude', 'latitude', 'reused', 'reused_count', 'serial', 'landing_pad', 'gridfins', 'legs']],
-        df_web_std[['flight_number', 'booster_version', 'orbit', 'launch_site', 'launch_outcome', 'customer']],
-        on='flight_number',
-        how='inner' # keeps only the launches that are present in both frames
-    )
+    # cleaning both tables, renaming columns & keeping only the desired columns
+    df_api_std = prepare_api_data(df_api)
+    df_web_std = prepare_web_data(df_web)
+
+    # Merging along flight_number
+    merged_df = merge_launches(df_api_std, df_web_std)
 
     # create 'class' attribute for eda and logistic regression (later)
     df_final = create_class_attribute(merged_df,verbose=True)
 
+    # compact dtypes (categoricals, booleans, float32), kept by the parquet/feather formats;
+    # integers keep their width in the artifact (they are narrowed in memory by read_compact)
+    print("\nMemory usage of the merged dataframe:")
+    df_final = optimize_dtypes(df_final, report=True, narrow_integers=False)
+
     # Save merged & cleaned version for dashboard use
-    df_final.to_csv(output_csv, index=False)
+    output_path = write_artifact(df_final, output_csv, fmt=fmt)
     print(f"\nData successfully cleaned and merged.")
     print(f"\nNew dataframe has {df_final.shape[0]} rows and {df_final.shape[1]} columns.")
-    print(f"\nData successfully saved to {output_csv} for EDA & dashboard use.")
+    print(f"\nData successfully saved to {output_path} for EDA & dashboard use.")
     print("\nOverview (first ten rows):\n", df_final.head(10))
 
 
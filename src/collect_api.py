@@ -1,170 +1,404 @@
 # src/collect_api.py
 
-import requests
+import argparse
+import json
 import pandas as pd
 import os
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from src.utils.config_loader import load_config
+from src.utils.artifacts import DEFAULT_FORMAT, artifact_exists, read_artifact, write_artifact
+from src.utils.http_cache import configure_cache_from_config, get_cache
+from src.utils.instrumentation import LOG_LEVELS, configure_logging, get_logger, metrics
+from src.utils.json_stream import iter_json_array
+
+logger = get_logger('collect_api')
 
 API_LIMIT_DATE = '2022-12-31'# replace by '2021-11-13' for consistency with static web url
+API_BASE_URL = 'https://api.spacexdata.com/v4'
+MAX_WORKERS = 8 # maximum number of concurrent requests sent to the SpaceX API
+QUERY_PAGE_SIZE = 100 # number of launches returned per page by the /launches/query endpoint
+LOOKBACK_FLIGHTS = 5 # in incremental mode, already collected launches (up to the high-water mark) refetched for late corrections
+
+# Columns of the API dataset, in the order written to csv by main()
+API_COLUMNS = [
+    'rocket', 'payloads', 'launchpad', 'flight_number', 'date_utc', 'date',
+    'BoosterVersion', 'longitude', 'latitude', 'launch_site', 'payload_mass', 'orbit',
+    'block', 'reused_count', 'serial', 'outcome', 'flights', 'gridfins', 'reused', 'legs', 'landing_pad',
+]
+
+# Nullable dtypes of the core attributes (missing when the core is unknown)
+API_DTYPES = {
+    'block': 'Int64', 'reused_count': 'Int64', 'flights': 'Int64',
+    'gridfins': 'boolean', 'reused': 'boolean', 'legs': 'boolean',
+}
+
+LAUNCH_FIELDS = ['rocket', 'payloads', 'launchpad', 'cores', 'flight_number', 'date_utc']
+
+def iter_launches(launches, limit_date=API_LIMIT_DATE):
+    """
+    Project and filter launch objects one at a time.
+    Launches with several cores (falcon rockets with 2 extra boosters) or several payloads
+    are skipped, as well as launches after limit_date.
+    Args:
+      launches: iterable of launch dicts, as returned by the /launches endpoint
+      limit_date: 'YYYY-MM-DD', last (UTC) launch date to keep
+    Returns: generator over dicts with keys LAUNCH_FIELDS + ['date'], where 'cores' and
+      'payloads' hold the single core / payload of the launch
+    """
+    year, month, day = limit_date.split('-')
+    last_date = datetime.date(int(year), int(month), int(day))
+    for launch in launches:
+        if len(launch['cores']) != 1 or len(launch['payloads']) != 1:
+            continue
+        # date_utc is an ISO 8601 UTC timestamp: its first 10 characters are the launch date
+        date = datetime.date.fromisoformat(launch['date_utc'][:10])
+        if date > last_date:
+            continue
+        row = {field: launch[field] for field in LAUNCH_FIELDS}
+        row['cores'] = row['cores'][0]
+        row['payloads'] = row['payloads'][0]
+        row['date'] = date
+        yield row
 
 def fetch_spacex_launch_data(api_url: str) -> pd.DataFrame:
     """
     Fetch SpaceX launch data from API and return as a DataFrame.
+    The response is parsed incrementally: only the retained launches, projected on
+    the fields we use, are ever held in memory.
     Returns: pandas dataframe, containing at least the 6 columns:
     'rocket', 'payloads', 'launchpad', 'cores', 'flight_number', 'date_utc'
     """
-    print(f"Fetching data from {api_url}")
-    response = requests.get(api_url)
-    response.raise_for_status()
-    launches = response.json()
-    data = pd.json_normalize(launches)
-
-    # Keeping only the features we want and the flight number, and date_utc.
-    data = data[['rocket', 'payloads', 'launchpad', 'cores', 'flight_number', 'date_utc']]
+    logger.info(f"Fetching data from {api_url}")
+    with metrics.timer('fetch_launches'):
+        response = get_cache().get(api_url)
+        response.raise_for_status()
+        launches = iter_json_array(response.iter_content(chunk_size=64 * 1024))
+        data = pd.DataFrame.from_records(iter_launches(launches), columns=LAUNCH_FIELDS + ['date'])
+    metrics.incr('launches_retrieved', len(data))
+    logger.info(f"Retrieved {len(data)} launches.")
+    return data
 
-    # Remove rows with multiple cores because those are falcon rockets with 2 extra rocket boosters and rows that have multiple payloads in a single rocket.
-    data = data[data['cores'].map(len)==1]
-    data = data[data['payloads'].map(len)==1]
+def fetch_resource(resource, resource_id):
+    """
+    Fetch a single SpaceX API resource (e.g. a rocket or a launchpad) by its id,
+    through the shared HTTP response cache.
+    Args:
+      resource: name of the API resource, e.g. 'rockets', 'launchpads', 'payloads' or 'cores'
+      resource_id: id of the object to fetch
+    Returns: the JSON response as a dict
+    """
+    response = get_cache().get(f"{API_BASE_URL}/{resource}/{resource_id}")
+    response.raise_for_status()
+    return response.json()
 
-    # Since payloads and cores are lists of size 1 we will also extract the single value in the list and replace the feature.
-    data['cores'] = data['cores'].map(lambda x : x[0])
-    data['payloads'] = data['payloads'].map(lambda x : x[0])
+def fetch_unique_resources(resource, ids, max_workers=MAX_WORKERS):
+    """
+    Fetch every distinct id of a SpaceX API resource exactly once, concurrently.
+    Empty ids are ignored and duplicates are only requested once, so the number of
+    round trips is the number of distinct ids rather than the number of launches.
+    Args:
+      resource: name of the API resource, e.g. 'rockets', 'launchpads', 'payloads' or 'cores'
+      ids: iterable of ids (typically a column of the launch dataframe)
+      max_workers: maximum number of requests in flight at the same time
+    Returns: dict mapping each distinct id to its JSON response
+    """
+    unique_ids = list(dict.fromkeys(resource_id for resource_id in ids if pd.notna(resource_id) and resource_id))
+    if not unique_ids:
+        return {}
+    with metrics.timer(f'fetch_{resource}'), ThreadPoolExecutor(max_workers=min(max_workers, len(unique_ids))) as executor:
+        responses = executor.map(lambda resource_id: fetch_resource(resource, resource_id), unique_ids)
+        resources = dict(zip(unique_ids, responses))
+    metrics.incr(f'{resource}_fetched', len(resources))
+    logger.info(f"Fetched {len(resources)} distinct {resource}")
+    return resources
 
-    # We also want to convert the date_utc to a datetime datatype and then extracting the date leaving the time
-    data['date'] = pd.to_datetime(data['date_utc']).dt.date
-    
-    # Using the date we will restrict the dates of the launches
-    year, month, day = API_LIMIT_DATE.split('-')
-    data = data[data['date'] <= datetime.date(int(year), int(month), int(day))] # initially 2020-11-13 for consistency with static web_url
-    print(f"Retrieved {len(data)} launches.")
-    return data
+def lookup_resources(ids, resource, fields):
+    """
+    Fetch the distinct ids of a SpaceX API resource once and broadcast the selected fields back to the rows.
+    Args:
+      ids: pandas Series of ids (missing ids give missing values)
+      resource: name of the API resource, e.g. 'rockets', 'launchpads', 'payloads' or 'cores'
+      fields: dict mapping the fields of the API response to the names of the output columns
+    Returns: pandas dataframe with one column per field, indexed like ids
+    """
+    resources = fetch_unique_resources(resource, ids)
+    table = pd.DataFrame.from_dict(resources, orient='index').reindex(columns=list(fields)).rename(columns=fields)
+    return table.reindex(ids.to_numpy()).set_axis(ids.index)
 
 def get_booster_version(data):
     """
-    Takes the dataset and uses the rocket column to call the API and append the data to the BoosterVersion list
+    Takes the dataset and uses the rocket column to call the API and get the booster versions
+    Returns: dataframe with the 'BoosterVersion' column, indexed like data
     """
-    BoosterVersion=[]
-    for rocket_id in data['rocket']:
-        if rocket_id:
-            response = requests.get(f"https://api.spacexdata.com/v4/rockets/{rocket_id}").json()
-            BoosterVersion.append(response.get('name'))
-    print(f"Obtained successfully {len(BoosterVersion)} Booster Versions")
-    return BoosterVersion
+    booster_version = lookup_resources(data['rocket'], 'rockets', {'name': 'BoosterVersion'})
+    logger.info(f"Obtained successfully {booster_version['BoosterVersion'].count()} Booster Versions")
+    return booster_version
 
 def get_launch_site_info(data):
     """
-    Retrieve launch site data from API and append to lists
+    Retrieve launch site data from API
+    Returns: dataframe with the 'longitude', 'latitude' and 'launch_site' columns, indexed like data
     """
-    longitude_list = []
-    latitude_list = []
-    launch_site_list = []
-    for launchpad_id in data['launchpad']:
-        if launchpad_id:
-            response = requests.get(f"https://api.spacexdata.com/v4/launchpads/{launchpad_id}").json()
-            longitude_list.append(response['longitude'])
-            latitude_list.append(response['latitude'])
-            launch_site_list.append(response['name'])
-    print(f"Obtained successfully {len(launch_site_list)} Launch Sites")
-    return longitude_list, latitude_list, launch_site_list
+    launch_sites = lookup_resources(data['launchpad'], 'launchpads',
+                                    {'longitude': 'longitude', 'latitude': 'latitude', 'name': 'launch_site'})
+    logger.info(f"Obtained successfully {launch_sites['launch_site'].count()} Launch Sites")
+    return launch_sites
 
 def get_payload_data(data):
     """
-    Takes the dataset and uses the payloads column to call the API and append the data to the lists
+    Takes the dataset and uses the payloads column to call the API and get payload mass and orbit
+    Returns: dataframe with the 'payload_mass' and 'orbit' columns, indexed like data
     """
-    payload_mass_list = []
-    orbit_list = []
-    for payload in data['payloads']:
-        if payload:
-            response = requests.get(f"https://api.spacexdata.com/v4/payloads/{payload}").json()
-            payload_mass_list.append(response.get('mass_kg'))
-            orbit_list.append(response.get('orbit'))
-    print(f"Obtained successfully {len(payload_mass_list)} Payloads")
-    return payload_mass_list, orbit_list
+    payloads = lookup_resources(data['payloads'], 'payloads', {'mass_kg': 'payload_mass', 'orbit': 'orbit'})
+    logger.info(f"Obtained successfully {len(payloads)} Payloads")
+    return payloads
+
+def extract_core_columns(cores):
+    """
+    Expand a series of core dicts (the single core of each launch) into columns, in one pass.
+    Returns: dataframe with the 'core' (id), 'outcome', 'flights', 'gridfins', 'reused', 'legs'
+      and 'landing_pad' columns, indexed like cores
+    """
+    core_fields = ['core', 'flight', 'gridfins', 'legs', 'reused', 'landing_success', 'landing_type', 'landpad']
+    expanded = pd.DataFrame(cores.tolist(), index=cores.index, columns=core_fields)
+    # same text as f"{landing_success} {landing_type}", e.g. 'True ASDS' or 'None None'
+    landing_success = expanded['landing_success'].map({True: 'True', False: 'False'}).fillna('None')
+    landing_type = expanded['landing_type'].astype(object).where(expanded['landing_type'].notna(), 'None')
+    return pd.DataFrame({
+        'core': expanded['core'],
+        'outcome': landing_success.astype(str) + ' ' + landing_type.astype(str),
+        'flights': expanded['flight'],
+        'gridfins': expanded['gridfins'],
+        'reused': expanded['reused'],
+        'legs': expanded['legs'],
+        'landing_pad': expanded['landpad'],
+    }, index=cores.index)
 
 def get_core_data(data):
     """
-    Takes the dataset and uses the cores column to call the API and append the data to the lists
-    """
-    block_list = []
-    reused_count_list = []
-    serial_list = []
-    outcome_list = []
-    flights_list = []
-    gridfins_list = []
-    reused_list = []
-    legs_list = []
-    landing_pad_list = []
-    for core in data['cores']:
-        if core['core'] is not None:
-            response = requests.get(f"https://api.spacexdata.com/v4/cores/{core['core']}").json()
-            block_list.append(response['block'])
-            reused_count_list.append(response['reuse_count'])
-            serial_list.append(response['serial'])
-        else:
-            block_list.append(None)
-            reused_count_list.append(None)
-            serial_list.append(None)
-        outcome_list.append(
-            f"{core['landing_success']} {core['landing_type']}"
-        )
-        flights_list.append(core['flight'])
-        gridfins_list.append(core['gridfins'])
-        reused_list.append(core['reused'])
-        legs_list.append(core['legs'])
-        landing_pad_list.append(core['landpad'])
-    print(f"Obtained successfully {len(block_list)} Cores")
-    return (
-        block_list,
-        reused_count_list,
-        serial_list,
-        outcome_list,
-        flights_list,
-        gridfins_list,
-        reused_list,
-        legs_list,
-        landing_pad_list,
-    )
-
-def save_to_csv(df: pd.DataFrame, output_path: str):
-    """
-    Save DataFrame to CSV.
-    """
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
-    print(f"Saved data to {output_path}")
+    Takes the dataset and uses the cores column to call the API (for block, reuse count and serial)
+    and to extract the landing outcome, flights, gridfins, reused, legs and landing pad of each core
+    Returns: dataframe with one column per core attribute, indexed like data
+    """
+    core_columns = extract_core_columns(data['cores'])
+    core_info = lookup_resources(core_columns['core'], 'cores', {'block': 'block', 'reuse_count': 'reused_count', 'serial': 'serial'})
+    cores = core_info.join(core_columns.drop(columns='core'))
+    logger.info(f"Obtained successfully {len(cores)} Cores")
+    return cores
+
+def build_launch_query(page, page_size=QUERY_PAGE_SIZE, min_flight_number=None):
+    """
+    Build the body of a POST request to the /launches/query endpoint.
+    The server filters out multi-core/multi-payload launches and launches after API_LIMIT_DATE,
+    keeps only the fields we use and joins rocket, launchpad, payloads and cores (populate).
+    Args:
+      page: page number (starting at 1)
+      page_size: number of launches per page
+      min_flight_number: if given, only launches with flight_number >= min_flight_number are returned
+    Returns: dict, to be sent as JSON
+    """
+    year, month, day = API_LIMIT_DATE.split('-')
+    end_date = datetime.date(int(year), int(month), int(day)) + datetime.timedelta(days=1)
+    query = {
+        "date_utc": {"$lt": f"{end_date.isoformat()}T00:00:00.000Z"},
+        "cores": {"$size": 1},
+        "payloads": {"$size": 1},
+    }
+    if min_flight_number is not None:
+        query["flight_number"] = {"$gte": int(min_flight_number)}
+    return {
+        "query": query,
+        "options": {
+            "select": "rocket payloads launchpad cores flight_number date_utc",
+            "populate": [
+                {"path": "rocket", "select": "name"},
+                {"path": "launchpad", "select": "name longitude latitude"},
+                {"path": "payloads", "select": "mass_kg orbit"},
+                {"path": "cores.core", "select": "block reuse_count serial"},
+            ],
+            "sort": {"flight_number": "asc"},
+            "pagination": True,
+            "page": page,
+            "limit": page_size,
+        },
+    }
+
+def fetch_spacex_launch_data_query(query_url: str, page_size: int = QUERY_PAGE_SIZE, min_flight_number=None) -> list:
+    """
+    Fetch SpaceX launches with their rocket, launchpad, payload and core already joined,
+    using paginated POST requests to the /launches/query endpoint.
+    Returns: list of populated launch documents
+    """
+    logger.info(f"Querying data from {query_url}")
+    launches = []
+    page = 1
+    while page:
+        with metrics.timer('fetch_query_page'):
+            response = get_cache().post(query_url, json=build_launch_query(page, page_size, min_flight_number))
+            response.raise_for_status()
+            result = response.json()
+        launches.extend(result['docs'])
+        logger.debug(f"Page {page}: {len(result['docs'])} launches")
+        page = result['nextPage'] if result.get('hasNextPage') else None
+    metrics.incr('launches_retrieved', len(launches))
+    logger.info(f"Retrieved {len(launches)} launches.")
+    return launches
+
+def flatten_populated_launch(launch):
+    """
+    Turn a populated launch document from /launches/query into a row of the API dataset.
+    Returns: dict whose keys are API_COLUMNS
+    """
+    rocket = launch['rocket'] or {}
+    launchpad = launch['launchpad'] or {}
+    payload = launch['payloads'][0]
+    core = launch['cores'][0]
+    core_info = core['core'] or {}
+    return {
+        'rocket': rocket.get('id'),
+        'payloads': payload.get('id'),
+        'launchpad': launchpad.get('id'),
+        'flight_number': launch['flight_number'],
+        'date_utc': launch['date_utc'],
+        'date': pd.to_datetime(launch['date_utc']).date(),
+        'BoosterVersion': rocket.get('name'),
+        'longitude': launchpad.get('longitude'),
+        'latitude': launchpad.get('latitude'),
+        'launch_site': launchpad.get('name'),
+        'payload_mass': payload.get('mass_kg'),
+        'orbit': payload.get('orbit'),
+        'block': core_info.get('block'),
+        'reused_count': core_info.get('reuse_count'),
+        'serial': core_info.get('serial'),
+        'outcome': f"{core['landing_success']} {core['landing_type']}",
+        'flights': core['flight'],
+        'gridfins': core['gridfins'],
+        'reused': core['reused'],
+        'legs': core['legs'],
+        'landing_pad': core['landpad'],
+    }
+
+def collect_launches_query(query_url: str, page_size: int = QUERY_PAGE_SIZE, min_flight_number=None) -> pd.DataFrame:
+    """
+    Build the API dataset from the /launches/query endpoint.
+    Args:
+      min_flight_number: if given, only launches with flight_number >= min_flight_number are collected
+    Returns: pandas dataframe with the same columns as the one written by main() in rest mode
+    """
+    launches = fetch_spacex_launch_data_query(query_url, page_size, min_flight_number)
+    rows = [
+        flatten_populated_launch(launch) for launch in launches
+        if len(launch['cores']) == 1 and len(launch['payloads']) == 1
+    ]
+    return pd.DataFrame(rows, columns=API_COLUMNS).astype(API_DTYPES)
+
+def collect_launches_rest(api_url: str, min_flight_number=None) -> pd.DataFrame:
+    """
+    Build the API dataset from /launches, enriching each launch with the
+    rockets, launchpads, payloads and cores endpoints.
+    Args:
+      min_flight_number: if given, only launches with flight_number >= min_flight_number are enriched
+    Returns: pandas dataframe whose columns are API_COLUMNS
+    """
+    data = fetch_spacex_launch_data(api_url)
+    if min_flight_number is not None:
+        data = data[data['flight_number'] >= min_flight_number]
+        logger.info(f"Enriching {len(data)} launches from flight number {min_flight_number} on.")
+    data = data.join([
+        get_booster_version(data),
+        get_launch_site_info(data),
+        get_payload_data(data),
+        get_core_data(data),
+    ])
+    return data[API_COLUMNS].astype(API_DTYPES).reset_index(drop=True)
+
+def load_high_water_mark(state_path: str):
+    """
+    Read the highest flight_number and date_utc already collected.
+    Returns: dict with keys 'flight_number' and 'date_utc', or None if nothing was collected yet
+    """
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, "r") as f:
+        return json.load(f)
+
+def save_high_water_mark(df: pd.DataFrame, state_path: str):
+    """
+    Record the highest flight_number and date_utc of the collected dataset.
+    """
+    state = {
+        'flight_number': int(df['flight_number'].max()),
+        'date_utc': str(df['date_utc'].max()),
+    }
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=2)
+    logger.info(f"High-water mark: flight number {state['flight_number']} ({state['date_utc']})")
+    return state
+
+def upsert_launches(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Insert new launches into an existing API dataset, replacing the rows
+    of launches that were collected again (same flight_number).
+    Returns: pandas dataframe sorted by flight_number
+    """
+    kept = existing[~existing['flight_number'].isin(new['flight_number'])]
+    frames = [frame for frame in (kept, new) if not frame.empty]
+    if not frames:
+        return new
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values('flight_number', kind='stable').reset_index(drop=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Collect SpaceX launch data from the SpaceX API.")
+    parser.add_argument('--mode', type=str, default='rest', choices=['rest', 'query'],
+                        help="'rest': fetch /launches then enrich each launch (default), "
+                             "'query': paginated /launches/query with server-side populate")
+    parser.add_argument('--page-size', type=int, default=QUERY_PAGE_SIZE,
+                        help=f'Launches per page in query mode (default: {QUERY_PAGE_SIZE})')
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay responses from the HTTP cache only, without network access')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only collect launches above the recorded high-water mark and upsert them into the existing csv')
+    parser.add_argument('--lookback', type=int, default=None,
+                        help=f'Number of already collected launches, up to the high-water mark, to collect again in incremental mode (default: {LOOKBACK_FLIGHTS})')
+    parser.add_argument('--log-level', type=str, default='INFO', choices=LOG_LEVELS,
+                        help='Logging level (default: INFO)')
+    parser.add_argument('--json-summary', action='store_true',
+                        help='Print the final summary of counters and timers as JSON')
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    configure_logging(args.log_level)
     # loads configuration file to get api url and csv path
     config = load_config()
-    api_url = config["spacex_api_url"]
+    cache = configure_cache_from_config(config, offline=args.offline)
     output_path = os.path.join(config["output_dir"], config["api_output_file"])
-    
-    data = fetch_spacex_launch_data(api_url)
-    data['BoosterVersion'] = get_booster_version(data)
-    longitude_list, latitude_list, launch_site_list = get_launch_site_info(data)
-    payload_mass_list, orbit_list = get_payload_data(data)
-    block_list, reused_count_list, serial_list, outcome_list, flights_list, gridfins_list, reused_list, legs_list, landing_pad_list = get_core_data(data)
-    data['longitude'] = longitude_list
-    data['latitude'] = latitude_list
-    data['launch_site'] = launch_site_list
-    data['payload_mass'] = payload_mass_list
-    data['orbit'] = orbit_list
-    data['block'] = block_list
-    data['reused_count'] = reused_count_list
-    data['serial'] = serial_list
-    data['outcome'] = outcome_list
-    data['flights'] = flights_list
-    data['gridfins'] = gridfins_list
-    data['reused'] = reused_list
-    data['legs'] = legs_list
-    data['landing_pad'] = landing_pad_list
-
-    #delete cores column
-    data = data.drop('cores', axis=1)
-
-    df = pd.DataFrame(data)
-    save_to_csv(df, output_path)
+    state_path = os.path.join(config["output_dir"], config["api_state_file"])
+
+    # in incremental mode, only launches from (high-water mark - lookback) on are collected
+    min_flight_number = None
+    high_water_mark = load_high_water_mark(state_path) if args.incremental and artifact_exists(output_path) else None
+    if high_water_mark is not None:
+        lookback = args.lookback if args.lookback is not None else config.get("incremental_lookback_flights", LOOKBACK_FLIGHTS)
+        min_flight_number = high_water_mark['flight_number'] - lookback + 1
+        logger.info(f"Incremental collection from flight number {min_flight_number} "
+              f"(high-water mark: {high_water_mark['flight_number']}, {high_water_mark['date_utc']})")
+
+    if args.mode == 'query':
+        df = collect_launches_query(config["spacex_api_query_url"], page_size=args.page_size, min_flight_number=min_flight_number)
+    else:
+        df = collect_launches_rest(config["spacex_api_url"], min_flight_number=min_flight_number)
+
+    if high_water_mark is not None:
+        df = upsert_launches(read_artifact(output_path).astype(API_DTYPES), df)
+    write_artifact(df, output_path, fmt=config.get("artifact_format", DEFAULT_FORMAT))
+    save_high_water_mark(df, state_path)
+    metrics.incr('http_cache_hits', cache.hits)
+    metrics.incr('http_requests', cache.misses)
+    print(metrics.summary(as_json=args.json_summary))
 
 if __name__ == "__main__":
     main()
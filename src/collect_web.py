@@ -1,22 +1,35 @@
 # src/collect_web.py
 
-import requests
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
+from lxml import etree
 import pandas as pd
 import unicodedata
 import os
 from src.utils.config_loader import load_config
+from src.utils.artifacts import DEFAULT_FORMAT, write_artifact
+from src.utils.http_cache import configure_cache_from_config, get_cache
+from src.utils.instrumentation import LOG_LEVELS, Metrics, configure_logging, get_logger
+from src.utils.instrumentation import metrics as default_metrics
+from src.utils.table_store import TableStore, table_fingerprint
+
+logger = get_logger('collect_web')
+
+PARSER_BACKENDS = ('lxml', 'bs4') # 'bs4' is the original BeautifulSoup parser, kept for comparison
+WEB_SCHEMA = {'Flight No.': 'Int64'} # the other scraped columns are kept as text
 
 
 def fetch_html(url: str) -> str:
     """
-    Fetch raw HTML content from a given URL.
+    Fetch raw HTML content from a given URL (through the shared HTTP response cache).
     """
-    print(f"Fetching HTML from {url}")
+    logger.info(f"Fetching HTML from {url}")
     
-    # Use requests.get() method with the provided url
+    # Use the cache's get() method with the provided url
     ## and assign the output to a 'response' variable
-    response = requests.get(url)
+    response = get_cache().get(url)
     response.raise_for_status()
 
     # returns raw html (text) of the response object
@@ -46,7 +59,15 @@ def extract_booster_version(table_cells):
     Returns:
         A string containing the booster version.
     """
-    booster_versions = [version for i, version in enumerate(table_cells.strings) if i % 2 == 0]
+    return booster_version_from_strings(table_cells.strings)
+
+
+def booster_version_from_strings(strings):
+    """
+    Build the booster version from the strings of its table cell
+    (every other string, dropping the last one).
+    """
+    booster_versions = [version for i, version in enumerate(strings) if i % 2 == 0]
     return ''.join(booster_versions[:-1])
 
 
@@ -73,7 +94,15 @@ def extract_mass(table_cells):
     Returns:
         A string containing the mass.
     """
-    mass_str = unicodedata.normalize("NFKD", table_cells.text).strip()
+    return mass_from_text(table_cells.text)
+
+
+def mass_from_text(text):
+    """
+    Extract mass from the text of a table cell, e.g. '525 kg (1,157 lb)' -> '525 kg'.
+    Empty cells give '0 kg'.
+    """
+    mass_str = unicodedata.normalize("NFKD", text).strip()
     if mass_str:
         mass_str = mass_str[: mass_str.find("kg") + 2]
     else:
@@ -126,11 +155,10 @@ def extract_table_headers(html, table_index=2, return_soup=False):
     return (column_names, soup) if return_soup else column_names
 
 
-def parse_soup_table(column_names, soup):
+def init_launch_dict(column_names):
     """
-    Parse a BeautifulSoup object and extract launch data from its tables.
+    Create the dictionary of launch records, with one empty list per extracted column.
     """
-    
     # create empty dictionary with keys from the extracted column names in the previous task
     launch_dict= dict.fromkeys(column_names)
 
@@ -151,133 +179,417 @@ def parse_soup_table(column_names, soup):
     launch_dict['Booster landing']=[]
     launch_dict['Date']=[]
     launch_dict['Time']=[]
+    return launch_dict
 
-    # NEXT: Fill up the `launch_dict` with launch records extracted from table rows
+
+def log_last_record(launch_dict):
+    """
+    Log the record just appended to launch_dict (DEBUG level only).
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        record = {key: values[-1] for key, values in launch_dict.items() if values}
+        logger.debug("Flight no. %s: %s", record.pop('Flight No.'), record)
+
+
+def parse_soup_rows(table, launch_dict, metrics):
+    """
+    Extract the launch records of one BeautifulSoup table and append them to launch_dict.
+    Returns: number of records extracted
+    """
     extracted_row = 0
-    print(f"Found {len(soup.find_all('table'))} tables on the page")
-    #Extract each table 
-    for table_number,table in enumerate(soup.find_all('table')):
-        print(f"Extracting table {table_number} out of {len(soup.find_all('table'))}")
-        # get table row 
-        for rows in table.find_all("tr"):
-
-            # Default state
-            flag = False
-            flight_number = None  # Initialize to avoid 'undefined'
-
-            #check to see if first table heading is as number corresponding to launch a number 
-            if rows.th:
-                if rows.th.string:
-                    flight_number=rows.th.string.strip()
-                    flag=flight_number.isdigit()
-                else:
-                    flag=False
+    skipped_row = 0
+    # rows without a flight number are only counted as skipped in the launch ('wikitable') tables,
+    # the tables visited by the lxml backend, so that both backends report the same counts
+    launch_table = 'wikitable' in (table.get('class') or [])
+    # get table row 
+    for rows in table.find_all("tr"):
+
+        # Default state
+        flag = False
+        flight_number = None  # Initialize to avoid 'undefined'
+
+        #check to see if first table heading is as number corresponding to launch a number 
+        if rows.th:
+            if rows.th.string:
+                flight_number=rows.th.string.strip()
+                flag=flight_number.isdigit()
             else:
                 flag=False
-            #get table element 
-            row=rows.find_all('td')
-            #if it is number save cells in a dictonary 
-            if flag:
-                extracted_row += 1
-                # Flight Number value
-                launch_dict['Flight No.'].append(flight_number)
-                print('Flight no.: ', flight_number)
-            
-                # Date value
-                datatimelist = extract_date_time(row[0])
-                date = datatimelist[0].strip(',')
-                launch_dict['Date'].append(date)
-                print(date)
-            
-                # Time value
-                time = datatimelist[1]
-                launch_dict['Time'].append(date)
-                #print(time)
-              
-                # Booster version
-                bv=extract_booster_version(row[1])
-                if not(bv):
-                    bv=row[1].a.string
-                launch_dict['Version Booster'].append(bv)
-                print(bv)
-            
-                # Launch Site
-                launch_site = row[2].a.string
-                launch_dict['Launch site'].append(launch_site)
-                print(launch_site)
-            
-                # Payload
-                payload = row[3].a.string
-                launch_dict['Payload'].append(payload)
-                print(payload)
-            
-                # Payload Mass
-                payload_mass = extract_mass(row[4])
-                launch_dict['Payload mass'].append(payload_mass)
-                print(payload_mass)
-            
-                # Orbit
-                orbit = row[5].a.string
-                launch_dict['Orbit'].append(orbit)
-                print(orbit)
-            
-                # Customer
-                customer = row[6].a.string if row[6].a else row[6].string
-                launch_dict['Customer'].append(customer)
-                print(customer)
-            
-                # Launch outcome
-                launch_outcome = list(row[7].strings)[0]
-                launch_outcome = launch_outcome.replace('\n', '')
-                launch_dict['Launch outcome'].append(launch_outcome)
-                print(launch_outcome)
-            
-                # Booster landing
-                booster_landing = extract_landing_status(row[8])
-                booster_landing = booster_landing.replace('\n', '')
-                launch_dict['Booster landing'].append(booster_landing)
-                print(booster_landing)
-
-            print(f"{extracted_row} records extracted\n") if flag else None
+        else:
+            flag=False
+        #if it is not a number, the row is skipped
+        if not flag:
+            skipped_row += launch_table
+            continue
+        #get table element 
+        row=rows.find_all('td')
+        extracted_row += 1
+        # Flight Number value
+        launch_dict['Flight No.'].append(flight_number)
+    
+        # Date value
+        datatimelist = extract_date_time(row[0])
+        date = datatimelist[0].strip(',')
+        launch_dict['Date'].append(date)
+    
+        # Time value
+        time = datatimelist[1]
+        launch_dict['Time'].append(date)
+      
+        # Booster version
+        bv=extract_booster_version(row[1])
+        if not(bv):
+            bv=row[1].a.string
+        launch_dict['Version Booster'].append(bv)
+    
+        # Launch Site
+        launch_site = row[2].a.string
+        launch_dict['Launch site'].append(launch_site)
+    
+        # Payload
+        payload = row[3].a.string
+        launch_dict['Payload'].append(payload)
+    
+        # Payload Mass
+        payload_mass = extract_mass(row[4])
+        launch_dict['Payload mass'].append(payload_mass)
+    
+        # Orbit
+        orbit = row[5].a.string
+        launch_dict['Orbit'].append(orbit)
+    
+        # Customer
+        customer = row[6].a.string if row[6].a else row[6].string
+        launch_dict['Customer'].append(customer)
+    
+        # Launch outcome
+        launch_outcome = list(row[7].strings)[0]
+        launch_outcome = launch_outcome.replace('\n', '')
+        launch_dict['Launch outcome'].append(launch_outcome)
+    
+        # Booster landing
+        booster_landing = extract_landing_status(row[8])
+        booster_landing = booster_landing.replace('\n', '')
+        launch_dict['Booster landing'].append(booster_landing)
+
+        log_last_record(launch_dict)
+
+    metrics.incr('rows_parsed', extracted_row)
+    metrics.incr('rows_skipped', skipped_row)
+    return extracted_row
+
+
+def extract_table_records(table, launch_dict, parse_rows, table_html, backend, metrics, store=None):
+    """
+    Append the launch records of one table to launch_dict.
+    With a TableStore, the table is fingerprinted first: if its content did not change since
+    it was last parsed, the stored records are reused instead of parsing the table again.
+    Args:
+      table: table element (BeautifulSoup Tag or lxml element)
+      launch_dict: dictionary of launch records to extend
+      parse_rows: row parser of the backend, parse_rows(table, launch_dict, metrics)
+      table_html: function returning the HTML of the table (only called with a store)
+      backend: name of the parser backend
+      metrics: Metrics collecting row counts and parse times
+      store: optional TableStore
+    Returns: number of records appended
+    """
+    if store is None:
+        with metrics.timer('parse_table'):
+            extracted_row = parse_rows(table, launch_dict, metrics)
+        metrics.incr('tables_parsed')
+        return extracted_row
+
+    with metrics.timer('fingerprint_table'):
+        fingerprint = table_fingerprint(table_html(), backend)
+    records = store.get(fingerprint)
+    if records is None:
+        records = {key: [] for key, values in launch_dict.items() if isinstance(values, list)}
+        with metrics.timer('parse_table'):
+            parse_rows(table, records, metrics)
+        metrics.incr('tables_parsed')
+        store.put(fingerprint, records)
+    else:
+        metrics.incr('tables_reused')
+        metrics.incr('rows_reused', len(records['Flight No.']))
+    for key, values in records.items():
+        launch_dict[key].extend(values)
+    return len(records['Flight No.'])
+
+
+def parse_soup_table(column_names, soup, metrics=None, store=None):
+    """
+    Parse a BeautifulSoup object and extract launch data from its tables.
+    Tables already in the (optional) TableStore are not parsed again.
+    """
+    metrics = metrics if metrics is not None else default_metrics
+    launch_dict = init_launch_dict(column_names)
+
+    # NEXT: Fill up the `launch_dict` with launch records extracted from table rows
+    tables = soup.find_all('table')
+    logger.info(f"Found {len(tables)} tables on the page")
+    #Extract each table 
+    for table_number,table in enumerate(tables):
+        extracted_row = extract_table_records(
+            table, launch_dict, parse_soup_rows, lambda: str(table), 'bs4', metrics, store
+        )
+        logger.debug(f"Table {table_number} out of {len(tables)}: {extracted_row} records extracted")
 
     return launch_dict
 
 
-def save_scraped_data_to_csv(scraped_data: pd.DataFrame, output_file_path: str) -> None:
+# === lxml backend === #
+# Same extraction as parse_soup_table, but each page is parsed once with lxml,
+# only the 'wikitable' launch tables are visited, and cells are read with compiled XPath selectors.
+# Like BeautifulSoup's .strings, text inside <style>/<script> tags and comments is ignored.
+
+ALL_TABLES = etree.XPath('//table')
+LAUNCH_TABLES = etree.XPath("//table[contains(concat(' ', normalize-space(@class), ' '), ' wikitable ')]")
+TABLE_ROWS = etree.XPath('.//tr')
+TABLE_HEADERS = etree.XPath('.//th')
+ROW_CELLS = etree.XPath('.//td')
+FIRST_HEADER = etree.XPath('(.//th)[1]')
+FIRST_LINK = etree.XPath('(.//a)[1]')
+CELL_STRINGS = etree.XPath(
+    './/text()[not(parent::style or parent::script or parent::template or parent::rt or parent::rp)]',
+    smart_strings=False,
+)
+DIRECT_STRINGS = etree.XPath('text()', smart_strings=False)
+HTML_PARSER = etree.HTMLParser(encoding='utf-8')
+
+
+def parse_html_lxml(html):
+    """
+    Parse raw HTML into an lxml tree.
+    """
+    return etree.fromstring(html.encode('utf-8'), HTML_PARSER)
+
+
+def element_string(element):
+    """
+    lxml equivalent of BeautifulSoup's Tag.string: the single string inside an element
+    (looking through elements that have a single child), or None.
+    """
+    nodes = [element.text] if element.text else []
+    for child in element:
+        nodes.append(child)
+        if child.tail:
+            nodes.append(child.tail)
+    if len(nodes) != 1:
+        return None
+    node = nodes[0]
+    if isinstance(node, str):
+        return node
+    if not isinstance(node.tag, str):
+        return node.text # comment
+    return element_string(node)
+
+
+def first_link_string(cell):
+    """
+    String of the first link of a table cell (None if the cell has no link).
+    """
+    links = FIRST_LINK(cell)
+    return element_string(links[0]) if links else None
+
+
+def extract_table_headers_lxml(tree, table_index=2):
+    """
+    Extract cleaned column names from a specific HTML table of an lxml tree
+    (same result as extract_table_headers).
+    """
+    selected_table = ALL_TABLES(tree)[table_index]
+    column_names = []
+    for header in TABLE_HEADERS(selected_table):
+        # direct strings of the header, i.e. without the content of <br>, <a>, <sup> or any other tag
+        column_name = ' '.join(string.strip() for string in DIRECT_STRINGS(header)).strip()
+        if column_name and not column_name.isdigit():
+            column_names.append(column_name)
+    return column_names
+
+
+def parse_lxml_table(table, launch_dict, metrics):
+    """
+    Extract the launch records of one lxml table and append them to launch_dict.
+    Returns: number of records extracted
+    """
+    extracted_row = 0
+    skipped_row = 0
+    for rows in TABLE_ROWS(table):
+        # launch rows start with a header cell holding the flight number
+        headers = FIRST_HEADER(rows)
+        flight_number = element_string(headers[0]) if headers else None
+        if flight_number is None or not flight_number.strip().isdigit():
+            skipped_row += 1
+            continue
+        flight_number = flight_number.strip()
+        row = ROW_CELLS(rows)
+        extracted_row += 1
+        launch_dict['Flight No.'].append(flight_number)
+
+        datatimelist = [string.strip() for string in CELL_STRINGS(row[0])][:2]
+        date = datatimelist[0].strip(',')
+        launch_dict['Date'].append(date)
+        launch_dict['Time'].append(date)
+
+        bv = booster_version_from_strings(CELL_STRINGS(row[1]))
+        if not(bv):
+            bv = first_link_string(row[1])
+        launch_dict['Version Booster'].append(bv)
+
+        launch_dict['Launch site'].append(first_link_string(row[2]))
+        launch_dict['Payload'].append(first_link_string(row[3]))
+        launch_dict['Payload mass'].append(mass_from_text(''.join(CELL_STRINGS(row[4]))))
+        launch_dict['Orbit'].append(first_link_string(row[5]))
+
+        customer = first_link_string(row[6]) if FIRST_LINK(row[6]) else element_string(row[6])
+        launch_dict['Customer'].append(customer)
+
+        launch_dict['Launch outcome'].append(CELL_STRINGS(row[7])[0].replace('\n', ''))
+        launch_dict['Booster landing'].append(CELL_STRINGS(row[8])[0].replace('\n', ''))
+        log_last_record(launch_dict)
+
+    metrics.incr('rows_parsed', extracted_row)
+    metrics.incr('rows_skipped', skipped_row)
+    return extracted_row
+
+
+def parse_lxml_tables(column_names, tree, metrics=None, store=None):
+    """
+    Parse an lxml tree and extract launch data from its launch tables.
+    Tables already in the (optional) TableStore are not parsed again.
+    """
+    metrics = metrics if metrics is not None else default_metrics
+    launch_dict = init_launch_dict(column_names)
+    tables = LAUNCH_TABLES(tree)
+    logger.info(f"Found {len(tables)} launch tables on the page")
+    for table_number, table in enumerate(tables):
+        extracted_row = extract_table_records(
+            table, launch_dict, parse_lxml_table, lambda: etree.tostring(table, with_tail=False), 'lxml', metrics, store
+        )
+        logger.debug(f"Table {table_number} out of {len(tables)}: {extracted_row} records extracted")
+    return launch_dict
+
+
+def parse_page(html, backend='lxml', metrics=None, store=None):
+    """
+    Extract the launch records of a Wikipedia launch list page.
+    Args:
+      html: raw HTML of the page
+      backend: 'lxml' (default) or 'bs4' (original BeautifulSoup parser)
+      metrics: Metrics collecting row counts and parse times (default: metrics of the process)
+      store: optional TableStore holding the records of already parsed tables
+    Returns: launch_dict, mapping column names to lists of values
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unsupported parser backend: {backend}")
+    metrics = metrics if metrics is not None else default_metrics
+    with metrics.timer('parse_page'):
+        if backend == 'lxml':
+            tree = parse_html_lxml(html)
+            launch_dict = parse_lxml_tables(extract_table_headers_lxml(tree), tree, metrics, store)
+        else:
+            column_names, soup = extract_table_headers(html, return_soup=True)
+            launch_dict = parse_soup_table(column_names, soup, metrics, store)
+    metrics.incr('pages_parsed')
+    return launch_dict
+
+
+def launch_dict_to_frame(launch_dict):
+    """
+    Turn a launch_dict into a dataframe (columns may have different lengths).
     """
-    Save scraped data to a CSV file.
+    return pd.DataFrame({ key:pd.Series(value) for key, value in launch_dict.items() })
 
+
+def parse_page_to_frame(html, backend='lxml', store_dir=None):
+    """
+    Parse one page into a dataframe of launch records (run in the worker processes of scrape_pages).
+    Returns: (dataframe, snapshot of the metrics recorded while parsing)
+    """
+    metrics = Metrics()
+    store = TableStore(store_dir) if store_dir else None
+    df = launch_dict_to_frame(parse_page(html, backend=backend, metrics=metrics, store=store))
+    return df, metrics.snapshot()
+
+
+def timed_fetch_html(url):
+    """
+    fetch_html, timed under 'fetch_page'.
+    """
+    with default_metrics.timer('fetch_page'):
+        return fetch_html(url)
+
+
+def scrape_pages(urls, backend='lxml', max_workers=None, store_dir=None):
+    """
+    Fetch several launch list pages concurrently and parse them in a process pool.
+    Each page is handed to the parsing pool as soon as it is downloaded, so the total time
+    approaches the one of the slowest page rather than the sum over all pages.
     Args:
-        scraped_data: The scraped data as a pandas DataFrame.
-        output_file_path: The path to save the CSV file to.
+      urls: list of page URLs
+      backend: HTML parser backend, see parse_page
+      max_workers: number of parsing processes (default: one per page, at most one per CPU)
+      store_dir: directory of the TableStore (None: every table is parsed)
+    Returns: dataframe of launch records, pages concatenated in the order of urls (empty if urls is)
+    """
+    if not urls:
+        return pd.DataFrame()
+    if max_workers is None:
+        max_workers = min(len(urls), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=len(urls)) as fetch_pool, ProcessPoolExecutor(max_workers=max_workers) as parse_pool:
+        fetches = {fetch_pool.submit(timed_fetch_html, url): page for page, url in enumerate(urls)}
+        parses = {}
+        for fetch in as_completed(fetches):
+            parses[fetches[fetch]] = parse_pool.submit(parse_page_to_frame, fetch.result(), backend, store_dir)
+        frames = []
+        for page in range(len(urls)):
+            df, worker_metrics = parses[page].result()
+            default_metrics.merge(worker_metrics)
+            frames.append(df)
+    return pd.concat(frames, axis=0, ignore_index=True)
+
+
+def get_web_urls(config):
+    """
+    List of the launch list pages to scrape: 'web_urls' in config.json
+    (configs without it fall back to 'web_url_1' and 'web_url_2').
     """
-    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
-    scraped_data.to_csv(output_file_path, index=False)
+    if "web_urls" in config:
+        return config["web_urls"]
+    return [config["web_url_1"], config["web_url_2"]]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Falcon 9 launch tables from Wikipedia.")
+    parser.add_argument('--offline', action='store_true',
+                        help='Replay pages from the HTTP cache only, without network access')
+    parser.add_argument('--parser', type=str, default=None, choices=PARSER_BACKENDS,
+                        help="HTML parser backend (default: 'web_parser' in config.json, else 'lxml')")
+    parser.add_argument('--log-level', type=str, default='INFO', choices=LOG_LEVELS,
+                        help='Logging level; DEBUG logs every extracted record (default: INFO)')
+    parser.add_argument('--json-summary', action='store_true',
+                        help='Print the final summary of counters and timers as JSON')
+    parser.add_argument('--no-table-store', action='store_true',
+                        help='Parse every table, ignoring the records stored for unchanged tables')
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+    configure_logging(args.log_level)
     config = load_config()
-    #static_url =config["spacex_wikipedia_url_static"]
-    url_1=config["web_url_1"]
-    url_2=config["web_url_2"]
+    cache = configure_cache_from_config(config, offline=args.offline)
+    backend = args.parser or config.get("web_parser", "lxml")
     output_file_path = os.path.join(config["output_dir"], config["web_output_file"])
 
-    #html_static = fetch_html(static_url)
-    html_1 = fetch_html(url_1)
-    html_2 = fetch_html(url_2)
-    column_names_1, soup_1 = extract_table_headers(html_1, return_soup=True)
-    column_names_2, soup_2 = extract_table_headers(html_2, return_soup=True)
-    print(column_names_1,column_names_2)
-
-    launch_dict_1 = parse_soup_table(column_names_1, soup_1)
-    df_1= pd.DataFrame({ key:pd.Series(value) for key, value in launch_dict_1.items() })
-
-    launch_dict_2 = parse_soup_table(column_names_2, soup_2)
-    df_2= pd.DataFrame({ key:pd.Series(value) for key, value in launch_dict_2.items() })
+    store_dir = None if args.no_table_store else config.get("table_store_dir", "data/.table_store")
 
-    df = pd.concat([df_1, df_2], axis=0, ignore_index=True)
-    save_scraped_data_to_csv(df, output_file_path)
-    print(f"Scraped data saved to {output_file_path}")
+    df = scrape_pages(get_web_urls(config), backend=backend, store_dir=store_dir)
+    write_artifact(df, output_file_path, fmt=config.get("artifact_format", DEFAULT_FORMAT), schema=WEB_SCHEMA)
+    default_metrics.incr('http_cache_hits', cache.hits)
+    default_metrics.incr('http_requests', cache.misses)
+    print(default_metrics.summary(as_json=args.json_summary))
 
 if __name__ == "__main__":
     main()
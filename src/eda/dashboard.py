@@ -1,25 +1,227 @@
 # Import required libraries
+import hashlib
+import inspect
+import math
+import numpy as np
 import pandas as pd
 import dash
 from dash import html, dcc
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+import plotly
 import plotly.express as px
 from pathlib import Path
+from flask import jsonify
+from src.eda.figure_cache import FigureCache, figure_cache_from_config
+from src.eda.launch_cube import ALL_SITES, LaunchCube
+from src.eda.live_reload import DEFAULT_RELOAD_SECONDS, LiveCube, artifact_source
+from src.utils.config_loader import load_config
+from src.utils.dtypes import read_compact
+from src.utils.instrumentation import get_logger
 
+DASHBOARD_COLUMNS = ['launch_site', 'payload_mass', 'class', 'booster_version']
+DATA_PATH = Path('data/spacex_launch_dash.csv')
 
-def launch_dashboard():
+# Large scatter plots (see scatter_figure)
+WEBGL_THRESHOLD = 1000 # points above which the scatter is drawn with WebGL instead of SVG
+MAX_SCATTER_POINTS = 5000 # points above which launches are binned by payload, booster version and outcome
+SCATTER_BINS = 100 # payload bins of a binned scatter (fewer if needed to stay within MAX_SCATTER_POINTS)
+SCATTER_BOOSTERS = 20 # booster versions drawn apart in a binned scatter, the least launched ones are "other"
+OTHER_BOOSTERS = "other"
+JITTER = 0.3 # vertical spread of the booster versions of a binned scatter around their outcome (0 / 1)
+
+# Clientside callback: keep the points of the scatter figure (sent once per site) within the
+# payload slider range, without a server round trip. Plotly sends numeric arrays as base64
+# typed arrays ({dtype, bdata[, shape]}): they are decoded before being filtered, and 2-D arrays
+# (e.g. the customdata of hover_data, one row per point) are split into rows first.
+FILTER_SCATTER_JS = """
+function(figure, payloadRange) {
+    if (!figure || !payloadRange) {
+        return window.dash_clientside.no_update;
+    }
+    const TYPES = {f8: Float64Array, f4: Float32Array, i1: Int8Array, u1: Uint8Array,
+                   i2: Int16Array, u2: Uint16Array, i4: Int32Array, u4: Uint32Array,
+                   i8: BigInt64Array, u8: BigUint64Array};
+    const decode = function(values) {
+        if (!values || !values.bdata) {
+            return values;
+        }
+        const binary = atob(values.bdata);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        const flat = Array.from(new TYPES[values.dtype](bytes.buffer), Number);
+        const shape = values.shape === undefined ? [] : String(values.shape).split(',').map(Number);
+        if (shape.length < 2) {
+            return flat;
+        }
+        const width = shape.slice(1).reduce(function(a, b) { return a * b; }, 1);
+        const rows = [];
+        for (let i = 0; i < flat.length; i += width) {
+            rows.push(flat.slice(i, i + width));
+        }
+        return rows;
+    };
+    const low = payloadRange[0], high = payloadRange[1];
+    const data = figure.data.map(function(trace) {
+        const x = decode(trace.x);
+        const keep = x.map(function(value) { return value >= low && value <= high; });
+        const filter = function(values) {
+            values = decode(values);
+            return Array.isArray(values) ? values.filter(function(_, i) { return keep[i]; }) : values;
+        };
+        const filtered = Object.assign({}, trace, {x: filter(x), y: filter(trace.y)});
+        ['customdata', 'text', 'hovertext'].forEach(function(key) {
+            if (key in trace) { filtered[key] = filter(trace[key]); }
+        });
+        if (trace.marker && trace.marker.size !== undefined) {
+            filtered.marker = Object.assign({}, trace.marker, {size: filter(trace.marker.size)});
+        }
+        return filtered;
+    });
+    return Object.assign({}, figure, {data: data});
+}
+"""
+
+logger = get_logger('dashboard')
+
+
+def figure_code_version():
     """
-    Function to generate a dashboard from the default data path,
-    which is 'data/spacex_launch_dash.csv'
-    Output is None
+    Version of the code building the figures, part of the figure cache keys: hash of this module,
+    of launch_cube.py and of the plotly version (figures stored by other versions are rebuilt).
+    """
+    digest = hashlib.sha256(plotly.__version__.encode())
+    for path in (__file__, inspect.getsourcefile(LaunchCube)):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def site_options(cube):
+    return [{'label':'All Sites', 'value':ALL_SITES}] + [{'label': site, 'value': site} for site in cube.sites]
+
+
+def shown_site(cube, site):
+    """site, or ALL_SITES if the cube has no launches of it (e.g. the site was removed by a reload)."""
+    return site if site in cube.site_versions else ALL_SITES
+
+
+def slider_max(cube):
+    """Upper bound of the payload slider: 10000 kg, or the heaviest payload rounded up to 1000 kg."""
+    return max(10000, int(math.ceil(cube.payload_bounds()[1] / 1000)) * 1000)
+
+
+def slider_marks(cube):
+    return {i: str(i) for i in range(0, slider_max(cube) + 1, 1000)}
+
+
+def load_cube(data_path=DATA_PATH):
+    """Read the launch data (only the columns used by the dashboard) into a LaunchCube."""
+    spacex_df = read_compact(data_path, columns=DASHBOARD_COLUMNS, report=True)
+    return LaunchCube(spacex_df)
+
+
+def pie_figure(cube, entered_site):
+    """Success distribution over the sites (ALL), or success vs. failure counts of one site."""
+    if entered_site == ALL_SITES:
+        data = cube.success_counts_by_site().reset_index()
+        return px.pie(
+            data,
+            values='class',
+            names='launch_site',
+            title='Launch site success distribution'
+        )
+    data2 = cube.outcome_counts(entered_site).reset_index()
+    # return the outcomes piechart for a selected site
+    return px.pie(
+        data2,
+        values='count',
+        names='class',
+        title='Success distribution for ' + entered_site
+    )
+
+
+def bin_launches(data, bins=SCATTER_BINS, jitter=JITTER, max_points=MAX_SCATTER_POINTS, max_boosters=SCATTER_BOOSTERS):
     """
-    DATA_PATH = Path('data/spacex_launch_dash.csv') 
+    Launches binned by payload (bins of equal width), booster version and outcome: one point per
+    non-empty bin, at the mean payload of its launches, with their count in a 'launches' column.
+    Booster versions beyond the max_boosters most launched ones are grouped as OTHER_BOOSTERS, and
+    the number of bins is lowered if needed so that there are at most max_points points.
+    The booster versions are spread over +-jitter/2 around their outcome so that they do not overlap.
+    """
+    boosters = data['booster_version'].astype('category').cat.remove_unused_categories()
+    if len(boosters.cat.categories) > max_boosters:
+        top = set(boosters.value_counts().index[:max_boosters])
+        kept = [booster for booster in boosters.cat.categories if booster in top]
+        other = boosters.notna() & ~boosters.isin(kept)
+        boosters = boosters.cat.set_categories(kept + [OTHER_BOOSTERS]).mask(other, OTHER_BOOSTERS)
+    bins = max(1, min(bins, max_points // (2 * len(boosters.cat.categories) or 1))) # x booster versions x outcomes
+    payload = data['payload_mass'].to_numpy(dtype='float64')
+    low, high = payload.min(), payload.max()
+    width = (high - low) / bins or 1.0
+    binned = pd.DataFrame({
+        'bin': np.minimum(((payload - low) // width).astype('int64'), bins - 1),
+        'booster_version': boosters,
+        'class': data['class'].to_numpy(dtype='int64'),
+        'payload_mass': payload,
+    }).groupby(['bin', 'booster_version', 'class'], observed=True)['payload_mass'].agg(['mean', 'size'])
+    binned = binned.reset_index().rename(columns={'mean': 'payload_mass', 'size': 'launches'})
+    codes = binned['booster_version'].cat.codes.to_numpy()
+    spread = jitter * (codes / max(len(boosters.cat.categories) - 1, 1) - 0.5)
+    binned['outcome'] = binned['class'] + spread
+    return binned.drop(columns='bin')
+
+
+def scatter_figure(cube, entered_site, entered_payload_range):
+    """
+    Success vs. payload of the launches of a site (or all sites) within the payload range.
+    Above WEBGL_THRESHOLD points the figure is drawn with WebGL; above MAX_SCATTER_POINTS launches
+    are binned (see bin_launches) and the marker size shows the number of launches of each bin.
+    """
+    payload0, payload1 = entered_payload_range
+    data = cube.select(entered_site, payload0, payload1)
+    title = "Success vs payload for " + ("all sites" if entered_site == ALL_SITES else entered_site)
+    labels = {"x": "Payload mass in kg", "y": "Sucess or Failure", "category": "Booster Version Category"}
+    if len(data) > MAX_SCATTER_POINTS:
+        points = bin_launches(data)
+        return px.scatter(
+            data_frame = points,
+            x='payload_mass',
+            y='outcome',
+            color='booster_version',
+            size='launches',
+            hover_data=['class', 'launches'],
+            render_mode='webgl',
+            title=title + " (binned)", # the slider filters the points in the browser: no total
+            labels=labels
+        )
+    return px.scatter(
+        data_frame = data,
+        x='payload_mass',
+        y='class',
+        color='booster_version',  # Color points based on 'category' column
+        render_mode='webgl' if len(data) > WEBGL_THRESHOLD else 'svg',
+        title=title,
+        labels=labels
+    )
 
-    # Read the airline data into pandas dataframe
-    spacex_df = pd.read_csv(DATA_PATH)
-    max_payload = spacex_df['payload_mass'].max()
-    min_payload = spacex_df['payload_mass'].min()
-    launch_sites = spacex_df['launch_site'].unique()  # Get unique launch site names
+
+def create_app(cube, figure_cache=None):
+    """
+    Dash application of the launch dashboard, backed by a LaunchCube
+    (the callbacks read the cube instead of filtering the launch dataframe).
+    cube may also be a LiveCube: the page then polls the data version and refreshes the site options,
+    the slider bounds and the figures after each reload (figures of unchanged sites stay cached).
+    Figures are served from figure_cache (a FigureCache, in memory only by default, keyed on figure_code_version);
+    its counters are served as JSON at /_figure_cache.
+    """
+    figure_cache = figure_cache if figure_cache is not None else FigureCache(code_version=figure_code_version())
+    live = cube if isinstance(cube, LiveCube) else None
+    current = (lambda: live.cube) if live is not None else (lambda: cube) # read once per callback
+    initial = current()
+    min_payload, max_payload = initial.payload_bounds()
 
     # Create a dash application
     app = dash.Dash(__name__)
@@ -36,10 +238,8 @@ def launch_dashboard():
             # The default select value is for ALL sites
             dcc.Dropdown(
                 id='site-dropdown',
-                options=[
-                    {'label':'All Sites', 'value':'ALL'},
-                ] + [{'label': site, 'value': site} for site in launch_sites],  # Dynamically generated options
-                value='ALL', #with default dropdown value to be ALL (meaning all sites are selected)
+                options=site_options(initial),  # Dynamically generated options
+                value=ALL_SITES, #with default dropdown value to be ALL (meaning all sites are selected)
                 placeholder='Select a Launch Site here', #show a text description about this input area
                 searchable=True # so we can enter keywords to search launch sites
             ),
@@ -61,17 +261,53 @@ def launch_dashboard():
             dcc.RangeSlider(
                 id='payload-slider',
                 min=0,
-                max=10000,
+                max=slider_max(initial),
                 step=1000,
-                marks={i: str(i) for i in range(0, 10001, 1000)},
+                marks=slider_marks(initial),
                 value=[min_payload,max_payload]
             ),
 
             # TASK 4: Add a scatter chart to show the correlation between payload and launch success
             html.Div(dcc.Graph(id='success-payload-scatter-chart')),
+            dcc.Store(id='scatter-figure'), # figure of the selected site, filtered by the slider in the browser
+
+            # Hot reload: version of the data shown, checked against the server every few seconds
+            dcc.Store(id='data-version', data=initial.version),
+            dcc.Store(id='payload-bounds', data=[min_payload, max_payload]), # of the data shown
+            dcc.Interval(id='reload-interval', interval=int((live.interval if live else 1) * 1000),
+                         disabled=live is None),
         ]
     )
 
+    @app.callback(
+        [Output('data-version', 'data'),
+         Output('site-dropdown', 'options'),
+         Output('payload-slider', 'max'),
+         Output('payload-slider', 'marks'),
+         Output('site-dropdown', 'value'),
+         Output('payload-bounds', 'data'),
+         Output('payload-slider', 'value')],
+        Input('reload-interval', 'n_intervals'),
+        [State('data-version', 'data'),
+         State('site-dropdown', 'value'),
+         State('payload-bounds', 'data'),
+         State('payload-slider', 'value')]
+    )
+    def refresh_controls(_, shown_version, selected_site=ALL_SITES, shown_bounds=None, payload_range=None):
+        data = current()
+        if data.version == shown_version:
+            raise PreventUpdate
+        site = shown_site(data, selected_site) # back to all sites if the selected one is gone
+        bounds = list(data.payload_bounds())
+        # ends of the slider left at the bounds of the shown data follow the new bounds
+        new_range = payload_range
+        if payload_range and shown_bounds:
+            new_range = [bounds[0] if payload_range[0] <= shown_bounds[0] else payload_range[0],
+                         bounds[1] if payload_range[1] >= shown_bounds[1] else payload_range[1]]
+        return (data.version, site_options(data), slider_max(data), slider_marks(data),
+                dash.no_update if site == selected_site else site, bounds,
+                dash.no_update if new_range == payload_range else new_range)
+
     # TASK 2: Add a callback function for `site-dropdown` as input, `success-pie-chart` as output
     # Function decorator to specify function input and output
     @app.callback(
@@ -79,74 +315,68 @@ def launch_dashboard():
             component_id='success-pie-chart',
             component_property='figure'
         ),
-        Input(
+        [Input(
             component_id='site-dropdown',
             component_property='value'
-        )
+        ),
+        Input('data-version', 'data')]
     )
-    def get_pie_chart(entered_site):
-        print(f"Entered site: {entered_site}")  # Debugging line to print selected site
-        if entered_site == 'ALL':
-            data = spacex_df.groupby('launch_site')['class'].sum().reset_index()
-            fig = px.pie(
-                data,
-                values='class',
-                names='launch_site',
-                title='Launch site success distribution'
-            )
-        else:
-            data1=spacex_df[spacex_df['launch_site']==entered_site]
-            data2=data1['class'].value_counts().reset_index()
-            # return the outcomes piechart for a selected site
-            fig = px.pie(
-                data2,
-                values='count',
-                names='class',
-                title='Success distribution for ' + entered_site
-            )
-        return fig
+    def get_pie_chart(entered_site, _=None):
+        logger.debug(f"Entered site: {entered_site}")
+        data = current()
+        entered_site = shown_site(data, entered_site)
+        return figure_cache.get_or_build('pie', entered_site, None, data.view_version(entered_site),
+                                         lambda: pie_figure(data, entered_site))
 
     # TASK 4:
-    # Add a callback function for `site-dropdown` and `payload-slider` as inputs, `success-payload-scatter-chart` as output
+    # The server sends the scatter figure of the selected site over all payloads (on `site-dropdown` changes
+    # and data reloads); the `payload-slider` filters its points in the browser (FILTER_SCATTER_JS)
     @app.callback(
-        Output(
-            component_id='success-payload-scatter-chart',
-            component_property='figure'
-        ),
+        Output('scatter-figure', 'data'),
         [Input(
             component_id='site-dropdown',
             component_property='value'
         ),
+        Input('data-version', 'data')]
+    )
+    def get_scatter_plot(entered_site, _=None):
+        data = current()
+        entered_site = shown_site(data, entered_site)
+        return figure_cache.get_or_build('scatter', entered_site, None, data.view_version(entered_site),
+                                         lambda: scatter_figure(data, entered_site, (-math.inf, math.inf)))
+
+    app.clientside_callback(
+        FILTER_SCATTER_JS,
+        Output(
+            component_id='success-payload-scatter-chart',
+            component_property='figure'
+        ),
+        [Input('scatter-figure', 'data'),
         Input(
             component_id='payload-slider',
             component_property='value'
         )]
     )
-    def get_scatter_plot(entered_site,entered_payload_range):
-        payload0, payload1 = entered_payload_range
-        data = spacex_df[spacex_df['payload_mass'].between(payload0, payload1)]
-        if entered_site == 'ALL':
-            fig = px.scatter(
-                data_frame = data,
-                x='payload_mass',
-                y='class',
-                color='booster_version',  # Color points based on 'category' column
-                title="Success vs payload for all sites",
-                labels={"x": "Payload mass in kg", "y": "Sucess or Failure", "category": "Booster Version Category"}
-            )
-        else:
-            data1 = data[data['launch_site']==entered_site]
-            fig = px.scatter(
-                data_frame = data,
-                x='payload_mass',
-                y='class',
-                color='booster_version',
-                title="Success vs payload for " + entered_site,
-                labels={"x": "Payload mass in kg", "y": "Sucess or Failure", "category": "Booster Version Category"}
-            )
-        return fig
-
-    app.run()
+
+    @app.server.route('/_figure_cache')
+    def figure_cache_stats():
+        return jsonify(figure_cache.stats())
+
+    return app
+
+
+def launch_dashboard(host="127.0.0.1", port=8050):
+    """
+    Function to generate a dashboard from the default data path,
+    which is 'data/spacex_launch_dash.csv', served by the single-process development server
+    (see src/eda/serve.py for the multi-process server); the data is reloaded whenever the file changes
+    Output is None
+    """
+    config = load_config()
+    live = LiveCube(*artifact_source(DATA_PATH, columns=DASHBOARD_COLUMNS),
+                    interval=config.get("dashboard_reload_seconds", DEFAULT_RELOAD_SECONDS)).start()
+    app = create_app(live, figure_cache_from_config(config, figure_code_version()))
+    app.run(host=host, port=port)
 
     return None
 
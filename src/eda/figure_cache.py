@@ -0,0 +1,244 @@
+# src/eda/figure_cache.py
+# Cache of the figures returned by the dashboard callbacks.
+# Figures are keyed by callback kind, launch site, payload range, data version and the version of the
+# code building them (so that figures stored before an upgrade are not served after it), kept as JSON in a
+# bounded in-memory LRU and, optionally, in a store shared by the dashboard workers: a directory of
+# JSON files or a SQLite database (both bounded, least recently used entries evicted first).
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+TOUCH_INTERVAL = 60 # seconds: the recency of a stored figure is updated at most this often (approximate LRU)
+FIGURE_STORES = ('memory', 'disk', 'sqlite')
+
+
+class DiskFigureStore:
+    """
+    Directory of '<key>.json' figure files shared by several processes.
+    Args:
+      cache_dir: directory of the figure files
+      max_entries: maximum number of figures kept (least recently used, by file mtime, are deleted)
+    """
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        """Figure JSON stored under key, or None."""
+        try:
+            with open(self._path(key), "r") as f:
+                figure = f.read()
+            os.utime(self._path(key)) # mark as recently used
+            return figure
+        except OSError:
+            return None
+
+    def put(self, key, figure):
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(figure)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass # evicted by another worker
+
+    def clear(self):
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                os.remove(entry.path)
+
+    def __len__(self):
+        return sum(1 for entry in os.scandir(self.cache_dir) if entry.name.endswith(".json"))
+
+
+class SQLiteFigureStore:
+    """
+    SQLite table of figures shared by several processes (WAL journal, one connection per thread and process:
+    a connection opened before a fork, e.g. by the gunicorn master before it forks the workers,
+    is never used in the child, as SQLite requires).
+    Reads only write when the recency of a figure is older than touch_interval, so that cached reads of
+    the workers do not serialize on the write lock (the LRU order is approximate within that interval).
+    Args:
+      db_path: path of the database file
+      max_entries: maximum number of figures kept (least recently used are deleted)
+      touch_interval: seconds between two updates of the recency of a figure
+    """
+
+    def __init__(self, db_path, max_entries=DEFAULT_MAX_ENTRIES, touch_interval=TOUCH_INTERVAL):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS figures (key TEXT PRIMARY KEY, figure TEXT NOT NULL, "
+                           "used_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_figures_used_at ON figures (used_at)")
+
+    @property
+    def _conn(self):
+        # keyed by process id; connections inherited from the parent are kept open (not closed in the child)
+        conns = self._local.__dict__.setdefault('conns', {})
+        conn = conns.get(os.getpid())
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conns[os.getpid()] = conn
+        return conn
+
+    def get(self, key):
+        """Figure JSON stored under key, or None."""
+        row = self._conn.execute("SELECT figure, used_at FROM figures WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] >= self.touch_interval: # mark as recently used
+            self._conn.execute("UPDATE figures SET used_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key, figure):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO figures VALUES (?, ?, ?)", (key, figure, time.time()))
+            conn.execute("DELETE FROM figures WHERE key IN (SELECT key FROM figures ORDER BY used_at DESC "
+                         "LIMIT -1 OFFSET ?)", (self.max_entries,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._conn.execute("DELETE FROM figures")
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM figures").fetchone()[0]
+
+
+class FigureCache:
+    """
+    Bounded LRU cache of figures (as JSON), optionally backed by a store shared between workers.
+    Args:
+      max_entries: maximum number of figures kept in memory
+      store: DiskFigureStore, SQLiteFigureStore or None (memory only)
+      code_version: version of the code building the figures, part of every key (see figure_code_version
+        in dashboard.py): stored figures built by another version of the code are not served
+    Counters: hits (served from memory), store_hits (served from the shared store), misses (built).
+    The memory LRU and the counters belong to one process (one worker of the multi-process server).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, store=None, code_version=None):
+        self.max_entries = max_entries
+        self.store = store
+        self.code_version = code_version
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind, site, payload_range, version, code_version=None):
+        """Cache key of a figure: hash of the callback kind, its inputs, the data and code versions."""
+        bounds = None if payload_range is None else [float(bound) for bound in payload_range]
+        payload = json.dumps([kind, site, bounds, version, code_version], separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _remember(self, key, figure):
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+
+    def get_or_build(self, kind, site, payload_range, version, build):
+        """
+        Figure of a callback, from the cache or built by build() (a Plotly figure) and cached.
+        Returns: the figure as a dict (a new one on each call: callers may modify it)
+        """
+        key = self.key(kind, site, payload_range, version, self.code_version)
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return json.loads(figure)
+        figure = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if figure is not None:
+                self.store_hits += 1
+            else:
+                self.misses += 1
+        if figure is None:
+            figure = build().to_json()
+            if self.store is not None:
+                self.store.put(key, figure)
+        self._remember(key, figure)
+        return json.loads(figure)
+
+    def stats(self):
+        """Counters and sizes of the cache, e.g. for the dashboard's /_figure_cache route."""
+        with self._lock:
+            entries = len(self._figures)
+        requests = self.hits + self.store_hits + self.misses
+        return {
+            'hits': self.hits,
+            'store_hits': self.store_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.store_hits) / requests if requests else None,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'store': type(self.store).__name__ if self.store is not None else None,
+            'store_entries': len(self.store) if self.store is not None else None,
+            'pid': os.getpid(), # the counters are those of this process
+        }
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+        if self.store is not None:
+            self.store.clear()
+
+
+def figure_cache_from_config(config, code_version=None):
+    """
+    FigureCache configured by the figure_cache_* entries of config.json:
+      figure_cache_backend: 'memory', 'disk' or 'sqlite' (default 'memory')
+      figure_cache_path: directory (disk) or database file (sqlite) of the shared store
+      figure_cache_max_entries: bound of the in-memory cache and of the shared store
+    code_version: version of the code building the figures (see FigureCache)
+    """
+    backend = config.get("figure_cache_backend", "memory")
+    max_entries = config.get("figure_cache_max_entries", DEFAULT_MAX_ENTRIES)
+    if backend not in FIGURE_STORES:
+        raise ValueError(f"Unknown figure cache backend: {backend} (expected one of {', '.join(FIGURE_STORES)})")
+    store = None
+    if backend == "disk":
+        store = DiskFigureStore(config.get("figure_cache_path", "data/.figure_cache"), max_entries)
+    elif backend == "sqlite":
+        store = SQLiteFigureStore(config.get("figure_cache_path", "data/.figure_cache.db"), max_entries)
+    return FigureCache(max_entries, store, code_version)
@@ -0,0 +1,221 @@
+# src/eda/launch_cube.py
+# Pre-aggregated view of the launches backing the dashboard callbacks.
+# Rows are sorted by launch site then payload mass, so the launches of a site within a payload
+# range are one contiguous slice found by binary search; a second ordering sorts all launches by
+# payload for the 'ALL' selection. Success/failure counts and row ranges are precomputed for each
+# (launch site, payload bin) cell, so the callbacks never filter or group the full frame.
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+ALL_SITES = 'ALL'
+# arrays of a cube saved by LaunchCube.save (besides the columns of rows)
+CUBE_ARRAYS = ['payload', 'site_offsets', 'by_payload', 'payload_by_payload', 'bin_edges',
+               'cell_start', 'cell_stop', 'counts']
+PAYLOAD_BIN_WIDTH = 1000 # kg, the step of the dashboard payload slider
+CURRENT_CUBE = 'current' # file of a cube directory holding the version of the cube to attach
+
+
+class LaunchCube:
+    """
+    Launches indexed by launch site and payload.
+    Args:
+      df: launch dataframe with launch_site, payload_mass and class columns (other columns are kept)
+      bin_width: width of the payload bins of the cube, in kg
+    Attributes:
+      rows: the launches, sorted by launch site then payload mass (missing payloads last within a site)
+      sites: launch site names, in order
+      bin_edges: lower bounds of the payload bins (the last bin is open-ended)
+      counts: int array (site, bin, outcome) of failure (0) and success (1) counts;
+              an extra last bin counts the launches without payload mass
+      cell_start, cell_stop: int arrays (site, bin): row range of each cell in rows
+      version: fingerprint of the launches (identical data gives the same version in every process)
+      site_versions: fingerprint of the launches of each site (unchanged when only other sites change)
+      path: directory of the saved cube it was attached from (see load), None if built in memory
+    """
+
+    def __init__(self, df, bin_width=PAYLOAD_BIN_WIDTH):
+        # launches without a site are dropped: no site row range (nor the ALL pie) could count them
+        df = df[df['launch_site'].notna()]
+        self.path = None
+        codes, sites = pd.factorize(df['launch_site'], sort=True)
+        payload = df['payload_mass'].to_numpy(dtype='float64', na_value=np.nan)
+        order = np.lexsort((payload, codes)) # NaN payloads sort last
+        self.rows = df.iloc[order].reset_index(drop=True)
+        self.sites = [str(site) for site in sites]
+        self.bin_width = bin_width
+        self.payload = payload[order]
+        self._site_index = {site: i for i, site in enumerate(self.sites)}
+        # rows of site i: [site_offsets[i], site_offsets[i + 1])
+        self.site_offsets = np.searchsorted(codes[order], np.arange(len(self.sites) + 1))
+        # all launches by payload: rows.iloc[by_payload]
+        self.by_payload = np.argsort(self.payload, kind='stable')
+        self.payload_by_payload = self.payload[self.by_payload]
+        self._build_cells()
+        hashes = pd.util.hash_pandas_object(self.rows, index=False).to_numpy()
+
+        def fingerprint(values):
+            return hashlib.blake2b(values.tobytes(), digest_size=8).hexdigest()
+
+        self.version = fingerprint(hashes)
+        self.site_versions = {site: fingerprint(hashes[self.site_offsets[i]:self.site_offsets[i + 1]])
+                              for i, site in enumerate(self.sites)}
+
+    def _build_cells(self):
+        known = self.payload[~np.isnan(self.payload)]
+        n_bins = int(known.max() // self.bin_width) + 1 if len(known) else 1
+        self.bin_edges = np.arange(n_bins) * float(self.bin_width)
+        # cell boundaries of each site: bin edges, end of the known payloads, end of the site
+        self.cell_start = np.empty((len(self.sites), n_bins + 1), dtype='int64')
+        self.cell_stop = np.empty((len(self.sites), n_bins + 1), dtype='int64')
+        for i in range(len(self.sites)):
+            start, stop = self.site_offsets[i], self.site_offsets[i + 1]
+            payload = self.payload[start:stop]
+            bounds = start + np.concatenate(([0], np.searchsorted(payload, self.bin_edges[1:]),
+                                             [np.count_nonzero(~np.isnan(payload)), stop - start]))
+            self.cell_start[i], self.cell_stop[i] = bounds[:-1], bounds[1:]
+        # successes per cell from the prefix sums of the outcomes
+        successes = np.concatenate(([0], np.cumsum(self.rows['class'].to_numpy(dtype='int64'))))
+        won = successes[self.cell_stop] - successes[self.cell_start]
+        self.counts = np.stack((self.cell_stop - self.cell_start - won, won), axis=-1)
+
+    # === Shared read-only buffer === #
+
+    def save(self, directory):
+        """
+        Save the cube as .npy files under directory/<version> (written once, atomically), to be attached
+        read-only by several processes with LaunchCube.load. Text columns are saved as categorical codes.
+        Returns: path of the saved cube
+        """
+        path = os.path.join(directory, self.version)
+        if os.path.exists(os.path.join(path, 'cube.json')):
+            return path
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        columns = {}
+        for i, column in enumerate(self.rows.columns):
+            series = self.rows[column]
+            if isinstance(series.dtype, pd.CategoricalDtype) or not isinstance(series.dtype, np.dtype):
+                categorical = series.astype('category').array # codes of the smallest integer dtype
+                np.save(os.path.join(tmp_path, f"column_{i}.npy"), categorical.codes)
+                columns[column] = [str(category) for category in categorical.categories]
+            else:
+                np.save(os.path.join(tmp_path, f"column_{i}.npy"), series.to_numpy())
+                columns[column] = None
+        for name in CUBE_ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(self, name))
+        meta = {'version': self.version, 'site_versions': self.site_versions, 'sites': self.sites,
+                'bin_width': self.bin_width, 'columns': list(columns.items())}
+        with open(os.path.join(tmp_path, 'cube.json'), 'w') as f:
+            json.dump(meta, f)
+        try:
+            os.replace(tmp_path, path)
+        except OSError: # saved meanwhile by another process
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Attach a cube saved by save(): the arrays are memory-mapped (mmap_mode='r'), so processes
+        loading the same cube share its pages instead of each holding a copy.
+        """
+        with open(os.path.join(path, 'cube.json'), 'r') as f:
+            meta = json.load(f)
+        cube = cls.__new__(cls)
+        cube.path = path
+        cube.version, cube.site_versions = meta['version'], meta['site_versions']
+        cube.sites, cube.bin_width = meta['sites'], meta['bin_width']
+        cube._site_index = {site: i for i, site in enumerate(cube.sites)}
+        for name in CUBE_ARRAYS:
+            setattr(cube, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode))
+        columns = {}
+        for i, (column, categories) in enumerate(meta['columns']):
+            values = np.load(os.path.join(path, f"column_{i}.npy"), mmap_mode=mmap_mode)
+            if categories is not None:
+                values = pd.Categorical.from_codes(values, categories=categories)
+            columns[column] = values
+        cube.rows = pd.DataFrame(columns, copy=False)
+        return cube
+
+    def view_version(self, site):
+        """Fingerprint of the data shown for a site (or ALL_SITES), e.g. to key cached figures."""
+        return self.version if site == ALL_SITES else self.site_versions.get(site)
+
+    def payload_bounds(self):
+        """(min, max) payload mass of the launches, (0.0, 0.0) without any payload."""
+        known = self.payload_by_payload[~np.isnan(self.payload_by_payload)]
+        return (float(known[0]), float(known[-1])) if len(known) else (0.0, 0.0)
+
+    def site_slice(self, site):
+        """Row range (start, stop) of a launch site in rows."""
+        i = self._site_index[site]
+        return int(self.site_offsets[i]), int(self.site_offsets[i + 1])
+
+    def success_counts_by_site(self):
+        """Series of the number of successful launches of each site."""
+        return pd.Series(self.counts[:, :, 1].sum(axis=1), index=pd.Index(self.sites, name='launch_site'),
+                         name='class')
+
+    def outcome_counts(self, site):
+        """Series of the number of failed (0) and successful (1) launches of a site."""
+        counts = self.counts[self._site_index[site]].sum(axis=0)
+        return pd.Series(counts, index=pd.Index([0, 1], name='class'), name='count')
+
+    def select(self, site, low, high):
+        """Launches of a site (or ALL_SITES) with low <= payload_mass <= high, in payload order."""
+        if site == ALL_SITES:
+            start, stop = self._payload_range(self.payload_by_payload, low, high)
+            return self.rows.take(self.by_payload[start:stop])
+        site_start, site_stop = self.site_slice(site)
+        start, stop = self._payload_range(self.payload[site_start:site_stop], low, high)
+        return self.rows.iloc[site_start + start:site_start + stop]
+
+    @staticmethod
+    def _payload_range(sorted_payload, low, high):
+        return (int(np.searchsorted(sorted_payload, low, side='left')),
+                int(np.searchsorted(sorted_payload, high, side='right')))
+
+
+def publish_cube(cube, directory):
+    """
+    Save the cube (see LaunchCube.save) and make it the current cube of directory, the one the
+    dashboard workers attach (see current_cube_path). Returns: path of the saved cube
+    """
+    path = cube.save(directory)
+    tmp_path = os.path.join(directory, f"{CURRENT_CUBE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(cube.version)
+    os.replace(tmp_path, os.path.join(directory, CURRENT_CUBE))
+    return path
+
+
+def current_cube_path(directory):
+    """Path of the current cube of directory (see publish_cube), or None if none was published."""
+    try:
+        with open(os.path.join(directory, CURRENT_CUBE), 'r') as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, version) if version else None
+
+
+def prune_cubes(directory, keep=()):
+    """
+    Delete the cubes saved in directory except the current one and the paths in keep (e.g. the cube
+    attached by the calling process). Processes still attached to a deleted cube keep their memory maps.
+    Returns: number of deleted cubes
+    """
+    kept = {os.path.normpath(path) for path in [current_cube_path(directory), *keep] if path}
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.tmp') or not os.path.exists(os.path.join(entry.path, 'cube.json')):
+            continue # being saved, or not a cube
+        if os.path.normpath(entry.path) not in kept:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
@@ -1,14 +1,14 @@
 import argparse
-import pandas as pd
 import folium
 import os
 from folium import plugins
 from geopy.distance import geodesic
+from src.utils.dtypes import read_compact
 
 
 def load_data(csv_path='data/spacex_launch_dash.csv'):
-    """Load SpaceX launch data from CSV."""
-    return pd.read_csv(csv_path)
+    """Load SpaceX launch data (Parquet, Feather or CSV, see src/utils/artifacts.py)."""
+    return read_compact(csv_path)
 
 
 def generate_launch_site_map(df, output_path='docs/launch_site_map.html', zoom_start=4):
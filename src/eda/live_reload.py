@@ -0,0 +1,139 @@
+# src/eda/live_reload.py
+# Hot reload of the dashboard data without restart.
+# A LiveCube holds the current LaunchCube and a background thread polling the signature of the data
+# source: the stats of the launch artifact, or the data_version of the SQLite database. When it
+# changes, the new cube is built in the background and swapped in with one assignment, so the
+# callbacks keep serving the previous data until the new one is complete and never see a mix.
+# The workers of the multi-process server (serve.py) do not build cubes: they watch the cube directory
+# where one process publishes them (cube_dir_source), and attach each new cube read-only.
+
+import os
+import threading
+from src.eda.launch_cube import ALL_SITES, LaunchCube, current_cube_path, publish_cube
+from src.utils.artifacts import resolve_artifact
+from src.eda.sql_queries import QueryService
+from src.utils.dtypes import optimize_dtypes, read_compact
+from src.utils.instrumentation import get_logger
+
+logger = get_logger('live_reload')
+
+DEFAULT_RELOAD_SECONDS = 5
+
+
+def artifact_source(data_path, columns=None, cube_dir=None):
+    """
+    (load, signature) functions of a launch artifact (any format, see resolve_artifact).
+    With cube_dir, loaded cubes are published there (see publish_cube) and memory-mapped.
+    """
+    def signature():
+        path = resolve_artifact(str(data_path))
+        try:
+            stat = os.stat(path) if path is not None else None
+        except OSError: # replaced meanwhile
+            return None
+        return stat and (path, stat.st_mtime_ns, stat.st_size)
+
+    def load():
+        cube = LaunchCube(read_compact(data_path, columns=columns))
+        return LaunchCube.load(publish_cube(cube, cube_dir)) if cube_dir else cube
+
+    return load, signature
+
+
+def cube_dir_source(cube_dir):
+    """
+    (load, signature) functions of the current cube of a cube directory (see publish_cube):
+    the cube is attached read-only, never built (signature: path of the current cube).
+    """
+    def load():
+        path = current_cube_path(cube_dir)
+        if path is None:
+            raise FileNotFoundError(f"No launch cube published in {cube_dir}")
+        return LaunchCube.load(path)
+
+    return load, lambda: current_cube_path(cube_dir)
+
+
+def sqlite_source(db_path, columns, table_name="SPACEXTBL"):
+    """(load, signature) functions of the launch table of a SQLite database (signature: data_version)."""
+    service = QueryService(db_path, cache_size=0)
+    names = ', '.join(f'"{column}"' for column in columns)
+
+    def load():
+        return LaunchCube(optimize_dtypes(service.query(f'SELECT {names} FROM "{table_name}"')))
+
+    return load, service.database_version
+
+
+class LiveCube:
+    """
+    Current LaunchCube of the dashboard, reloaded when its data source changes.
+    Args:
+      load: function returning a new LaunchCube from the data source
+      signature: function returning a value that changes whenever the data source changes
+      interval: seconds between two checks of the signature by the background thread
+      cube: current cube, if already loaded (otherwise loaded now)
+      on_reload: function called with the new cube after each swap (e.g. to delete the superseded cubes)
+    """
+
+    def __init__(self, load, signature, interval=DEFAULT_RELOAD_SECONDS, cube=None, on_reload=None):
+        self._load = load
+        self._signature = signature
+        self._on_reload = on_reload
+        self.interval = interval
+        self.reloads = 0
+        self.signature = signature()
+        self.cube = cube if cube is not None else load()
+        self._lock = threading.Lock() # one reload at a time
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def reload_if_changed(self):
+        """
+        Reload the cube if the signature of the data source changed.
+        Returns: list of the sites whose launches changed (ALL included if any did), [] if nothing changed
+        """
+        with self._lock:
+            signature = self._signature()
+            if signature == self.signature:
+                return []
+            previous = self.cube
+            try:
+                cube = self._load()
+            except Exception as error: # e.g. the artifact is being rewritten: retried at the next check
+                logger.warning(f"Reload failed, keeping the current data: {error}")
+                return []
+            self.cube, self.signature = cube, signature # atomic swap for the callbacks
+            self.reloads += 1
+            if self._on_reload is not None:
+                try:
+                    self._on_reload(cube)
+                except Exception as error: # the new cube is served anyway
+                    logger.warning(f"Post-reload hook failed: {error}")
+        changed = sorted(site for site in set(previous.sites) | set(cube.sites)
+                         if previous.site_versions.get(site) != cube.site_versions.get(site))
+        if cube.version != previous.version:
+            changed.append(ALL_SITES)
+        logger.info(f"Data reloaded ({len(cube.rows)} launches), changed: {', '.join(changed) or 'nothing'}")
+        return changed
+
+    def watch(self):
+        """Check the data source every interval seconds until stop() (blocking, see start)."""
+        while not self._stopped.wait(self.interval):
+            try:
+                self.reload_if_changed()
+            except Exception: # the watcher must survive any error
+                logger.exception("Error while checking the dashboard data source")
+
+    def start(self):
+        """Start the background watcher (daemon thread)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.watch, name="dashboard-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,137 @@
+# src/eda/serve.py
+# Multi-process serving of the dashboard ('cli.py dashboard --workers N', with gunicorn).
+# The launch data is read and indexed once (LaunchCube) and published as .npy files in a cube
+# directory; every worker memory-maps the current cube read-only instead of parsing the dataset, so
+# the workers share the pages of the data. When the launch data changes, one watcher process (spawned,
+# not forked, so the gunicorn master stays single-threaded) builds and publishes the new cube, and
+# the workers attach it. The WSGI app factory can also be used by gunicorn directly, e.g.
+#   SPACEY_DASHBOARD_CUBE_DIR=data/.dashboard_cube gunicorn -w 4 'src.eda.serve:create_wsgi_app()'
+# once a cube was published there (prepare_cube); the data is then only reloaded while serve() runs.
+
+import argparse
+import importlib.util
+import multiprocessing
+import os
+from src.eda.dashboard import DASHBOARD_COLUMNS, DATA_PATH, create_app, figure_code_version, load_cube
+from src.eda.figure_cache import figure_cache_from_config
+from src.eda.launch_cube import LaunchCube, current_cube_path, prune_cubes, publish_cube
+from src.eda.live_reload import DEFAULT_RELOAD_SECONDS, LiveCube, artifact_source, cube_dir_source
+from src.utils.config_loader import load_config
+from src.utils.instrumentation import get_logger
+
+logger = get_logger('serve')
+
+CUBE_ENV = "SPACEY_DASHBOARD_CUBE_DIR" # cube directory watched by the workers
+DEFAULT_CUBE_DIR = "data/.dashboard_cube"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8050
+
+
+def gunicorn_available():
+    return importlib.util.find_spec("gunicorn") is not None
+
+
+def prepare_cube(data_path=DATA_PATH, cube_dir=DEFAULT_CUBE_DIR):
+    """
+    Read and index the launch data once, and publish it for the workers (the cubes of previous runs are
+    deleted). Returns: path of the saved cube.
+    """
+    path = publish_cube(load_cube(data_path), cube_dir)
+    prune_cubes(cube_dir)
+    logger.info(f"Launch cube published at {path}")
+    return path
+
+
+def cube_publisher(data_path, cube_dir, interval=DEFAULT_RELOAD_SECONDS):
+    """
+    LiveCube rebuilding and publishing the cube of cube_dir whenever the launch data changes. After each
+    swap, the superseded cubes are deleted: the workers still attached to one keep their memory maps
+    until they attach the new cube.
+    """
+    def prune(cube):
+        prune_cubes(cube_dir, keep=[cube.path])
+
+    load, signature = artifact_source(data_path, columns=DASHBOARD_COLUMNS, cube_dir=cube_dir)
+    return LiveCube(load, signature, interval=interval, cube=LaunchCube.load(current_cube_path(cube_dir)),
+                    on_reload=prune)
+
+
+def watch_cube(data_path, cube_dir, interval=DEFAULT_RELOAD_SECONDS):
+    """
+    Rebuild and publish the cube whenever the launch data changes (blocking; run in its own process
+    by serve, so that only this process parses the data).
+    """
+    cube_publisher(data_path, cube_dir, interval).watch()
+
+
+def create_wsgi_app(cube_dir=None, config=None):
+    """
+    WSGI application of the dashboard, for one worker: attaches the current cube of cube_dir
+    (default: the SPACEY_DASHBOARD_CUBE_DIR environment variable), attaches the next ones when they
+    are published, and shares the figure cache store.
+    """
+    cube_dir = cube_dir or os.environ.get(CUBE_ENV)
+    if not cube_dir or current_cube_path(cube_dir) is None:
+        raise RuntimeError(f"No launch cube to attach: set {CUBE_ENV} to a cube directory (see prepare_cube)")
+    config = load_config() if config is None else config
+    live = LiveCube(*cube_dir_source(cube_dir),
+                    interval=config.get("dashboard_reload_seconds", DEFAULT_RELOAD_SECONDS)).start()
+    return create_app(live, figure_cache_from_config(config, figure_code_version())).server
+
+
+def serve(workers, host=DEFAULT_HOST, port=DEFAULT_PORT, data_path=DATA_PATH, cube_dir=None):
+    """
+    Serve the dashboard with `workers` gunicorn worker processes
+    (without gunicorn, only one worker: the threaded werkzeug server).
+    """
+    if workers > 1 and not gunicorn_available():
+        raise RuntimeError("Serving the dashboard with several workers needs gunicorn (pip install gunicorn); "
+                           "use --workers 1 for the development server")
+    config = load_config()
+    cube_dir = cube_dir or config.get("dashboard_cube_dir", DEFAULT_CUBE_DIR)
+    prepare_cube(data_path, cube_dir)
+    os.environ[CUBE_ENV] = cube_dir
+    interval = config.get("dashboard_reload_seconds", DEFAULT_RELOAD_SECONDS)
+    watcher = multiprocessing.get_context('spawn').Process(target=watch_cube, args=(str(data_path), cube_dir, interval),
+                                                           name="dashboard-cube-watcher", daemon=True)
+    watcher.start()
+    try:
+        if gunicorn_available():
+            from gunicorn.app.base import BaseApplication
+
+            class DashboardApplication(BaseApplication):
+                def load_config(self):
+                    self.cfg.set('bind', f"{host}:{port}")
+                    self.cfg.set('workers', workers)
+
+                def load(self):
+                    # called in each worker after the fork: the cube is attached, not copied
+                    return create_wsgi_app(cube_dir, config)
+
+            logger.info(f"Serving the dashboard on http://{host}:{port} with {workers} gunicorn workers")
+            DashboardApplication().run()
+        else:
+            from werkzeug.serving import run_simple
+            logger.info(f"gunicorn is not installed: serving on http://{host}:{port} with the werkzeug server")
+            run_simple(host, port, create_wsgi_app(cube_dir, config), threaded=True)
+    finally:
+        watcher.terminate()
+
+
+def add_arguments(parser):
+    """Arguments of the dashboard server (shared by 'python src/eda/serve.py' and 'cli.py dashboard')."""
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes, served by gunicorn (default: 1, the single-process development server)')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST, help=f'Host to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to bind (default: {DEFAULT_PORT})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the launch dashboard with several worker processes.")
+    add_arguments(parser)
+    args = parser.parse_args()
+    serve(args.workers, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# src/eda/sql_bench.py
+# Profiles the predefined queries of src/eda/sql_queries.py ('cli.py sql-bench').
+# Each query runs against synthetic launch databases of the requested sizes (and optionally a real
+# database): its EXPLAIN QUERY PLAN, wall time uncached and cached, rows returned and cache hit/miss
+# are printed as one comparison table, flagging the queries that still scan the whole launch table.
+
+import argparse
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+from src.eda import sql_queries
+from src.eda.sql_queries import QueryService
+from src.utils.create_db_from_csv import DEFAULT_TABLE, connect_for_write, load_launches
+
+DEFAULT_SIZES = [1_000, 100_000]
+
+# name -> query (SQL string or (sql, params) tuple)
+BENCH_QUERIES = {
+    'all_launches': sql_queries.get_all_launches(),
+    'unique_boosters': sql_queries.get_unique_boosters(),
+    'total_payload_by_site': sql_queries.get_total_payload_by_site(),
+    'successful_launches_by_site': sql_queries.get_successful_launches_by_site(),
+    'max_payload_site': sql_queries.get_max_payload_site(),
+    'avg_success_by_site': sql_queries.get_avg_success_by_site(),
+    'success_rate_by_booster': sql_queries.get_success_rate_by_booster(),
+    'launches_by_orbit': sql_queries.get_launches_by_orbit(),
+    'payload_histogram': sql_queries.get_payload_histogram(),
+    'success_rate_by_payload_range': sql_queries.get_success_rate_by_payload_range(5000, 8000),
+}
+
+SITES = ['CCAFS LC-40', 'CCAFS SLC-40', 'KSC LC-39A', 'VAFB SLC-4E']
+ORBITS = ['LEO', 'ISS', 'PO', 'GTO', 'ES-L1', 'SSO', 'HEO', 'MEO', 'VLEO', 'SO', 'GEO']
+
+
+def synthetic_launches(rows, seed=0):
+    """Launch frame with the columns and value ranges of the merged dataset (a few hundred booster versions)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'flight_number': np.arange(1, rows + 1),
+        'date': pd.Timestamp('2010-06-04') + pd.to_timedelta(np.arange(rows) % 5000, unit='D'),
+        'booster_version': [f"F9 B5 B{1000 + i % 400}" for i in range(rows)],
+        'payload_mass': rng.uniform(0, 16000, rows).round(1),
+        'orbit': rng.choice(ORBITS, rows),
+        'launch_site': rng.choice(SITES, rows),
+        'class': rng.integers(0, 2, rows),
+    })
+
+
+def build_synthetic_database(db_path, rows, seed=0):
+    """Build a launch database of the given number of rows at db_path (replacing it)."""
+    conn = connect_for_write(db_path)
+    try:
+        load_launches(conn, synthetic_launches(rows, seed))
+    finally:
+        conn.close()
+    return db_path
+
+
+def profile_queries(db_path, queries=None, repeat=3):
+    """
+    Profile each query on the database: best uncached time over `repeat` runs, then one cached run.
+    Returns: list of dicts (one per query)
+    """
+    service = QueryService(db_path)
+    results = []
+    try:
+        for name, query in (queries or BENCH_QUERIES).items():
+            timings = []
+            for _ in range(repeat):
+                service.clear_cache()
+                _, cold = service.query(query, profile=True)
+                timings.append(cold.seconds)
+            _, warm = service.query(query, profile=True)
+            scans = [table for table in cold.full_scans if table == DEFAULT_TABLE]
+            results.append({
+                'query': name,
+                'plan': '; '.join(cold.plan),
+                'full scan': 'yes' if scans else 'no',
+                'uncached ms': min(timings) * 1000,
+                'cached ms': warm.seconds * 1000,
+                'rows': cold.rows,
+                'cache': f"{cold.cache} / {warm.cache}",
+            })
+    finally:
+        service.close()
+    return results
+
+
+def run_bench(sizes=DEFAULT_SIZES, db_paths=(), repeat=3, workdir=None):
+    """
+    Profile the predefined queries on synthetic databases of the given sizes, and on existing databases.
+    Returns: comparison dataframe, one row per (database, query)
+    """
+    frames = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        databases = [(f"synthetic {size:,}", build_synthetic_database(os.path.join(tmp, f"bench_{size}.db"), size))
+                     for size in sizes]
+        for label, db_path in databases + [(path, path) for path in db_paths]:
+            frames.append(pd.DataFrame(profile_queries(db_path, repeat=repeat)).assign(database=label))
+    table = pd.concat(frames, ignore_index=True)
+    # queries side by side across databases
+    table['order'] = table['query'].map({name: i for i, name in enumerate(BENCH_QUERIES)})
+    table = table.sort_values(['order'], kind='stable').drop(columns='order')
+    return table[['query', 'database', 'full scan', 'uncached ms', 'cached ms', 'rows', 'cache', 'plan']]
+
+
+def add_arguments(parser):
+    """Arguments of the query benchmark (shared by 'python src/eda/sql_bench.py' and 'cli.py sql-bench')."""
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES, metavar='ROWS',
+                        help=f"Rows of the synthetic databases (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--db', action='append', default=[], metavar='PATH',
+                        help='Also profile an existing database (repeatable), e.g. data/SpaceX.db')
+    parser.add_argument('--repeat', type=int, default=3, help='Uncached runs per query, the best is kept (default: 3)')
+    parser.add_argument('--tablefmt', type=str, default='github', help="tabulate table format (default: github)")
+
+
+def run(args):
+    table = run_bench(sizes=args.sizes, db_paths=args.db, repeat=args.repeat)
+    print(tabulate(table, headers='keys', tablefmt=args.tablefmt, showindex=False, floatfmt='.3f'))
+    scanning = sorted(set(table.loc[table['full scan'] == 'yes', 'query']))
+    if scanning:
+        print(f"\nFull scans of {DEFAULT_TABLE}: {', '.join(scanning)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the predefined SQL queries on synthetic launch databases.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
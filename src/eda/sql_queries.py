@@ -2,26 +2,241 @@
 ## on the SpaceX launch dataset stored in a SQLite database.
 ### It provides reusable functions for querying data such as launch statistics,
 #### success rates, and booster version analysis.
+##### Queries go through a QueryService: pooled read-only connections, bound parameters,
+###### and an LRU cache of results invalidated whenever the database changes.
 ##### Author: SpaceY Project - Antoine Hocquet / IBM
 
+import os
+import queue
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 import pandas as pd
 from tabulate import tabulate
+from src.utils.create_db_from_csv import PAYLOAD_BIN_WIDTH
 
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CACHE_SIZE = 128 # query results kept in memory per database
 
-def run_query(database_path: str, query: str) -> pd.DataFrame:
+
+class QueryService:
+    """
+    Thread-safe access to a SQLite database for the EDA scripts and the dashboard.
+    Args:
+      database_path: path to the SQLite database file
+      pool_size: maximum number of read-only connections open at the same time
+      cache_size: maximum number of query results kept in memory (least recently used are dropped)
+    Results are cached by (query, parameters) and the cache is cleared when the database changes:
+    its file's inode, modification time or size, or SQLite's data_version (bumped by any commit).
+    """
+
+    def __init__(self, database_path, pool_size=DEFAULT_POOL_SIZE, cache_size=DEFAULT_CACHE_SIZE):
+        self.database_path = database_path
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._pool = queue.LifoQueue()
+        self._opened = 0
+        self._generation = 0 # bumped when the database file is replaced
+        self._lock = threading.Lock()
+        self._watch = None # connection only used to read data_version
+        self._version = None
+
+    # === Connections === #
+
+    def _connect(self):
+        uri = f"file:{os.path.abspath(self.database_path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a read-only connection from the pool (waits if pool_size connections are in use)."""
+        try:
+            generation, conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.pool_size
+                if can_open:
+                    self._opened += 1
+            generation, conn = (self._generation, self._connect()) if can_open else self._pool.get()
+        if generation != self._generation:
+            # opened before the database file was replaced: it still reads the old file
+            conn.close()
+            generation, conn = self._generation, self._connect()
+        try:
+            yield conn
+        finally:
+            self._pool.put((generation, conn))
+
+    def close(self):
+        """Close the idle pooled connections and clear the cache (connections are reopened on demand)."""
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    self._pool.get_nowait()[1].close()
+                    self._opened -= 1
+                except queue.Empty:
+                    break
+            if self._watch is not None:
+                self._watch.close()
+                self._watch = None
+            self._cache.clear()
+            self._version = None
+
+    # === Cache invalidation === #
+
+    def database_version(self):
+        """
+        Identity of the current database content: stats of the database file and data_version.
+        (The -wal file is not watched: readers create and touch it, and data_version covers commits.)
+        """
+        try:
+            stat = os.stat(self.database_path)
+            stats = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stats = None
+        if self._watch is None:
+            self._watch = self._connect()
+        data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        return stats, data_version
+
+    def _check_version(self):
+        """Clear the cache if the database changed since the last query (caller holds the lock)."""
+        version = self.database_version()
+        if version == self._version:
+            return
+        def inode(database_version):
+            return database_version[0] and database_version[0][0]
+
+        if self._version is not None and inode(version) != inode(self._version):
+            # the database file was replaced: connections opened on the old file are renewed
+            self._generation += 1
+            self._watch.close()
+            self._watch = None
+            version = self.database_version()
+        self._cache.clear()
+        self._version = version
+
+    # === Queries === #
+
+    def _cached_query(self, sql, params):
+        """Result of a query (cached, not copied) and whether it came from the cache."""
+        key = (sql, params)
+        with self._lock:
+            self._check_version()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached, True
+            self.misses += 1
+            version = self._version
+        with self.connection() as conn:
+            result = pd.read_sql_query(sql, conn, params=params)
+        with self._lock:
+            if self._version == version: # not cached if the database changed meanwhile
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result, False
+
+    def query(self, query, params=(), profile=False):
+        """
+        Execute a SQL query with bound parameters and return the result as a pandas DataFrame.
+        query may also be a (sql, params) tuple, as returned by the parameterized predefined queries.
+        The returned frame is a copy: callers may modify it without altering the cache.
+        With profile=True, returns (result, profile): see QueryProfile.
+        """
+        sql, params = split_query(query, params)
+        start = time.perf_counter()
+        result, hit = self._cached_query(sql, params)
+        result = result.copy()
+        if not profile:
+            return result
+        seconds = time.perf_counter() - start
+        return result, QueryProfile(sql=sql, params=params, plan=self.explain(sql, params), seconds=seconds,
+                                    rows=len(result), cache='hit' if hit else 'miss')
+
+    def explain(self, query, params=()):
+        """Details of the EXPLAIN QUERY PLAN of a query, e.g. ['SCAN SPACEXTBL', 'USE TEMP B-TREE FOR GROUP BY']."""
+        sql, params = split_query(query, params)
+        with self.connection() as conn:
+            return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql.strip().rstrip(';'), params)]
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+class QueryProfile:
+    """
+    Profile of one query run (see QueryService.query).
+    Args:
+      sql, params: the query
+      plan: details of its EXPLAIN QUERY PLAN
+      seconds: wall time, including the copy of the result
+      rows: number of rows returned
+      cache: 'hit' if the result came from the cache, 'miss' if the query ran
+    """
+
+    def __init__(self, sql, params, plan, seconds, rows, cache):
+        self.sql = sql
+        self.params = params
+        self.plan = plan
+        self.seconds = seconds
+        self.rows = rows
+        self.cache = cache
+
+    def __repr__(self):
+        return f"QueryProfile({self.cache}, {self.seconds * 1000:.3f} ms, {self.rows} rows, plan={self.plan!r})"
+
+    @property
+    def full_scans(self):
+        """Tables read entirely (SCAN steps of the plan; SCAN CONSTANT ROW reads no table)."""
+        return [detail.split()[1] for detail in self.plan
+                if detail.startswith('SCAN ') and not detail.startswith('SCAN CONSTANT ROW')]
+
+
+def split_query(query, params=()):
+    """(sql, params) of a query given as a SQL string or as a (sql, params) tuple."""
+    if isinstance(query, tuple):
+        return query[0], tuple(query[1])
+    return query, tuple(params)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_query_service(database_path):
+    """Return the QueryService shared by all callers of this database, creating it if needed."""
+    key = os.path.abspath(database_path)
+    with _services_lock:
+        if key not in _services:
+            _services[key] = QueryService(database_path)
+        return _services[key]
+
+
+def run_query(database_path: str, query, params=(), profile=False) -> pd.DataFrame:
     """
     Execute a SQL query and return the result as a pandas DataFrame.
     
     Parameters:
     - database_path (str): Path to the SQLite database file.
-    - query (str): SQL query to execute.
+    - query (str or tuple): SQL query to execute, or (sql, params) tuple.
+    - params (tuple): Values bound to the '?' placeholders of the query.
+    - profile (bool): Also return the QueryProfile of the run (plan, wall time, rows, cache hit/miss).
     
     Returns:
-    - pd.DataFrame: Query results.
+    - pd.DataFrame: Query results (served from the shared QueryService cache when possible),
+      or (pd.DataFrame, QueryProfile) with profile=True.
     """
-    with sqlite3.connect(database_path) as conn:
-        return pd.read_sql_query(query, conn)
+    return get_query_service(database_path).query(query, params, profile=profile)
 
 
 # === Predefined Queries === #
@@ -38,27 +253,30 @@ def get_unique_boosters():
     """
 
 
+# The aggregates below read the summary tables maintained with SPACEXTBL (see create_summaries in
+# src/utils/create_db_from_csv.py): one row per group, whatever the number of launches.
+# SUM and AVG keep their SQL meaning: NULL for a group without any value.
+
 def get_total_payload_by_site():
     return """
-    SELECT launch_site, SUM(payload_mass) AS total_payload
-    FROM SPACEXTBL
-    GROUP BY launch_site;
+    SELECT launch_site, CASE WHEN payload_count > 0 THEN total_payload END AS total_payload
+    FROM SPACEXTBL_by_launch_site
+    ORDER BY launch_site;
     """
 
 
 def get_successful_launches_by_site():
     return """
-    SELECT launch_site, SUM(class) AS successful_launches
-    FROM SPACEXTBL
-    GROUP BY launch_site;
+    SELECT launch_site, CASE WHEN class_count > 0 THEN successes END AS successful_launches
+    FROM SPACEXTBL_by_launch_site
+    ORDER BY launch_site;
     """
 
 
 def get_max_payload_site():
     return """
-    SELECT launch_site, MAX(payload_mass) AS max_payload
-    FROM SPACEXTBL
-    GROUP BY launch_site
+    SELECT launch_site, max_payload
+    FROM SPACEXTBL_by_launch_site
     ORDER BY max_payload DESC
     LIMIT 1;
     """
@@ -66,28 +284,45 @@ def get_max_payload_site():
 
 def get_avg_success_by_site():
     return """
-    SELECT launch_site, AVG(class) AS success_rate
-    FROM SPACEXTBL
-    GROUP BY launch_site
+    SELECT launch_site, CAST(successes AS REAL) / class_count AS success_rate
+    FROM SPACEXTBL_by_launch_site
     ORDER BY success_rate DESC;
     """
 
 
 def get_success_rate_by_booster():
     return """
-    SELECT booster_version, AVG(class) AS success_rate
-    FROM SPACEXTBL
-    GROUP BY booster_version
+    SELECT booster_version, CAST(successes AS REAL) / class_count AS success_rate
+    FROM SPACEXTBL_by_booster_version
     ORDER BY success_rate DESC;
     """
 
 
-def get_success_rate_by_payload_range(min_payload: float, max_payload: float):
+def get_launches_by_orbit():
+    return """
+    SELECT orbit, launches, CAST(successes AS REAL) / class_count AS success_rate
+    FROM SPACEXTBL_by_orbit
+    ORDER BY launches DESC;
+    """
+
+
+def get_payload_histogram():
+    """Launches and success rate per payload bin of PAYLOAD_BIN_WIDTH kg."""
     return f"""
+    SELECT bin * {PAYLOAD_BIN_WIDTH} AS min_payload, (bin + 1) * {PAYLOAD_BIN_WIDTH} AS max_payload,
+           launches, CAST(successes AS REAL) / class_count AS success_rate
+    FROM SPACEXTBL_payload_histogram
+    ORDER BY bin;
+    """
+
+
+def get_success_rate_by_payload_range(min_payload: float, max_payload: float):
+    """Returns: (sql, params) tuple; the payload bounds are bound parameters."""
+    return """
     SELECT payload_mass, class
     FROM SPACEXTBL
-    WHERE payload_mass BETWEEN {min_payload} AND {max_payload};
-    """
+    WHERE payload_mass BETWEEN ? AND ?;
+    """, (float(min_payload), float(max_payload))
 
 
 # Inspect the table schema (structure) with PRAGMA
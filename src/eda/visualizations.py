@@ -4,15 +4,15 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+from src.utils.dtypes import read_compact
 
 # Constants
 DATA_PATH = Path("data/spacex_launch_dash.csv")
-DOCS_PATH = Path("docs/eda_outputs")
-DOCS_PATH.mkdir(parents=True, exist_ok=True)
+DOCS_PATH = Path("docs/eda_outputs") # created by generate_all
 
 
 def load_data():
-    return pd.read_csv(DATA_PATH)
+    return read_compact(DATA_PATH, report=True)
 
 
 def plot_landing_distribution(df):
@@ -86,7 +86,7 @@ def extract_year_from_date(df):
     Args: df A dataframe with a date_utc column
     Returns: same dataframe with a year column
       """
-    df['year'] = df['date'].str.slice(0, 4)
+    df['year'] = df['date'].astype(str).str.slice(0, 4)
     return df
 
 
@@ -102,6 +102,7 @@ def plot_success_rate_vs_year(df):
 
 # ============================================================================
 def generate_all():
+    DOCS_PATH.mkdir(parents=True, exist_ok=True)
     df= load_data()
     plot_landing_distribution(df)
     plot_payload_vs_success(df)
@@ -0,0 +1,414 @@
+# src/etl.py
+# Runner of the ETL pipeline (collect-api, collect-web, clean-merge, create-db) as a DAG.
+# Each stage declares the files it reads and writes; a stage depends on the stages writing
+# its inputs. Stages are keyed by a hash of their command, code, config entries and inputs:
+# when the outputs recorded for that key are in the content-addressed store, the stage is
+# skipped: deleted outputs are restored from the store, and outputs written outside the runner
+# (e.g. 'make collect-api') are kept and recorded, so the stages downstream of them run again.
+# Independent stages (the two collectors) run in parallel.
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from src.utils.artifacts import DEFAULT_FORMAT, artifact_path
+from src.utils.config_loader import load_config
+from src.utils.instrumentation import LOG_LEVELS, configure_logging, get_logger, metrics
+
+logger = get_logger('etl')
+
+DEFAULT_STORE_DIR = "data/.etl_store"
+ETL_STORE_VERSION = 1 # bump when the stage keys change, to invalidate stored stages
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class StageFailed(RuntimeError):
+    """Raised when the command of a stage exits with a non-zero status."""
+
+
+class Stage:
+    """
+    One step of the pipeline.
+    Args:
+      name: name of the stage, e.g. 'clean_merge'
+      command: argv of the command running the stage (run from the repository root)
+      inputs: files read by the stage
+      outputs: files written by the stage
+      code: source files of the stage; the repository modules they import are added automatically
+      config_keys: entries of config.json the stage depends on
+    """
+
+    def __init__(self, name, command, inputs=(), outputs=(), code=(), config_keys=()):
+        self.name = name
+        self.command = list(command)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.config_keys = list(config_keys)
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+# === Hashing === #
+
+def module_dependencies(paths, root="."):
+    """
+    Source files of the given Python files and of the 'src.*' modules they import, recursively.
+    Returns: sorted list of paths relative to root
+    """
+    seen = set()
+    pending = [os.path.normpath(path) for path in paths]
+    while pending:
+        path = pending.pop()
+        if path in seen or not os.path.exists(os.path.join(root, path)):
+            continue
+        seen.add(path)
+        if not path.endswith('.py'):
+            continue
+        with open(os.path.join(root, path), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            for name in names:
+                if name.split('.')[0] != 'src':
+                    continue
+                module_path = os.path.join(*name.split('.'))
+                for candidate in (module_path + '.py', os.path.join(module_path, '__init__.py')):
+                    if os.path.exists(os.path.join(root, candidate)):
+                        pending.append(os.path.normpath(candidate))
+    return sorted(seen)
+
+
+class FileHasher:
+    """
+    sha256 of files, memoized by (size, modification time) in a JSON file,
+    so that unchanged files are not read again on the next run.
+    """
+
+    def __init__(self, memo_path=None):
+        self.memo_path = memo_path
+        self.memo = {}
+        self._lock = threading.Lock()
+        if memo_path and os.path.exists(memo_path):
+            try:
+                with open(memo_path, 'r') as f:
+                    self.memo = json.load(f)
+            except (OSError, ValueError):
+                self.memo = {}
+
+    def digest(self, path):
+        """Hex digest of the file content, or None if the file does not exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        signature = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            entry = self.memo.get(path)
+        if entry is not None and entry[:2] == signature:
+            return entry[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        with self._lock:
+            self.memo[path] = signature + [digest.hexdigest()]
+        return digest.hexdigest()
+
+    def save(self):
+        if not self.memo_path:
+            return
+        with self._lock:
+            tmp_path = f"{self.memo_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.memo, f)
+            os.replace(tmp_path, self.memo_path)
+
+
+def stage_key(stage, config, hasher):
+    """
+    Key of a stage: hash of its command, code, config entries and inputs.
+    Raises FileNotFoundError if an input is missing.
+    """
+    inputs = {}
+    for path in stage.inputs:
+        inputs[path] = hasher.digest(path)
+        if inputs[path] is None:
+            raise FileNotFoundError(f"Input {path} of stage {stage.name} does not exist")
+    description = {
+        'version': ETL_STORE_VERSION,
+        'name': stage.name,
+        'command': stage.command,
+        'code': {path: hasher.digest(path) for path in module_dependencies(stage.code)},
+        'config': {key: config.get(key) for key in stage.config_keys},
+        'inputs': inputs,
+    }
+    payload = json.dumps(description, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# === Content-addressed store === #
+
+class StageStore:
+    """
+    Directory holding the outputs of the stages that ran:
+    'objects/<digest>' files (one per distinct output content) and
+    'stages/<stage name>/<key>.json' manifests mapping output paths to digests.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        os.makedirs(os.path.join(store_dir, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(store_dir, 'stages'), exist_ok=True)
+        self.hasher = FileHasher(os.path.join(store_dir, 'file_hashes.json'))
+
+    def _object_path(self, digest):
+        return os.path.join(self.store_dir, 'objects', digest)
+
+    def _manifest_path(self, stage_name, key):
+        return os.path.join(self.store_dir, 'stages', stage_name, f"{key}.json")
+
+    def lookup(self, stage_name, key):
+        """Outputs recorded for this stage key ({path: digest}), or None if unknown or incomplete."""
+        try:
+            with open(self._manifest_path(stage_name, key), 'r') as f:
+                outputs = json.load(f)['outputs']
+        except (OSError, ValueError, KeyError):
+            return None
+        if not all(os.path.exists(self._object_path(digest)) for digest in outputs.values()):
+            return None
+        return outputs
+
+    def record(self, stage_name, key, paths):
+        """Copy the outputs of a stage that just ran into the store and write its manifest."""
+        outputs = {}
+        for path in paths:
+            digest = self.hasher.digest(path)
+            if digest is None:
+                raise FileNotFoundError(f"Stage {stage_name} did not write its output {path}")
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                tmp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.copyfile(path, tmp_path)
+                os.replace(tmp_path, object_path)
+            outputs[path] = digest
+        manifest_path = self._manifest_path(stage_name, key)
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(manifest_path, 'w') as f:
+            json.dump({'outputs': outputs, 'recorded_at': time.time()}, f, indent=1)
+        return outputs
+
+    def restore(self, outputs):
+        """
+        Copy back from the store the recorded outputs missing on disk
+        (existing files are never overwritten: they may be newer than the store).
+        Returns: number of restored files
+        """
+        restored = 0
+        for path, digest in outputs.items():
+            if os.path.exists(path):
+                continue
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(self._object_path(digest), tmp_path)
+            os.replace(tmp_path, path)
+            restored += 1
+        return restored
+
+
+# === Pipeline === #
+
+def stage_dependencies(stages):
+    """
+    Upstream stages of each stage: the ones writing its inputs.
+    Returns: dict mapping stage names to sets of stage names
+    """
+    writers = {}
+    for stage in stages:
+        for path in stage.outputs:
+            if path in writers:
+                raise ValueError(f"{path} is written by both {writers[path]} and {stage.name}")
+            writers[path] = stage.name
+    return {stage.name: {writers[path] for path in stage.inputs if path in writers} for stage in stages}
+
+
+def topological_order(stages):
+    """Stage names ordered so that every stage comes after its upstream stages."""
+    dependencies = stage_dependencies(stages)
+    order, done = [], set()
+    while len(order) < len(stages):
+        ready = [stage.name for stage in stages if stage.name not in done and dependencies[stage.name] <= done]
+        if not ready:
+            raise ValueError("The pipeline stages have a dependency cycle")
+        order.extend(ready)
+        done.update(ready)
+    return order
+
+
+def run_command(stage):
+    """Run the command of a stage from the current directory, with the repository on PYTHONPATH."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+    result = subprocess.run(stage.command, env=env)
+    if result.returncode != 0:
+        raise StageFailed(f"Stage {stage.name} failed with exit status {result.returncode}")
+
+
+def execute_stage(stage, config, store, force=False, runner=run_command):
+    """
+    Run a stage unless its outputs are stored for its current key.
+    Outputs changed outside the runner since they were stored are kept, and recorded for that key.
+    Returns: 'skipped', 'restored' (skipped, missing outputs copied back from the store),
+      'recorded' (skipped, outputs changed outside the runner recorded) or 'ran'
+    """
+    key = stage_key(stage, config, store.hasher)
+    outputs = None if force else store.lookup(stage.name, key)
+    if outputs is not None:
+        restored = store.restore(outputs)
+        changed = [path for path, digest in outputs.items() if store.hasher.digest(path) != digest]
+        metrics.incr('stages_skipped')
+        metrics.incr('outputs_restored', restored)
+        if changed:
+            store.record(stage.name, key, stage.outputs)
+            metrics.incr('outputs_recorded', len(changed))
+            logger.info(f"{stage.name}: up to date, keeping {', '.join(changed)} changed outside the pipeline")
+            return 'recorded'
+        logger.info(f"{stage.name}: up to date" + (f" ({restored} output(s) restored)" if restored else ""))
+        return 'restored' if restored else 'skipped'
+    logger.info(f"{stage.name}: running {' '.join(stage.command)}")
+    with metrics.timer(f"stage_{stage.name}"):
+        runner(stage)
+    store.record(stage.name, key, stage.outputs)
+    metrics.incr('stages_run')
+    return 'ran'
+
+
+def run_pipeline(stages, config, store_dir=DEFAULT_STORE_DIR, force=(), max_workers=4, runner=run_command):
+    """
+    Run the stages in dependency order, independent stages in parallel.
+    Args:
+      stages: list of Stage
+      config: configuration dict (see Stage.config_keys)
+      store_dir: directory of the content-addressed store
+      force: names of the stages to run even if they are up to date ('all' for every stage)
+      max_workers: maximum number of stages running at the same time
+      runner: function running the command of a stage
+    Returns: dict mapping stage names to 'ran', 'skipped', 'restored' or 'recorded' (see execute_stage)
+    Raises: StageFailed (after the running stages finished) if a stage failed
+    """
+    dependencies = stage_dependencies(stages)
+    topological_order(stages) # fails early on cycles
+    by_name = {stage.name: stage for stage in stages}
+    store = StageStore(store_dir)
+    statuses, running = {}, {}
+    failure = None
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                if failure is None:
+                    for name, stage in by_name.items():
+                        if name not in statuses and name not in running.values() and dependencies[name] <= statuses.keys():
+                            forced = 'all' in force or name in force
+                            future = executor.submit(execute_stage, stage, config, store, forced, runner)
+                            running[future] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        statuses[name] = future.result()
+                    except Exception as error:
+                        logger.error(f"{name}: {error}")
+                        failure = failure or error
+    finally:
+        store.hasher.save()
+    if failure is not None:
+        raise failure
+    return statuses
+
+
+def default_stages(config):
+    """Stages of the SpaceY ETL pipeline (same steps as 'make run-ETL')."""
+    fmt = config.get("artifact_format", DEFAULT_FORMAT)
+    output_dir = config["output_dir"]
+    api_data = artifact_path(os.path.join(output_dir, config["api_output_file"]), fmt)
+    web_data = artifact_path(os.path.join(output_dir, config["web_output_file"]), fmt)
+    launch_dash = artifact_path(os.path.join(output_dir, config["launch_dash_file"]), fmt)
+    python = sys.executable
+    return [
+        Stage('collect_api', [python, 'src/collect_api.py'],
+              outputs=[api_data, os.path.join(output_dir, config["api_state_file"])],
+              code=['src/collect_api.py'],
+              config_keys=['spacex_api_url', 'output_dir', 'api_output_file', 'api_state_file', 'artifact_format']),
+        Stage('collect_web', [python, 'src/collect_web.py'],
+              outputs=[web_data],
+              code=['src/collect_web.py'],
+              config_keys=['web_urls', 'web_url_1', 'web_url_2', 'web_parser', 'output_dir', 'web_output_file',
+                           'artifact_format']),
+        Stage('clean_merge', [python, 'src/clean_merge.py'],
+              inputs=[api_data, web_data], outputs=[launch_dash],
+              code=['src/clean_merge.py'],
+              config_keys=['output_dir', 'api_output_file', 'web_output_file', 'launch_dash_file', 'artifact_format']),
+        Stage('create_db', [python, 'src/utils/create_db_from_csv.py'],
+              inputs=[launch_dash], outputs=[os.path.join(output_dir, 'SpaceX.db')],
+              code=['src/utils/create_db_from_csv.py']),
+    ]
+
+
+def add_arguments(parser):
+    """Arguments of the pipeline runner (shared by 'python src/etl.py' and 'cli.py etl')."""
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        help="Run a stage even if it is up to date (repeatable; 'all' for every stage). "
+                             "Collectors are up to date once they ran: force them to collect new launches")
+    parser.add_argument('--offline', action='store_true',
+                        help='Run the collectors from the HTTP cache only, without network access')
+    parser.add_argument('--jobs', type=int, default=4, help='Maximum number of stages running in parallel (default: 4)')
+    parser.add_argument('--log-level', type=str, default='INFO', choices=LOG_LEVELS,
+                        help='Logging level (default: INFO)')
+    parser.add_argument('--json-summary', action='store_true',
+                        help='Print the final summary of counters and timers as JSON')
+
+
+def run(args):
+    configure_logging(args.log_level)
+    config = load_config()
+    stages = default_stages(config)
+    if args.offline:
+        for stage in stages:
+            if stage.name.startswith('collect_'):
+                stage.command.append('--offline')
+    unknown = set(args.force) - {stage.name for stage in stages} - {'all'}
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    with metrics.timer('pipeline'):
+        statuses = run_pipeline(stages, config, store_dir=config.get("etl_store_dir", DEFAULT_STORE_DIR),
+                                force=args.force, max_workers=args.jobs)
+    for name in topological_order(stages):
+        logger.info(f"{name}: {statuses[name]}")
+    print(metrics.summary(as_json=args.json_summary))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the SpaceY ETL pipeline, skipping up-to-date stages.")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -42,7 +42,8 @@ def preprocess_features(XX, categorical_cols = ['booster', 'orbit','launch_site'
 
 
 if __name__=='__main__':
-    X = pd.read_csv("data/spacex_launch_dash.csv")
+    from src.utils.dtypes import read_compact
+    X = read_compact("data/spacex_launch_dash.csv", report=True)
     XX=select_features(X)
     y= X['class']
     X_transformed, _ = preprocess_features(XX)
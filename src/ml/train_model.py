@@ -1,8 +1,8 @@
 # src/ml/train_model.py
-import pandas as pd
 import joblib
 import argparse
 from sklearn.model_selection import train_test_split
+from src.utils.dtypes import read_compact
 from src.ml.features import select_features, preprocess_features
 from src.ml.pipeline import create_pipeline
 from src.ml.model_evaluation import compute_accuracy, plot_confusion_matrix
@@ -18,7 +18,7 @@ def train_and_save_model(csv_file="spacex_launch_dash.csv",model_name="logistic"
     - model_path: str, path to store the trained model
     """
     # 1. Load Data
-    df = pd.read_csv("data/"+csv_file)
+    df = read_compact("data/"+csv_file, report=True)
     X_raw = select_features(df)
     y = df['class'].astype(float)  # pandas Series for binary classification (1 = success, 0 = fail)
 
@@ -0,0 +1,230 @@
+# src/utils/artifacts.py
+# Reading and writing the intermediate datasets handed from one ETL stage to the next.
+# Datasets are written as typed columnar files (Parquet or Feather, through pyarrow) with an
+# explicit schema, so that readers get the right dtypes back without re-parsing text, and can
+# load only the columns they need. CSV remains available ('artifact_format': 'csv' in config.json).
+
+import importlib.util
+import os
+import pandas as pd
+from src.utils.instrumentation import get_logger
+
+logger = get_logger('artifacts')
+
+ARTIFACT_FORMATS = ('parquet', 'feather', 'csv')
+EXTENSIONS = {'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv'}
+DEFAULT_FORMAT = 'parquet'
+DEFAULT_CHUNK_SIZE = 100_000 # rows per chunk when a dataset is streamed (iter_artifact, ArtifactWriter)
+NUMERIC_DTYPES = ('Int64', 'int64', 'float64')
+
+# Explicit schema of the launch datasets (columns absent from a dataset are ignored)
+LAUNCH_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'launch_site': 'category',
+    'orbit': 'category',
+    'booster_version': 'category',
+}
+
+
+def columnar_available():
+    """True if pyarrow (needed for Parquet and Feather files) is installed."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def artifact_path(path, fmt):
+    """
+    Path of a dataset in the given format, e.g. ('data/spacex_launch_dash.csv', 'parquet')
+    -> 'data/spacex_launch_dash.parquet'.
+    """
+    if fmt not in ARTIFACT_FORMATS:
+        raise ValueError(f"Unsupported artifact format: {fmt}")
+    return os.path.splitext(path)[0] + EXTENSIONS[fmt]
+
+
+def resolve_artifact(path):
+    """
+    Existing file holding the dataset 'path' refers to: the most recently written of its
+    Parquet, Feather and CSV versions (so that a stale copy in another format is never read).
+    Returns: path of the file, or None if the dataset was never written
+    """
+    candidates = [artifact_path(path, fmt) for fmt in ARTIFACT_FORMATS]
+    existing = [candidate for candidate in candidates if os.path.exists(candidate)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+
+def artifact_exists(path):
+    return resolve_artifact(path) is not None
+
+
+def apply_schema(df, schema=LAUNCH_SCHEMA):
+    """
+    Cast the columns of df listed in schema to their dtype
+    (text columns cast to a numeric dtype are parsed with pd.to_numeric).
+    Returns: the dataframe with converted columns
+    """
+    for column, dtype in schema.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if dtype.startswith('datetime64'):
+            df[column] = pd.to_datetime(df[column]).astype(dtype)
+        elif dtype in NUMERIC_DTYPES and not pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column]).astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def write_artifact(df, path, fmt=DEFAULT_FORMAT, schema=LAUNCH_SCHEMA):
+    """
+    Write a dataset with its schema applied.
+    Args:
+      df: pandas dataframe
+      path: path of the dataset; its extension is replaced by the one of fmt
+      fmt: 'parquet' (default), 'feather' or 'csv'
+      schema: dict mapping column names to dtypes
+    Returns: path of the written file
+    """
+    if fmt != 'csv' and not columnar_available():
+        logger.warning(f"pyarrow is not installed: writing {path} as csv instead of {fmt}")
+        fmt = 'csv'
+    output_path = artifact_path(path, fmt)
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    df = apply_schema(df.reset_index(drop=True), schema)
+    if fmt == 'parquet':
+        df.to_parquet(output_path, index=False)
+    elif fmt == 'feather':
+        df.to_feather(output_path)
+    else:
+        df.to_csv(output_path, index=False)
+    logger.info(f"Saved data to {output_path}")
+    return output_path
+
+
+def read_artifact(path, columns=None, schema=LAUNCH_SCHEMA):
+    """
+    Read a dataset written by write_artifact (or any csv), whatever its format.
+    Args:
+      path: path of the dataset (any extension, see resolve_artifact)
+      columns: optional list of the columns to load (the others are never read)
+      schema: dict mapping column names to dtypes, applied to csv files
+    Returns: pandas dataframe
+    """
+    resolved = resolve_artifact(path)
+    if resolved is None:
+        raise FileNotFoundError(f"No dataset found for {path}")
+    if resolved.endswith(EXTENSIONS['parquet']):
+        df = pd.read_parquet(resolved, columns=columns)
+    elif resolved.endswith(EXTENSIONS['feather']):
+        df = pd.read_feather(resolved, columns=columns)
+    else:
+        df = pd.read_csv(resolved, usecols=columns)
+    if columns is not None:
+        df = df[list(columns)]
+    return apply_schema(df, schema)
+
+
+# === Chunked reading and writing (datasets larger than memory) === #
+
+def iter_artifact(path, columns=None, chunk_size=DEFAULT_CHUNK_SIZE, schema=LAUNCH_SCHEMA):
+    """
+    Read a dataset chunk by chunk, so that only one chunk is held in memory at a time.
+    Args: same as read_artifact, plus chunk_size, the maximum number of rows per chunk
+    Returns: generator over pandas dataframes
+    """
+    resolved = resolve_artifact(path)
+    if resolved is None:
+        raise FileNotFoundError(f"No dataset found for {path}")
+    if resolved.endswith(EXTENSIONS['csv']):
+        for chunk in pd.read_csv(resolved, usecols=columns, chunksize=chunk_size):
+            yield apply_schema(chunk if columns is None else chunk[list(columns)], schema)
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if resolved.endswith(EXTENSIONS['parquet']):
+        batches = pq.ParquetFile(resolved).iter_batches(batch_size=chunk_size, columns=columns)
+    else:
+        # the file is memory-mapped: batches are only read from disk when converted
+        table = pa.ipc.open_file(pa.memory_map(resolved)).read_all()
+        if columns is not None:
+            table = table.select(list(columns))
+        batches = table.to_batches(max_chunksize=chunk_size)
+    for batch in batches:
+        yield apply_schema(pa.Table.from_batches([batch]).to_pandas(), schema)
+
+
+class ArtifactWriter:
+    """
+    Write a dataset chunk by chunk (context manager): each chunk passed to write() is appended
+    to the file, which only appears at its final path once the writer is closed without error.
+    Empty chunks are ignored, except the first one (which still creates a file with the columns).
+    The first chunk fixes the column types; categorical columns are written as plain text
+    (their categories differ from chunk to chunk) and typed again by the readers' schema.
+    Args: same as write_artifact
+    """
+
+    def __init__(self, path, fmt=DEFAULT_FORMAT, schema=LAUNCH_SCHEMA):
+        if fmt != 'csv' and not columnar_available():
+            logger.warning(f"pyarrow is not installed: writing {path} as csv instead of {fmt}")
+            fmt = 'csv'
+        self.fmt = fmt
+        self.schema = schema
+        self.path = artifact_path(path, fmt)
+        self.tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self.rows = 0
+        self._started = False
+        self._writer = None
+        self._arrow_schema = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return self
+
+    def write(self, df):
+        if self._started and df.empty:
+            return
+        df = apply_schema(df.reset_index(drop=True), self.schema)
+        if self.fmt == 'csv':
+            df.to_csv(self.tmp_path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        else:
+            self._write_arrow(df)
+        self._started = True
+        self.rows += len(df)
+
+    def _write_arrow(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            fields = []
+            for field in table.schema:
+                if pa.types.is_dictionary(field.type):
+                    field = field.with_type(field.type.value_type)
+                elif pa.types.is_null(field.type): # only missing values in the first chunk
+                    field = field.with_type(pa.large_string())
+                fields.append(field)
+            self._arrow_schema = pa.schema(fields, metadata=table.schema.metadata)
+            if self.fmt == 'parquet':
+                self._writer = pq.ParquetWriter(self.tmp_path, self._arrow_schema)
+            else:
+                self._writer = pa.ipc.new_file(self.tmp_path, self._arrow_schema)
+        table = table.cast(self._arrow_schema)
+        self._writer.write_table(table)
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self._writer is not None:
+            self._writer.close()
+        if exc_type is not None:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+            return False
+        if not self._started:
+            raise ValueError(f"Nothing was written to {self.path}")
+        os.replace(self.tmp_path, self.path)
+        logger.info(f"Saved {self.rows} rows to {self.path}")
+        return False
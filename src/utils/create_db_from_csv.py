@@ -1,18 +1,324 @@
-import pandas as pd
+# src/utils/create_db_from_csv.py
+# Builds the SQLite database queried by src/eda/sql_queries.py from the merged launch dataset.
+# The table has a typed schema with flight_number as primary key and indexes on the filtered and
+# grouped columns. Rows are bulk-loaded with executemany in a single transaction (WAL journal);
+# in upsert mode, only new or changed launches are written.
+# Summary tables (per launch site, booster version and orbit, plus a payload histogram) are built
+# with the table and kept up to date by triggers, so the EDA queries do not scan the launches.
+
+import argparse
 import sqlite3
+import pandas as pd
 from pathlib import Path
+from src.utils.dtypes import read_compact
+from src.utils.instrumentation import get_logger
+
+logger = get_logger('create_db')
+
+DEFAULT_TABLE = "SPACEXTBL"
+PRIMARY_KEY = "flight_number"
+INDEXED_COLUMNS = ['launch_site', 'booster_version', 'orbit', 'payload_mass']
+
+# SQL types of the columns of the merged launch dataset (other columns are typed from their dtype)
+LAUNCH_COLUMN_TYPES = {
+    'flight_number': 'INTEGER',
+    'booster': 'TEXT',
+    'payload_mass': 'REAL',
+    'outcome': 'TEXT',
+    'date': 'TEXT', # ISO 8601 date, e.g. '2010-06-04'
+    'longitude': 'REAL',
+    'latitude': 'REAL',
+    'reused': 'INTEGER', # booleans are stored as 0 / 1
+    'reused_count': 'INTEGER',
+    'serial': 'TEXT',
+    'landing_pad': 'TEXT',
+    'gridfins': 'INTEGER',
+    'legs': 'INTEGER',
+    'booster_version': 'TEXT',
+    'orbit': 'TEXT',
+    'launch_site': 'TEXT',
+    'launch_outcome': 'TEXT',
+    'customer': 'TEXT',
+    'class': 'INTEGER',
+}
+
+# columns with a summary table: <table>_by_<column>
+SUMMARY_COLUMNS = ['launch_site', 'booster_version', 'orbit']
+PAYLOAD_BIN_WIDTH = 1000 # kg, bins of the <table>_payload_histogram summary table
+
+# measures of the summary tables: contribution of one launch ({row}) to its group
+# (max_payload is maintained separately: removing the heaviest launch of a group needs a lookup)
+SUMMARY_MEASURES = {
+    'launches': "1",
+    'class_count': '{row}."class" IS NOT NULL',
+    'successes': 'COALESCE({row}."class", 0)',
+    'payload_count': "{row}.payload_mass IS NOT NULL",
+    'total_payload': "COALESCE({row}.payload_mass, 0)",
+}
+
+# applied to every connection writing the database
+WRITE_PRAGMAS = {
+    'journal_mode': 'WAL', # readers are not blocked while the database is (re)loaded
+    'synchronous': 'NORMAL', # safe with WAL, and no fsync at each transaction
+    'temp_store': 'MEMORY',
+    'cache_size': -64 * 1024, # in KiB: 64 MiB of page cache
+}
+
+
+def quote(name):
+    """SQL identifier (column names such as 'class' are keywords)."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sql_type(column, dtype):
+    if column in LAUNCH_COLUMN_TYPES:
+        return LAUNCH_COLUMN_TYPES[column]
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def connect_for_write(db_path):
+    """Connection to the database with WRITE_PRAGMAS applied; transactions are managed explicitly."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma, value in WRITE_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+
+def sql_values(df):
+    """
+    Rows of df as tuples of Python values that sqlite3 binds directly:
+    missing values become None, booleans 0 / 1, dates ISO 8601 text, categories their labels.
+    """
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            with_time = (series.dropna() != series.dropna().dt.normalize()).any()
+            series = series.dt.strftime('%Y-%m-%d %H:%M:%S' if with_time else '%Y-%m-%d')
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            series = series.astype('Int8')
+        elif pd.api.types.is_float_dtype(series.dtype):
+            series = series.astype('float64')
+        columns.append(series.astype(object).where(series.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+def create_table(conn, df, table_name=DEFAULT_TABLE):
+    """Create the table (typed schema, primary key on flight_number) if it does not exist."""
+    definitions = [
+        f"{quote(column)} {sql_type(column, df[column].dtype)}" + (" PRIMARY KEY" if column == PRIMARY_KEY else "")
+        for column in df.columns
+    ]
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {quote(table_name)} ({', '.join(definitions)})")
+
+
+def create_indexes(conn, table_name=DEFAULT_TABLE):
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({quote(table_name)})")}
+    for column in INDEXED_COLUMNS:
+        if column in existing:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {quote(f'idx_{table_name}_{column}')} "
+                         f"ON {quote(table_name)} ({quote(column)})")
+
+
+def summary_specs(table_name=DEFAULT_TABLE, columns=()):
+    """
+    Summary tables of a launch table having the given columns, as dicts with:
+      table: summary table name, key: its key column
+      key_sql: key of a launch ({row}), members_sql: condition selecting the launches of a group ({key})
+      filter_sql: condition on the launches counted at all ({row}), or None
+    """
+    if 'class' not in columns or 'payload_mass' not in columns:
+        return []
+    specs = [{
+        'table': f"{table_name}_by_{column}",
+        'key': column,
+        'key_sql': f"{{row}}.{quote(column)}",
+        'members_sql': f"{{row}}.{quote(column)} IS {{key}}",
+        'filter_sql': None,
+    } for column in SUMMARY_COLUMNS if column in columns]
+    specs.append({
+        'table': f"{table_name}_payload_histogram",
+        'key': 'bin', # payloads in [bin * PAYLOAD_BIN_WIDTH, (bin + 1) * PAYLOAD_BIN_WIDTH)
+        'key_sql': f"CAST({{row}}.payload_mass / {PAYLOAD_BIN_WIDTH} AS INTEGER)",
+        'members_sql': f"{{row}}.payload_mass >= {{key}} * {PAYLOAD_BIN_WIDTH} "
+                       f"AND {{row}}.payload_mass < ({{key}} + 1) * {PAYLOAD_BIN_WIDTH}",
+        'filter_sql': "{row}.payload_mass IS NOT NULL",
+    })
+    return specs
+
+
+def _summary_add(spec, row):
+    """Statements adding the launch {row} to its group of the summary table (creating the group if needed)."""
+    table, key = quote(spec['table']), spec['key_sql'].format(row=row)
+    where = f" AND {spec['filter_sql'].format(row=row)}" if spec['filter_sql'] else ""
+    increments = ', '.join(f"{name} = {name} + ({sql.format(row=row)})" for name, sql in SUMMARY_MEASURES.items())
+    values = ', '.join(sql.format(row=row) for sql in SUMMARY_MEASURES.values())
+    payload = f"{row}.payload_mass"
+    return [
+        f"UPDATE {table} SET {increments}, "
+        f"max_payload = COALESCE(MAX(max_payload, {payload}), max_payload, {payload}) "
+        f"WHERE {quote(spec['key'])} IS {key}{where};",
+        f"INSERT INTO {table} SELECT {key}, {values}, {payload} "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {quote(spec['key'])} IS {key}){where};",
+    ]
+
+
+def _summary_remove(spec, row, table_name):
+    """
+    Statements removing the launch {row} from its group of the summary table (dropping the group once empty).
+    The group's max_payload is looked up again (through the index on the group and payload columns)
+    only when the removed launch was the heaviest.
+    """
+    table, key = quote(spec['table']), spec['key_sql'].format(row=row)
+    where = f" AND {spec['filter_sql'].format(row=row)}" if spec['filter_sql'] else ""
+    decrements = ', '.join(f"{name} = {name} - ({sql.format(row=row)})" for name, sql in SUMMARY_MEASURES.items())
+    payload = f"{row}.payload_mass"
+    lookup = (f"SELECT MAX(launch.payload_mass) FROM {quote(table_name)} AS launch "
+              f"WHERE {spec['members_sql'].format(row='launch', key=key)}")
+    return [
+        f"UPDATE {table} SET {decrements}, "
+        f"max_payload = CASE WHEN {payload} IS NULL OR {payload} < max_payload THEN max_payload ELSE ({lookup}) END "
+        f"WHERE {quote(spec['key'])} IS {key}{where};",
+        f"DELETE FROM {table} WHERE {quote(spec['key'])} IS {key} AND launches = 0;",
+    ]
+
+
+def create_summaries(conn, table_name=DEFAULT_TABLE):
+    """
+    (Re)build the summary tables of the launch table from its rows, and the triggers keeping them up to date
+    when launches are inserted, updated or deleted. Runs in the caller's transaction.
+    Returns: names of the summary tables
+    """
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({quote(table_name)})")]
+    specs = summary_specs(table_name, columns)
+    for spec in specs:
+        table, key = quote(spec['table']), quote(spec['key'])
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        measures = ', '.join(f"{name} {'REAL' if name == 'total_payload' else 'INTEGER'} NOT NULL"
+                             for name in SUMMARY_MEASURES)
+        conn.execute(f"CREATE TABLE {table} ({key}, {measures}, max_payload REAL)")
+        conn.execute(f"CREATE UNIQUE INDEX {quote('idx_' + spec['table'])} ON {table} ({key})")
+        where = f" WHERE {spec['filter_sql'].format(row='launch')}" if spec['filter_sql'] else ""
+        totals = ', '.join(f"SUM({sql.format(row='launch')})" for sql in SUMMARY_MEASURES.values())
+        conn.execute(f"INSERT INTO {table} SELECT {spec['key_sql'].format(row='launch')} AS group_key, {totals}, "
+                     f"MAX(launch.payload_mass) FROM {quote(table_name)} AS launch{where} GROUP BY group_key")
+        if spec['key'] in columns:
+            # max_payload lookups of a group go through this index
+            index = quote(f"idx_{table_name}_{spec['key']}_payload")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {quote(table_name)} ({key}, payload_mass)")
+    for event in ('INSERT', 'DELETE', 'UPDATE'):
+        conn.execute(f"DROP TRIGGER IF EXISTS {quote(f'{table_name}_summaries_{event.lower()}')}")
+    if not specs:
+        return []
+
+    def trigger(event, when, statements):
+        body = ' '.join(statement for spec in specs for statement in statements(spec))
+        conn.execute(f"CREATE TRIGGER {quote(f'{table_name}_summaries_{event.lower()}')} AFTER {event} "
+                     f"ON {quote(table_name)} {when}BEGIN {body} END")
+
+    trigger('INSERT', "", lambda spec: _summary_add(spec, 'NEW'))
+    trigger('DELETE', "", lambda spec: _summary_remove(spec, 'OLD', table_name))
+    changed = ' OR '.join(f"OLD.{quote(column)} IS NOT NEW.{quote(column)}"
+                          for column in SUMMARY_COLUMNS + ['class', 'payload_mass'] if column in columns)
+    trigger('UPDATE', f"WHEN {changed} ",
+            lambda spec: _summary_remove(spec, 'OLD', table_name) + _summary_add(spec, 'NEW'))
+    return [spec['table'] for spec in specs]
+
+
+def summaries_exist(conn, table_name=DEFAULT_TABLE):
+    """True if the triggers maintaining the summary tables of the launch table exist."""
+    triggers = [f"{table_name}_summaries_{event}" for event in ('insert', 'delete', 'update')]
+    count = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (?, ?, ?)",
+                         triggers).fetchone()[0]
+    return count == len(triggers)
+
+
+def upsert_statement(columns, table_name=DEFAULT_TABLE):
+    """
+    INSERT of one row, updating the existing row with the same flight_number only if a value differs
+    (unchanged rows are not written at all).
+    """
+    names = ', '.join(quote(column) for column in columns)
+    placeholders = ', '.join('?' for _ in columns)
+    others = [column for column in columns if column != PRIMARY_KEY]
+    if not others:
+        return f"INSERT INTO {quote(table_name)} ({names}) VALUES ({placeholders}) ON CONFLICT DO NOTHING"
+    assignments = ', '.join(f"{quote(column)} = excluded.{quote(column)}" for column in others)
+    changed = ' OR '.join(f"{quote(table_name)}.{quote(column)} IS NOT excluded.{quote(column)}" for column in others)
+    return (f"INSERT INTO {quote(table_name)} ({names}) VALUES ({placeholders}) "
+            f"ON CONFLICT({quote(PRIMARY_KEY)}) DO UPDATE SET {assignments} WHERE {changed}")
+
+
+def load_launches(conn, df, table_name=DEFAULT_TABLE, mode="replace"):
+    """
+    Bulk-load launches into the table and its summary tables (see create_summaries), in a single transaction.
+    Args:
+      conn: connection from connect_for_write
+      df: launch dataframe (with a flight_number column)
+      mode: 'replace' rebuilds the table from df, 'upsert' inserts new launches and updates changed ones
+    Returns: number of rows written (inserted or updated)
+    """
+    if mode not in ("replace", "upsert"):
+        raise ValueError(f"Unknown load mode: {mode}")
+    if PRIMARY_KEY not in df.columns:
+        raise ValueError(f"The launch dataframe has no {PRIMARY_KEY} column")
+    duplicated = df[PRIMARY_KEY].duplicated(keep='last')
+    if duplicated.any():
+        logger.warning(f"{duplicated.sum()} duplicated flight numbers: keeping the last row of each")
+        df = df[~duplicated]
+    columns = list(df.columns)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if mode == "replace":
+            conn.execute(f"DROP TABLE IF EXISTS {quote(table_name)}")
+        create_table(conn, df, table_name)
+        # summaries of an existing table are maintained by its triggers, the others built after the insert
+        maintained = mode == "upsert" and summaries_exist(conn, table_name)
+        # rowcount (unlike total_changes) leaves out the rows written by the triggers
+        written = conn.executemany(upsert_statement(columns, table_name), sql_values(df)).rowcount
+        if not maintained:
+            create_summaries(conn, table_name)
+        # indexes are built after the bulk insert on a new table (faster than maintaining them row by row)
+        create_indexes(conn, table_name)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("PRAGMA optimize")
+    return written
+
+
+def create_database(csv_path: str, db_path: str, table_name=DEFAULT_TABLE, mode="replace"):
+    """
+    Load the launch dataset at csv_path (any artifact format) into the database at db_path.
+    Returns: number of rows written
+    """
+    df = read_compact(csv_path)
+    conn = connect_for_write(db_path)
+    try:
+        return load_launches(conn, df, table_name=table_name, mode=mode)
+    finally:
+        conn.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load the launch dataset into the SQLite database.")
+    parser.add_argument('--data', type=str, default="data/spacex_launch_dash.csv", help='Launch dataset')
+    parser.add_argument('--db', type=str, default="data/SpaceX.db", help='SQLite database file')
+    parser.add_argument('--upsert', action='store_true',
+                        help='Only insert new launches and update changed ones instead of rebuilding the table')
+    return parser.parse_args()
 
-def create_database(csv_path: str, db_path: str, table_name="SPACEXTBL"):
-    df = pd.read_csv(csv_path)
-    with sqlite3.connect(db_path) as conn:
-        df.to_sql(table_name, conn, if_exists="replace", index=False)
 
 if __name__ == '__main__':
-    csv_path = "data/spacex_launch_dash.csv"
-    db_path = "data/SpaceX.db"
-    
+    args = parse_args()
+
     # Create data folder if not exists
-    Path("data").mkdir(exist_ok=True)
+    Path(args.db).parent.mkdir(parents=True, exist_ok=True)
 
-    create_database(csv_path, db_path)
-    print(f"Database created at {db_path}")
+    written = create_database(args.data, args.db, mode="upsert" if args.upsert else "replace")
+    print(f"Database {'updated' if args.upsert else 'created'} at {args.db} ({written} rows written)")
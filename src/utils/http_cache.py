@@ -0,0 +1,275 @@
+# src/utils/http_cache.py
+# On-disk HTTP response cache shared by the API and web collectors.
+# Responses are keyed by method, URL and request body, expire after a TTL,
+# are revalidated with ETag / Last-Modified, and the cache is bounded in size
+# (least recently used entries are evicted first).
+# In offline mode, only cached responses are served and nothing touches the network.
+
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+
+DEFAULT_CACHE_DIR = "data/.http_cache"
+DEFAULT_TTL = 24 * 3600 # seconds before a cached response has to be revalidated
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class OfflineCacheMiss(RuntimeError):
+    """Raised in offline mode when a request has no cached response."""
+
+
+class CachedResponse:
+    """
+    Response served from the cache directory.
+    Mirrors the parts of requests.Response used by the collectors:
+    status_code, headers, content, text, json(), iter_content() and raise_for_status().
+    """
+
+    def __init__(self, url, body_path, meta, from_cache):
+        self.url = url
+        self.body_path = body_path
+        self.status_code = meta["status_code"]
+        self.headers = meta["headers"]
+        self.encoding = meta.get("encoding") or "utf-8"
+        self.from_cache = from_cache
+
+    @property
+    def content(self):
+        with open(self.body_path, "rb") as f:
+            return f.read()
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=64 * 1024):
+        with open(self.body_path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def raise_for_status(self):
+        # only successful responses are ever stored
+        return None
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache.
+    Args:
+      cache_dir: directory holding one '<key>.body' and one '<key>.json' file per response
+      ttl: seconds during which a cached response is served without contacting the server
+      max_bytes: maximum total size of cached bodies, enforced by LRU eviction
+      offline: if True, serve cached responses only (whatever their age) and never use the network
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._session = None
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # === Keys and paths === #
+
+    @staticmethod
+    def key(method, url, body=None):
+        """Cache key of a request: hash of its method, URL and (canonical JSON) body."""
+        payload = json.dumps([method.upper(), url, body], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".body", base + ".json"
+
+    def _load_meta(self, key):
+        body_path, meta_path = self._paths(key)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key, meta):
+        _, meta_path = self._paths(key)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _serve(self, url, key, meta):
+        """Return the cached response and mark it as recently used."""
+        body_path, _ = self._paths(key)
+        os.utime(body_path)
+        self.hits += 1
+        return CachedResponse(url, body_path, meta, from_cache=True)
+
+    # === Public API === #
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, json=None, **kwargs):
+        return self.request("POST", url, json=json, **kwargs)
+
+    def request(self, method, url, json=None, headers=None, **kwargs):
+        """
+        Send an HTTP request through the cache.
+        Fresh cached responses are served directly, stale ones are revalidated
+        with If-None-Match / If-Modified-Since, and successful responses are stored.
+        Returns: CachedResponse, or the requests.Response itself for unsuccessful responses
+        """
+        key = self.key(method, url, json)
+        meta = self._load_meta(key)
+
+        if self.offline:
+            if meta is None:
+                raise OfflineCacheMiss(f"No cached response for {method} {url} (offline mode)")
+            return self._serve(url, key, meta)
+
+        if meta is not None and time.time() - meta["stored_at"] < self.ttl:
+            return self._serve(url, key, meta)
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta["headers"].get("ETag"):
+                request_headers["If-None-Match"] = meta["headers"]["ETag"]
+            if meta["headers"].get("Last-Modified"):
+                request_headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        self.misses += 1
+        response = self.session.request(method, url, json=json, headers=request_headers, stream=True, **kwargs)
+        if response.status_code == 304 and meta is not None:
+            response.close()
+            meta["stored_at"] = time.time()
+            self._write_meta(key, meta)
+            return self._serve(url, key, meta)
+        if not response.ok:
+            return response
+        # the body is streamed to disk chunk by chunk, never held in memory as a whole
+        with response:
+            meta = self.store(method, url, response.iter_content(chunk_size=64 * 1024), headers=response.headers,
+                              status_code=response.status_code, body=json, encoding=response.encoding)
+        body_path, _ = self._paths(key)
+        return CachedResponse(url, body_path, meta, from_cache=False)
+
+    def store(self, method, url, content, headers=None, status_code=200, body=None, encoding=None):
+        """
+        Store a response in the cache (also used to seed the cache, e.g. for offline tests).
+        Args:
+          content: response body, as bytes or as an iterable of byte chunks
+        Returns: the metadata dict written next to the body
+        """
+        key = self.key(method, url, body)
+        body_path, _ = self._paths(key)
+        headers = headers or {}
+        meta = {
+            "method": method.upper(),
+            "url": url,
+            "status_code": status_code,
+            "headers": {name: headers[name] for name in ("Content-Type", "ETag", "Last-Modified") if name in headers},
+            "encoding": encoding,
+            "stored_at": time.time(),
+        }
+        if isinstance(content, bytes):
+            content = [content]
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        size = 0
+        with open(tmp_path, "wb") as f:
+            for chunk in content:
+                f.write(chunk)
+                size += len(chunk)
+        meta["size"] = size
+        with self._lock:
+            previous_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            os.replace(tmp_path, body_path)
+            self._write_meta(key, meta)
+            if self._total_bytes is not None:
+                self._total_bytes += size - previous_size
+            self._evict(keep=body_path)
+        return meta
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            for entry in os.scandir(self.cache_dir):
+                os.remove(entry.path)
+            self._total_bytes = 0
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    # === LRU eviction === #
+
+    def _evict(self, keep=None):
+        """
+        Delete least recently used entries until the cache fits in max_bytes (caller holds the lock).
+        The body at path 'keep' (the response being stored) is never evicted.
+        """
+        if self._total_bytes is None:
+            self._total_bytes = sum(
+                entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith(".body")
+            )
+        if self._total_bytes <= self.max_bytes:
+            return
+        entries = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+            for entry in os.scandir(self.cache_dir) if entry.name.endswith(".body")
+        )
+        for _, size, body_path in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            if body_path == keep:
+                continue
+            meta_path = body_path[: -len(".body")] + ".json"
+            for path in (body_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._total_bytes -= size
+
+
+# === Shared cache used by the collectors === #
+
+_default_cache = None
+
+
+def configure_cache(cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, offline=False):
+    """Create the response cache shared by collect_api and collect_web, and return it."""
+    global _default_cache
+    _default_cache = ResponseCache(cache_dir=cache_dir, ttl=ttl, max_bytes=max_bytes, offline=offline)
+    return _default_cache
+
+
+def configure_cache_from_config(config, offline=False):
+    """Configure the shared cache from the 'http_cache_*' entries of config.json."""
+    return configure_cache(
+        cache_dir=config.get("http_cache_dir", DEFAULT_CACHE_DIR),
+        ttl=config.get("http_cache_ttl_seconds", DEFAULT_TTL),
+        max_bytes=config.get("http_cache_max_mb", DEFAULT_MAX_BYTES // 2**20) * 2**20,
+        offline=offline,
+    )
+
+
+def get_cache():
+    """Return the shared response cache, creating one with default settings if needed."""
+    if _default_cache is None:
+        configure_cache()
+    return _default_cache
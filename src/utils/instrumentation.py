@@ -0,0 +1,100 @@
+# src/utils/instrumentation.py
+# Logging and lightweight metrics (counters and timers) for the ETL scripts.
+# Per-row details are logged at DEBUG level only; a compact summary of the
+# counters and timers is emitted at the end of a run (optionally as JSON).
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def get_logger(name):
+    """Logger of a SpaceY module, e.g. get_logger('collect_web')."""
+    return logging.getLogger(f"spacey.{name}")
+
+
+def configure_logging(level='INFO'):
+    """Send SpaceY logs to stderr at the given level ('DEBUG', 'INFO', 'WARNING' or 'ERROR')."""
+    logging.basicConfig(format=LOG_FORMAT, level=level.upper(), force=True)
+
+
+class Metrics:
+    """
+    Thread-safe counters and timers.
+    Counters are integers incremented with incr(); timers accumulate the number
+    of timed blocks, their total and their maximum duration (in seconds).
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name, seconds):
+        with self._lock:
+            timer = self.timers.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            timer['count'] += 1
+            timer['total'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Time the enclosed block under the given timer name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Picklable copy of the counters and timers (e.g. to send back from a worker process)."""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timers': {name: dict(timer) for name, timer in self.timers.items()},
+            }
+
+    def merge(self, snapshot):
+        """Add the counters and timers of a snapshot (e.g. from a worker process) to these ones."""
+        with self._lock:
+            for name, value in snapshot['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, other in snapshot['timers'].items():
+                timer = self.timers.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+                timer['count'] += other['count']
+                timer['total'] += other['total']
+                timer['max'] = max(timer['max'], other['max'])
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    def summary(self, as_json=False):
+        """
+        One-line summary of the counters and timers, e.g.
+        'rows_parsed=605 rows_skipped=31 | parse_table: 4 x 0.012s (max 0.020s, total 0.048s)'
+        """
+        snapshot = self.snapshot()
+        if as_json:
+            return json.dumps(snapshot, sort_keys=True)
+        counters = ' '.join(f"{name}={value}" for name, value in sorted(snapshot['counters'].items()))
+        timers = ' | '.join(
+            f"{name}: {timer['count']} x {timer['total'] / timer['count']:.3f}s "
+            f"(max {timer['max']:.3f}s, total {timer['total']:.3f}s)"
+            for name, timer in sorted(snapshot['timers'].items())
+        )
+        return ' | '.join(part for part in (counters, timers) if part)
+
+
+# Metrics of the current process, shared by the collectors
+metrics = Metrics()
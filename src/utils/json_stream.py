@@ -0,0 +1,48 @@
+# src/utils/json_stream.py
+# Incremental parsing of large JSON arrays, one element at a time.
+
+import codecs
+import json
+
+WHITESPACE_AND_COMMAS = ' \t\r\n,'
+DELIMITERS = WHITESPACE_AND_COMMAS + ']' # characters that may follow an element of the array
+
+
+def iter_json_array(chunks):
+    """
+    Parse a top-level JSON array incrementally and yield its elements one by one.
+    Only the element being decoded (plus one chunk) is held in memory, never the whole document.
+    Args:
+      chunks: iterable of bytes (e.g. response.iter_content())
+    Returns: generator over the decoded elements of the array
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    started = False
+    for chunk in chunks:
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE_AND_COMMAS:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break # element not complete yet: wait for the next chunk
+            if end == len(buffer) or buffer[end] not in DELIMITERS:
+                break # a number may continue in the next chunk: wait for its delimiter (',', ']' or whitespace)
+            pos = end
+            yield element
+    raise ValueError("Unexpected end of JSON array")
@@ -0,0 +1,59 @@
+# src/utils/table_store.py
+# Local store of parsed HTML tables, keyed by a fingerprint of their content.
+# Tables whose normalized HTML did not change since the last scrape are not parsed again:
+# their records are read back from the store instead.
+
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_STORE_DIR = "data/.table_store"
+TABLE_STORE_VERSION = 1 # bump when the extraction logic changes, to invalidate stored records
+
+
+def table_fingerprint(table_html, backend):
+    """
+    Fingerprint of a table: hash of its whitespace-normalized HTML, the parser backend
+    and TABLE_STORE_VERSION.
+    Args:
+      table_html: HTML of the table (str or bytes)
+      backend: name of the parser backend that extracts the records
+    Returns: hex digest (str)
+    """
+    if isinstance(table_html, bytes):
+        table_html = table_html.decode('utf-8', errors='replace')
+    normalized = ' '.join(table_html.split())
+    digest = hashlib.sha256(f"{TABLE_STORE_VERSION}:{backend}:".encode())
+    digest.update(normalized.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TableStore:
+    """
+    Directory of '<fingerprint>.json' files, each holding the records parsed from one table
+    (a dict mapping column names to lists of values).
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _path(self, fingerprint):
+        return os.path.join(self.store_dir, f"{fingerprint}.json")
+
+    def get(self, fingerprint):
+        """Records stored for this fingerprint, or None if the table was never parsed."""
+        try:
+            with open(self._path(fingerprint), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, fingerprint, records):
+        """Store the records parsed from the table with this fingerprint."""
+        path = self._path(fingerprint)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,67 @@
+# tests/conftest.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils import http_cache
+
+LAUNCH_SITES = ('CCAFS LC-40', 'KSC LC-39A', 'VAFB SLC-4E')
+BOOSTER_VERSIONS = ('v1.1', 'FT', 'B4', 'B5')
+ORBITS = ('LEO', 'GTO', 'ISS')
+OUTCOMES = (0, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def response_cache(tmp_path):
+    """Give every test its own empty HTTP response cache (never data/.http_cache)."""
+    cache = http_cache.configure_cache(cache_dir=str(tmp_path / "http_cache"))
+    yield cache
+    http_cache._default_cache = None
+
+
+@pytest.fixture
+def offline_cache(response_cache):
+    """HTTP response cache in offline replay mode: tests seed it with response_cache.store()."""
+    response_cache.offline = True
+    return response_cache
+
+
+@pytest.fixture
+def launches():
+    """
+    Factory of launch frames (flight_number, launch_site, booster_version, orbit, payload_mass, class):
+      launches(rows=300, sites=LAUNCH_SITES, boosters=BOOSTER_VERSIONS, orbits=ORBITS,
+               max_payload=9000.0, missing_payload=0.0, seed=0, **columns)
+    With a seed, sites, boosters, orbits, payloads (uniform up to max_payload, a missing_payload share
+    of them NaN) and outcomes are drawn at random; with seed=None, rows cycle through sites, boosters,
+    orbits and OUTCOMES, and payloads are 500, 1000, 1500, ... kg.
+    columns replace or add columns (values, or functions of the frame as in DataFrame.assign).
+    """
+    def make(rows=300, sites=LAUNCH_SITES, boosters=BOOSTER_VERSIONS, orbits=ORBITS, max_payload=9000.0,
+             missing_payload=0.0, seed=0, **columns):
+        def cycle(values):
+            return [values[i % len(values)] for i in range(rows)]
+
+        if seed is None:
+            df = pd.DataFrame({
+                'flight_number': np.arange(1, rows + 1),
+                'launch_site': cycle(sites),
+                'booster_version': cycle(boosters),
+                'orbit': cycle(orbits),
+                'payload_mass': 500.0 * np.arange(1, rows + 1),
+                'class': cycle(OUTCOMES),
+            })
+        else:
+            rng = np.random.default_rng(seed)
+            payload = rng.uniform(0, max_payload, rows).round(1)
+            payload[rng.random(rows) < missing_payload] = np.nan
+            df = pd.DataFrame({
+                'flight_number': np.arange(1, rows + 1),
+                'launch_site': rng.choice(list(sites), rows),
+                'booster_version': rng.choice(list(boosters), rows),
+                'orbit': rng.choice(list(orbits), rows),
+                'payload_mass': payload,
+                'class': rng.integers(0, 2, rows).astype('int8'),
+            })
+        return df.assign(**columns)
+    return make
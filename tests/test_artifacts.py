@@ -0,0 +1,53 @@
+import os
+import time
+import pandas as pd
+import pytest
+from src.utils.artifacts import artifact_path, read_artifact, resolve_artifact, write_artifact
+
+
+@pytest.fixture
+def launches(launches):
+    def make():
+        return launches(3, sites=['CCAFS SLC 40', 'CCAFS SLC 40', 'VAFB SLC 4E'], orbits=['LEO', 'LEO', 'ISS'],
+                        boosters=['F9 v1.0  B0003.1', 'F9 v1.0  B0004.1', 'F9 v1.0  B0005.1'], seed=None,
+                        date=['2010-06-04', '2010-12-08', '2012-05-22'], payload_mass=[0.0, 525.0, 500.0],
+                        **{'class': [0, 0, 1]})
+    return make
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'feather', 'csv'])
+def test_artifact_roundtrip_applies_schema(tmp_path, fmt, launches):
+    path = write_artifact(launches(), str(tmp_path / "launches.csv"), fmt=fmt)
+    assert path == artifact_path(str(tmp_path / "launches.csv"), fmt)
+
+    df = read_artifact(str(tmp_path / "launches.csv"))
+    assert str(df['date'].dtype) == 'datetime64[ns]'
+    for column in ('launch_site', 'orbit', 'booster_version'):
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+    assert df['payload_mass'].tolist() == [0.0, 525.0, 500.0]
+    assert df['launch_site'].astype(str).tolist() == launches()['launch_site'].tolist()
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'feather', 'csv'])
+def test_read_artifact_loads_requested_columns_only(tmp_path, fmt, launches):
+    write_artifact(launches(), str(tmp_path / "launches.csv"), fmt=fmt)
+    df = read_artifact(str(tmp_path / "launches.csv"), columns=['class', 'launch_site'])
+    assert list(df.columns) == ['class', 'launch_site']
+    assert df['class'].tolist() == [0, 0, 1]
+
+
+def test_read_artifact_picks_most_recent_format(tmp_path, launches):
+    path = str(tmp_path / "launches.csv")
+    write_artifact(launches(), path, fmt='csv')
+    newer = launches().assign(payload_mass=1.0)
+    parquet_path = write_artifact(newer, path, fmt='parquet')
+    later = time.time() + 10
+    os.utime(parquet_path, (later, later))
+
+    assert resolve_artifact(path) == parquet_path
+    assert read_artifact(path)['payload_mass'].tolist() == [1.0, 1.0, 1.0]
+
+
+def test_read_artifact_missing_dataset(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_artifact(str(tmp_path / "missing.csv"))
@@ -0,0 +1,128 @@
+import re
+import numpy as np
+import pandas as pd
+import pytest
+from src.clean_merge import (clean_api_data, clean_string_series, clean_web_data, create_class_attribute, load_data,
+                             merge_chunked, merge_launches, prepare_api_data, prepare_web_data, sort_merge_join)
+from src.collect_web import WEB_SCHEMA
+from src.utils.artifacts import apply_schema, read_artifact, write_artifact
+
+
+def test_clean_string_series_matches_per_row_re_sub():
+    series = pd.Series(['F9 v1.0[7]', 'F9 B5♺ B1060.2', None, 'é–x', 'F9 v1.0[7]', np.nan], index=[4, 2, 0, 1, 3, 5])
+    expected = series.apply(lambda x: re.sub(r'[^\w\s\.]', '', str(x)))
+    pd.testing.assert_series_equal(clean_string_series(series), expected)
+
+
+def test_clean_string_series_keeps_str_of_each_missing_value():
+    series = pd.Series(['a[1]', None, np.nan, pd.NA], dtype=object)
+    assert clean_string_series(series).tolist() == ['a1', 'None', 'nan', 'NA']
+
+
+def test_create_class_attribute_labels_bad_outcomes():
+    df = pd.DataFrame({'outcome': ['True ASDS', 'False ASDS', 'None None', None, 'True RTLS', 'False Ocean']})
+    assert create_class_attribute(df)['class'].tolist() == [1, 0, 0, 1, 1, 0]
+    assert df['class'].dtype == 'int64'
+
+
+def test_clean_api_data_fills_payload_without_touching_input():
+    df = pd.DataFrame({
+        'BoosterVersion': ['Falcon 1', 'Falcon 9', 'Falcon 9'],
+        'payload_mass': [20.0, np.nan, 500.0],
+        'date': ['2006-03-24', '2010-06-04', '2010-12-08'],
+    })
+    cleaned = clean_api_data(df)
+    assert cleaned['payload_mass'].tolist() == [500.0, 500.0]
+    assert str(cleaned['date'].dtype).startswith('datetime64')
+    assert df['payload_mass'].isna().sum() == 1
+    assert df['date'].tolist()[0] == '2006-03-24'
+
+
+def test_clean_web_data_strips_versions_and_unnamed_columns():
+    df = pd.DataFrame({'Unnamed: 0': [0, 1], 'Version Booster': ['F9 v1.0[7] ', 'F9 B4♺']})
+    cleaned = clean_web_data(df)
+    assert list(cleaned.columns) == ['Version Booster']
+    assert cleaned['Version Booster'].tolist() == ['F9 v1.07', 'F9 B4']
+    assert df['Version Booster'].tolist() == ['F9 v1.0[7] ', 'F9 B4♺']
+
+
+def api_frame(flight_numbers, seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(flight_numbers)
+    payload_mass = rng.uniform(0, 16000, n)
+    payload_mass[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame({
+        'flight_number': flight_numbers,
+        'BoosterVersion': rng.choice(['Falcon 1', 'Falcon 9'], n),
+        'payload_mass': payload_mass,
+        'outcome': rng.choice(['True ASDS', 'False ASDS', 'None None', 'True RTLS'], n),
+        'date': pd.Timestamp('2010-06-04') + pd.to_timedelta(np.arange(n) % 5000, unit='D'),
+        'longitude': rng.uniform(-120, -80, n),
+        'latitude': rng.uniform(28, 34, n),
+        'reused': pd.array(rng.choice([True, False], n), dtype='boolean'),
+        'reused_count': pd.array(rng.integers(0, 5, n), dtype='Int64'),
+        'serial': rng.choice(['B1049', 'B1060', None], n),
+        'landing_pad': rng.choice(['OCISLY', None], n),
+        'gridfins': pd.array(rng.choice([True, False], n), dtype='boolean'),
+        'legs': pd.array(rng.choice([True, False], n), dtype='boolean'),
+    })
+
+
+def web_frame(flight_numbers, seed=1):
+    rng = np.random.default_rng(seed)
+    n = len(flight_numbers)
+    return pd.DataFrame({
+        'Flight No.': pd.array(flight_numbers, dtype='Int64'),
+        'Launch site': rng.choice(['CCAFS', 'VAFB', 'KSC'], n),
+        'Payload': 'Starlink',
+        'Payload mass': '15,600 kg',
+        'Orbit': rng.choice(['LEO', 'GTO', 'ISS'], n),
+        'Customer': 'SpaceX',
+        'Launch outcome': 'Success',
+        'Version Booster': rng.choice(['F9 v1.0[7]', 'F9 B5♺', 'F9 FT'], n),
+        'Booster landing': 'Success',
+        'Date': '4 June 2010',
+        'Time': '18:45',
+    })
+
+
+def test_sort_merge_join_matches_merge_with_duplicate_keys():
+    rng = np.random.default_rng(3)
+    left = pd.DataFrame({'k': np.sort(rng.integers(0, 60, 200)), 'a': np.arange(200)})
+    right = pd.DataFrame({'k': np.sort(rng.integers(20, 90, 150)), 'b': np.arange(150)})
+
+    def chunks(df, size):
+        return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+    def merge(l, r):
+        return pd.merge(l, r, on='k')
+
+    expected = merge(left, right)
+    for left_size, right_size in [(7, 13), (1, 1), (500, 3), (50, 50)]:
+        joined = pd.concat(sort_merge_join(chunks(left, left_size), chunks(right, right_size), 'k', merge=merge),
+                           ignore_index=True)
+        pd.testing.assert_frame_equal(joined, expected)
+
+
+@pytest.mark.parametrize("fmt", ['parquet', 'feather', 'csv'])
+def test_merge_chunked_matches_in_memory_merge(tmp_path, fmt):
+    api_path, web_path = str(tmp_path / "api.csv"), str(tmp_path / "web.csv")
+    write_artifact(api_frame(np.repeat(np.arange(1, 301), 2)[::3]), api_path, fmt=fmt)
+    write_artifact(web_frame(np.arange(50, 400)), web_path, fmt=fmt, schema=WEB_SCHEMA)
+
+    df_api, df_web = load_data(api_path, web_path)
+    expected = create_class_attribute(merge_launches(prepare_api_data(df_api), prepare_web_data(df_web)))
+    expected = apply_schema(expected)
+
+    writer = merge_chunked(api_path, web_path, str(tmp_path / "dash.csv"), fmt=fmt, chunk_size=17)
+    assert writer.rows == len(expected)
+    result = read_artifact(str(tmp_path / "dash.csv"))
+    # the payload mean is summed chunk by chunk: floats may differ in the last digits
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, check_dtype=False, check_categorical=False)
+
+
+def test_merge_chunked_rejects_unsorted_input(tmp_path):
+    write_artifact(api_frame([3, 1, 2]), str(tmp_path / "api.csv"))
+    write_artifact(web_frame([1, 2, 3]), str(tmp_path / "web.csv"), schema=WEB_SCHEMA)
+    with pytest.raises(ValueError, match="not sorted"):
+        merge_chunked(str(tmp_path / "api.csv"), str(tmp_path / "web.csv"), str(tmp_path / "dash.csv"))
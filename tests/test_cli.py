@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import pytest
+import cli
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('sklearn', 'dash', 'plotly', 'matplotlib', 'seaborn', 'pandas', 'numpy', 'scipy')
+IMPORT_BUDGET_US = 100_000 # import time of 'cli.py --help' beyond interpreter startup, in microseconds (~10 ms here)
+
+
+def run_python(args, cwd=REPO_ROOT):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+
+def imported_modules(importtime_output):
+    """
+    {module: cumulative import time in microseconds} from the stderr of 'python -X importtime'.
+    Nested imports (included in the time of their parent) keep their leading spaces.
+    """
+    modules = {}
+    for line in importtime_output.splitlines():
+        fields = line.split(':', 1)[1].split('|') if line.startswith('import time:') else []
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            modules[fields[2][1:].rstrip()] = int(fields[1])
+    return modules
+
+
+def test_help_imports_no_heavy_stack():
+    result = run_python(['-X', 'importtime', 'cli.py', '--help'])
+    assert 'sql-bench' in result.stdout
+    modules = imported_modules(result.stderr)
+    assert not [name for name in modules if name.strip().split('.')[0] in HEAVY_MODULES]
+    startup = imported_modules(run_python(['-X', 'importtime', '-c', 'pass']).stderr)
+    total = sum(time for name, time in modules.items() if not name.startswith(' ') and name not in startup)
+    assert total < IMPORT_BUDGET_US
+
+
+def test_only_the_invoked_subcommand_registers_its_arguments(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'src.eda.sql_bench', raising=False)
+    args = cli.build_parser(['train', '--model', 'svm']).parse_args(['train', '--model', 'svm'])
+    assert args.func is cli.run_train and args.model == 'svm'
+    assert 'src.eda.sql_bench' not in sys.modules
+    with pytest.raises(SystemExit):
+        cli.build_parser(['train']).parse_args(['train', '--jobs', '2']) # an etl argument
+
+
+def test_importing_visualizations_creates_no_directory(tmp_path):
+    (tmp_path / "cwd").mkdir()
+    run_python(['-c', 'import src.eda.visualizations'], cwd=tmp_path / "cwd")
+    assert list((tmp_path / "cwd").iterdir()) == []
@@ -1,8 +1,209 @@
 # tests/test_collect_api.py
 
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pandas as pd
+import pytest
+from src import collect_api
 from src.collect_api import fetch_spacex_launch_data
+from src.utils.json_stream import iter_json_array
 
-def test_api_columns_exist():
-    df = fetch_spacex_launch_data("https://api.spacexdata.com/v4/launches")
+def test_api_columns_exist(offline_cache):
+    api_url = "https://api.spacexdata.com/v4/launches"
+    offline_cache.store("GET", api_url, json.dumps(STUB_LAUNCHES).encode())
+    df = fetch_spacex_launch_data(api_url)
     required_columns = {'rocket', 'payloads', 'launchpad', 'cores', 'flight_number', 'date_utc'}
     assert required_columns.issubset(df.columns), f"Missing columns: {required_columns - set(df.columns)}"
+
+
+def _fake_fetch_resource(calls):
+    def fetch(resource, resource_id, session=None):
+        calls.append((resource, resource_id))
+        return {'name': f"{resource}-{resource_id}"}
+    return fetch
+
+
+def test_fetch_unique_resources_fetches_each_id_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(collect_api, 'fetch_resource', _fake_fetch_resource(calls))
+    resources = collect_api.fetch_unique_resources('rockets', ['a', 'b', 'a', None, 'b', 'a'])
+    assert sorted(calls) == [('rockets', 'a'), ('rockets', 'b')]
+    assert resources == {'a': {'name': 'rockets-a'}, 'b': {'name': 'rockets-b'}}
+
+
+def test_get_booster_version_broadcasts_to_rows(monkeypatch):
+    calls = []
+    monkeypatch.setattr(collect_api, 'fetch_resource', _fake_fetch_resource(calls))
+    data = pd.DataFrame({'rocket': ['r1', 'r2', 'r1', 'r1']}, index=[3, 5, 8, 9])
+    booster_version = collect_api.get_booster_version(data)
+    assert list(booster_version.index) == [3, 5, 8, 9]
+    assert list(booster_version['BoosterVersion']) == ['rockets-r1', 'rockets-r2', 'rockets-r1', 'rockets-r1']
+    assert len(calls) == 2
+
+
+# === Local stub of the SpaceX v4 API === #
+
+STUB_ROCKETS = {'r9': {'id': 'r9', 'name': 'Falcon 9'}}
+STUB_LAUNCHPADS = {'lp1': {'id': 'lp1', 'name': 'CCSFS SLC 40', 'longitude': -80.577, 'latitude': 28.561}}
+STUB_PAYLOADS = {
+    'p1': {'id': 'p1', 'mass_kg': 525, 'orbit': 'LEO'},
+    'p2': {'id': 'p2', 'mass_kg': None, 'orbit': 'ISS'},
+    'p3': {'id': 'p3', 'mass_kg': 4000, 'orbit': 'GTO'},
+    'p4': {'id': 'p4', 'mass_kg': 100, 'orbit': 'LEO'},
+}
+STUB_CORES = {'c1': {'id': 'c1', 'block': 1, 'reuse_count': 0, 'serial': 'B0003'}}
+
+
+def _stub_core(core_id, landing_success=None, landing_type=None):
+    return {'core': core_id, 'flight': 1, 'gridfins': False, 'legs': False, 'reused': False,
+            'landing_attempt': False, 'landing_success': landing_success,
+            'landing_type': landing_type, 'landpad': None}
+
+
+STUB_LAUNCHES = [
+    {'flight_number': 1, 'date_utc': '2010-06-04T18:45:00.000Z', 'rocket': 'r9', 'launchpad': 'lp1',
+     'payloads': ['p1'], 'cores': [_stub_core('c1')]},
+    {'flight_number': 2, 'date_utc': '2010-12-08T15:43:00.000Z', 'rocket': 'r9', 'launchpad': 'lp1',
+     'payloads': ['p2'], 'cores': [_stub_core(None, True, 'Ocean')]},
+    {'flight_number': 3, 'date_utc': '2018-02-06T20:45:00.000Z', 'rocket': 'r9', 'launchpad': 'lp1',
+     'payloads': ['p3'], 'cores': [_stub_core('c1'), _stub_core(None), _stub_core(None)]},
+    {'flight_number': 4, 'date_utc': '2012-05-22T07:44:00.000Z', 'rocket': 'r9', 'launchpad': 'lp1',
+     'payloads': ['p3'], 'cores': [_stub_core('c1', False, 'ASDS')]},
+    {'flight_number': 5, 'date_utc': '2023-01-03T14:56:00.000Z', 'rocket': 'r9', 'launchpad': 'lp1',
+     'payloads': ['p4'], 'cores': [_stub_core('c1', True, 'RTLS')]},
+]
+
+
+def _populate(launch):
+    launch = json.loads(json.dumps(launch))
+    launch['rocket'] = {'name': STUB_ROCKETS[launch['rocket']]['name'], 'id': launch['rocket']}
+    pad = STUB_LAUNCHPADS[launch['launchpad']]
+    launch['launchpad'] = {k: pad[k] for k in ('name', 'longitude', 'latitude', 'id')}
+    launch['payloads'] = [STUB_PAYLOADS[p] for p in launch['payloads']]
+    for core in launch['cores']:
+        core['core'] = STUB_CORES[core['core']] if core['core'] else None
+    return launch
+
+
+class StubSpaceXHandler(BaseHTTPRequestHandler):
+    posts = 0
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        _, resource, *rest = self.path.split('/')
+        if resource == 'launches':
+            return self._send_json(STUB_LAUNCHES)
+        tables = {'rockets': STUB_ROCKETS, 'launchpads': STUB_LAUNCHPADS,
+                  'payloads': STUB_PAYLOADS, 'cores': STUB_CORES}
+        return self._send_json(tables[resource][rest[0]])
+
+    def do_POST(self):
+        StubSpaceXHandler.posts += 1
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        query, options = body['query'], body['options']
+        docs = [
+            launch for launch in STUB_LAUNCHES
+            if launch['date_utc'] < query['date_utc']['$lt']
+            and len(launch['cores']) == 1 and len(launch['payloads']) == 1
+            and launch['flight_number'] >= query.get('flight_number', {}).get('$gte', 0)
+        ]
+        docs.sort(key=lambda launch: launch['flight_number'])
+        page, limit = options['page'], options['limit']
+        page_docs = docs[(page - 1) * limit: page * limit]
+        has_next = page * limit < len(docs)
+        self._send_json({'docs': [_populate(d) for d in page_docs], 'totalDocs': len(docs),
+                         'page': page, 'hasNextPage': has_next, 'nextPage': page + 1 if has_next else None})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    server = HTTPServer(('127.0.0.1', 0), StubSpaceXHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(collect_api, 'API_BASE_URL', base_url)
+    StubSpaceXHandler.posts = 0
+    yield base_url
+    server.shutdown()
+
+
+def test_query_mode_paginates_and_matches_rest_schema(stub_api):
+    df_query = collect_api.collect_launches_query(f"{stub_api}/launches/query", page_size=2)
+    df_rest = collect_api.collect_launches_rest(f"{stub_api}/launches")
+    assert StubSpaceXHandler.posts == 2
+    assert list(df_query.columns) == collect_api.API_COLUMNS
+    assert list(df_rest.columns) == collect_api.API_COLUMNS
+    pd.testing.assert_frame_equal(
+        df_query.reset_index(drop=True).astype(str),
+        df_rest.sort_values('flight_number').reset_index(drop=True).astype(str),
+    )
+
+
+def test_incremental_collection_only_enriches_recent_launches(stub_api, monkeypatch):
+    calls = []
+    fetch = collect_api.fetch_resource
+    monkeypatch.setattr(collect_api, 'fetch_resource', lambda resource, resource_id: calls.append(resource) or fetch(resource, resource_id))
+    df_rest = collect_api.collect_launches_rest(f"{stub_api}/launches", min_flight_number=4)
+    df_query = collect_api.collect_launches_query(f"{stub_api}/launches/query", min_flight_number=4)
+    assert list(df_rest['flight_number']) == [4]
+    assert list(df_query['flight_number']) == [4]
+    assert calls.count('payloads') == 1
+
+
+def test_upsert_launches_replaces_recollected_rows():
+    existing = pd.DataFrame({'flight_number': [1, 2, 3], 'orbit': ['LEO', 'ISS', 'GTO']})
+    new = pd.DataFrame({'flight_number': [3, 4], 'orbit': ['PO', 'SSO']})
+    df = collect_api.upsert_launches(existing, new)
+    assert list(df['flight_number']) == [1, 2, 3, 4]
+    assert list(df['orbit']) == ['LEO', 'ISS', 'PO', 'SSO']
+
+
+def test_high_water_mark_roundtrip(tmp_path):
+    state_path = str(tmp_path / 'state.json')
+    assert collect_api.load_high_water_mark(state_path) is None
+    df = pd.DataFrame({'flight_number': [1, 7, 3], 'date_utc': ['2010-06-04', '2012-05-22', '2010-12-08']})
+    collect_api.save_high_water_mark(df, state_path)
+    assert collect_api.load_high_water_mark(state_path) == {'flight_number': 7, 'date_utc': '2012-05-22'}
+
+
+def test_iter_json_array_handles_elements_split_across_chunks():
+    launches = STUB_LAUNCHES + [{'name': 'Démo "stage" ✓', 'values': [1, 2.5, None, True]}]
+    raw = json.dumps(launches, ensure_ascii=False).encode()
+    chunks = (raw[i:i + 7] for i in range(0, len(raw), 7))
+    assert list(iter_json_array(chunks)) == launches
+
+
+def test_iter_json_array_waits_for_the_end_of_a_split_number():
+    assert list(iter_json_array([b'[12', b'34, 5', b'6.', b'5e', b'1]'])) == [1234, 565.0]
+    assert list(iter_json_array([b'[1', b'2', b'3]'])) == [123]
+
+
+def test_fetch_launch_data_streams_and_filters(offline_cache):
+    api_url = "https://api.spacexdata.com/v4/launches"
+    offline_cache.store("GET", api_url, json.dumps(STUB_LAUNCHES).encode())
+    df = fetch_spacex_launch_data(api_url)
+    assert list(df['flight_number']) == [1, 2, 4]
+    assert list(df['payloads']) == ['p1', 'p2', 'p3']
+    assert df['cores'].iloc[2]['landing_type'] == 'ASDS'
+    assert str(df['date'].iloc[0]) == '2010-06-04'
+
+
+def test_extract_core_columns_matches_per_row_formatting():
+    cores = pd.Series([launch['cores'][0] for launch in STUB_LAUNCHES], index=range(10, 15))
+    columns = collect_api.extract_core_columns(cores)
+    assert list(columns.index) == list(range(10, 15))
+    assert list(columns['outcome']) == [f"{core['landing_success']} {core['landing_type']}" for core in cores]
+    assert list(columns['core'].isna()) == [False, True, False, False, False]
+    assert list(columns['flights']) == [1] * 5
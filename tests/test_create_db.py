@@ -0,0 +1,118 @@
+import sqlite3
+import pandas as pd
+import pytest
+from src.utils.artifacts import write_artifact
+from src.utils.create_db_from_csv import connect_for_write, create_database, load_launches
+
+
+@pytest.fixture
+def launches(launches):
+    def make():
+        """Three launches, the last one without payload mass."""
+        return launches(3, sites=['CCAFS SLC 40', 'CCAFS SLC 40', 'VAFB SLC 4E'], orbits=['LEO', 'LEO', 'ISS'],
+                        boosters=['F9 v1.0  B0003.1', 'F9 v1.0  B0004.1', 'F9 v1.0  B0005.1'], seed=None,
+                        date=pd.to_datetime(['2010-06-04', '2010-12-08', '2012-05-22']),
+                        launch_site=lambda df: pd.Categorical(df['launch_site']),
+                        payload_mass=pd.Series([0.0, 525.0, None], dtype='float32'),
+                        reused=pd.array([False, True, None], dtype='boolean'),
+                        **{'class': pd.Series([0, 0, 1], dtype='int8')})
+    return make
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect_for_write(str(tmp_path / "SpaceX.db"))
+    yield conn
+    conn.close()
+
+
+def test_replace_builds_typed_table_with_indexes(conn, launches):
+    assert load_launches(conn, launches()) == 3
+    columns = {row[1]: (row[2], row[5]) for row in conn.execute('PRAGMA table_info("SPACEXTBL")')}
+    assert columns['flight_number'] == ('INTEGER', 1) # primary key
+    assert columns['payload_mass'][0] == 'REAL' and columns['date'][0] == 'TEXT'
+    indexes = {row[1] for row in conn.execute('PRAGMA index_list("SPACEXTBL")')}
+    assert {f'idx_SPACEXTBL_{column}' for column in ('launch_site', 'booster_version', 'orbit', 'payload_mass')} <= indexes
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert conn.execute('SELECT date, reused, payload_mass FROM SPACEXTBL ORDER BY flight_number').fetchall() == [
+        ('2010-06-04', 0, 0.0), ('2010-12-08', 1, 525.0), ('2012-05-22', None, None)]
+
+
+def test_filters_use_indexes(conn, launches):
+    load_launches(conn, launches())
+    plan = ' '.join(row[3] for row in conn.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM SPACEXTBL WHERE launch_site = ?', ('VAFB SLC 4E',)))
+    assert 'idx_SPACEXTBL_launch_site' in plan
+
+
+def test_upsert_only_writes_new_and_changed_rows(conn, launches):
+    load_launches(conn, launches())
+    update = launches()
+    update.loc[1, 'orbit'] = 'GTO'
+    update = pd.concat([update, launches().iloc[[2]].assign(flight_number=4)], ignore_index=True)
+    assert load_launches(conn, update, mode='upsert') == 2 # flight 2 updated, flight 4 inserted
+    assert load_launches(conn, update, mode='upsert') == 0
+    rows = conn.execute('SELECT flight_number, orbit FROM SPACEXTBL ORDER BY flight_number').fetchall()
+    assert rows == [(1, 'LEO'), (2, 'GTO'), (3, 'ISS'), (4, 'ISS')]
+
+
+def test_replace_rebuilds_the_table(conn, launches):
+    load_launches(conn, launches())
+    load_launches(conn, launches().iloc[:1])
+    assert conn.execute('SELECT COUNT(*) FROM SPACEXTBL').fetchone()[0] == 1
+
+
+def test_failed_load_keeps_previous_rows(conn, launches):
+    load_launches(conn, launches())
+    with pytest.raises(sqlite3.Error):
+        load_launches(conn, launches().assign(flight_number=['a', 'b', 'c'])) # not integers: datatype mismatch
+    assert conn.execute('SELECT COUNT(*) FROM SPACEXTBL').fetchone()[0] == 3
+
+
+def test_create_database_from_artifact(tmp_path, launches):
+    write_artifact(launches(), str(tmp_path / "launches.csv"))
+    assert create_database(str(tmp_path / "launches.csv"), str(tmp_path / "SpaceX.db")) == 3
+    with sqlite3.connect(str(tmp_path / "SpaceX.db")) as conn:
+        assert conn.execute('SELECT SUM(class) FROM SPACEXTBL').fetchone()[0] == 1
+
+
+def summary_rows(conn, table):
+    return conn.execute(f'SELECT * FROM "{table}" ORDER BY 1').fetchall()
+
+
+def grouped_rows(conn, key):
+    return conn.execute(
+        f'SELECT {key} AS k, COUNT(*), COUNT("class"), TOTAL("class"), COUNT(payload_mass), TOTAL(payload_mass), '
+        f'MAX(payload_mass) FROM SPACEXTBL {"WHERE payload_mass IS NOT NULL" if "CAST" in key else ""} '
+        f'GROUP BY k ORDER BY k').fetchall()
+
+
+def assert_summaries_match(conn):
+    for column in ('launch_site', 'booster_version', 'orbit'):
+        assert summary_rows(conn, f'SPACEXTBL_by_{column}') == pytest.approx(grouped_rows(conn, column))
+    assert summary_rows(conn, 'SPACEXTBL_payload_histogram') == pytest.approx(
+        grouped_rows(conn, 'CAST(payload_mass / 1000 AS INTEGER)'))
+
+
+def test_summaries_are_built_and_maintained(conn, launches):
+    load_launches(conn, launches())
+    assert summary_rows(conn, 'SPACEXTBL_by_launch_site') == [
+        ('CCAFS SLC 40', 2, 2, 0, 2, 525.0, 525.0), ('VAFB SLC 4E', 1, 1, 1, 0, 0.0, None)]
+    assert_summaries_match(conn)
+    update = launches()
+    update.loc[1, ['launch_site', 'payload_mass', 'class']] = ['VAFB SLC 4E', 2500.0, 1] # heaviest launch moves
+    update = pd.concat([update, launches().iloc[[0]].assign(flight_number=4, payload_mass=9000.0)], ignore_index=True)
+    assert load_launches(conn, update, mode='upsert') == 2
+    assert_summaries_match(conn)
+    conn.execute('DELETE FROM SPACEXTBL WHERE flight_number IN (1, 4)')
+    assert_summaries_match(conn)
+    assert [row[0] for row in summary_rows(conn, 'SPACEXTBL_by_launch_site')] == ['VAFB SLC 4E'] # empty group dropped
+
+
+def test_upsert_builds_missing_summaries(conn, launches):
+    load_launches(conn, launches())
+    for event in ('insert', 'delete', 'update'): # as in a database built without summaries
+        conn.execute(f'DROP TRIGGER SPACEXTBL_summaries_{event}')
+    conn.execute('DROP TABLE SPACEXTBL_by_orbit')
+    load_launches(conn, launches().assign(flight_number=[5, 6, 7]), mode='upsert')
+    assert_summaries_match(conn)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from src.utils.artifacts import write_artifact
+from src.utils.dtypes import memory_report, optimize_dtypes, plan_dtypes, read_compact
+
+
+def launch_frame(rows=40):
+    return pd.DataFrame({
+        'flight_number': np.arange(1, rows + 1, dtype='int64'),
+        'launch_site': ['CCAFS SLC 40', 'VAFB SLC 4E'] * (rows // 2),
+        'serial': [f"B{1000 + i}" for i in range(rows)], # distinct values: stays text
+        'payload_mass': np.tile([525.0, 677.0, 3136.0, 15600.0], rows // 4),
+        'longitude': np.linspace(-120.610829, -80.577366, rows),
+        'reused': pd.Series([True, False] * (rows // 2), dtype=object),
+        'legs': pd.Series([True, None] * (rows // 2), dtype=object),
+        'reused_count': pd.array([0, 1, None, 3] * (rows // 4), dtype='Int64'),
+        'class': np.tile([0, 1], rows // 2),
+    })
+
+
+def test_plan_dtypes_picks_compact_lossless_dtypes():
+    assert plan_dtypes(launch_frame()) == {
+        'launch_site': 'category',
+        'payload_mass': 'float32', # these masses are exact in float32, the longitudes are not
+        'reused': 'bool',
+        'legs': 'boolean',
+        'reused_count': 'Int8',
+        'class': 'int8',
+    }
+
+
+def test_optimize_dtypes_keeps_values_and_saves_memory(capsys):
+    df = launch_frame()
+    optimized = optimize_dtypes(df, report=True)
+
+    def as_objects(frame):
+        return frame.astype(object).where(frame.notna(), None)
+
+    pd.testing.assert_frame_equal(as_objects(optimized), as_objects(df))
+    assert optimized.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+    assert df['flight_number'].dtype == 'int64' # input left untouched
+    report = capsys.readouterr().out
+    assert 'launch_site' in report and report.splitlines()[-1].startswith('total')
+
+
+def test_plan_dtypes_widens_integers_when_needed():
+    df = pd.DataFrame({'small': [-5, 100], 'medium': [0, 40000], 'large': [0, 2**40]})
+    assert plan_dtypes(df) == {'small': 'int8', 'medium': 'int32'}
+
+
+def test_key_columns_and_written_frames_keep_integer_widths():
+    df = launch_frame()
+    assert 'flight_number' not in plan_dtypes(df)
+    plan = plan_dtypes(df, narrow_integers=False)
+    assert plan == {'launch_site': 'category', 'payload_mass': 'float32', 'reused': 'bool', 'legs': 'boolean'}
+
+
+def test_read_compact_applies_plan_to_csv(tmp_path):
+    write_artifact(launch_frame(), str(tmp_path / "launches.csv"), fmt='csv')
+    df = read_compact(str(tmp_path / "launches.csv"), columns=['launch_site', 'reused', 'class'])
+    assert isinstance(df['launch_site'].dtype, pd.CategoricalDtype)
+    assert df['reused'].dtype == 'bool'
+    assert df['class'].dtype == 'int8'
+
+
+def test_memory_report_totals():
+    df = launch_frame()
+    report = memory_report(df, optimize_dtypes(df))
+    assert len(report.splitlines()) == len(df.columns) + 2
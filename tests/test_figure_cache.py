@@ -0,0 +1,138 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+from src.eda.figure_cache import DiskFigureStore, FigureCache, SQLiteFigureStore, figure_cache_from_config
+from src.eda.launch_cube import LaunchCube
+
+
+def figure(title):
+    return go.Figure(go.Scatter(x=np.arange(3), y=[0, 1, 1]), layout={'title': title})
+
+
+class Builder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, title='launches'):
+        self.calls += 1
+        return figure(title)
+
+
+def test_repeated_views_are_served_from_memory():
+    cache, build = FigureCache(), Builder()
+    first = cache.get_or_build('scatter', 'KSC LC-39A', [0, 5000], 'v1', build)
+    first['layout']['title'] = 'changed' # callers get their own copy
+    second = cache.get_or_build('scatter', 'KSC LC-39A', (0.0, 5000.0), 'v1', build)
+    assert build.calls == 1 and second['layout']['title']['text'] == 'launches'
+    cache.get_or_build('scatter', 'KSC LC-39A', [0, 5000], 'v2', build) # new data version
+    assert build.calls == 2
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+    assert stats['hit_rate'] == pytest.approx(1 / 3)
+
+
+def test_memory_lru_is_bounded():
+    cache, build = FigureCache(max_entries=2), Builder()
+    for site in ('A', 'B', 'A', 'C', 'A', 'B'):
+        cache.get_or_build('pie', site, None, 'v1', build)
+    assert build.calls == 4 # B was evicted by C, A stayed recently used
+    assert cache.stats()['entries'] == 2
+
+
+@pytest.mark.parametrize('make_store', [lambda tmp: DiskFigureStore(str(tmp / "figures"), max_entries=2),
+                                        lambda tmp: SQLiteFigureStore(str(tmp / "figures.db"), max_entries=2)])
+def test_store_is_shared_between_workers_and_bounded(tmp_path, make_store):
+    build = Builder()
+    worker1, worker2 = FigureCache(store=make_store(tmp_path)), FigureCache(store=make_store(tmp_path))
+    built = worker1.get_or_build('pie', 'ALL', None, 'v1', build)
+    assert worker2.get_or_build('pie', 'ALL', None, 'v1', build) == built
+    assert build.calls == 1 and worker2.store_hits == 1
+    for site in ('A', 'B', 'C'):
+        worker1.get_or_build('pie', site, None, 'v1', build)
+    assert len(worker1.store) == 2
+
+
+def test_figures_of_another_code_version_are_rebuilt(tmp_path):
+    build = Builder()
+    store = SQLiteFigureStore(str(tmp_path / "figures.db"))
+    FigureCache(store=store, code_version='old').get_or_build('pie', 'ALL', None, 'v1', build)
+    upgraded = FigureCache(store=store, code_version='new') # e.g. after a restart on new dashboard code
+    upgraded.get_or_build('pie', 'ALL', None, 'v1', lambda: build('rebuilt'))
+    assert build.calls == 2 and upgraded.store_hits == 0
+
+
+def test_figure_code_version_follows_the_code(monkeypatch):
+    import plotly
+    from src.eda.dashboard import figure_code_version
+    current = figure_code_version()
+    assert figure_code_version() == current
+    monkeypatch.setattr(plotly, '__version__', '0.0.0')
+    assert figure_code_version() != current
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_sqlite_store_opens_a_new_connection_after_fork(tmp_path):
+    store = SQLiteFigureStore(str(tmp_path / "figures.db"))
+    store.put('parent', '{}')
+    parent_conn = store._conn
+    pid = os.fork()
+    if pid == 0: # child, as forked by the werkzeug server for a request
+        status = 1
+        try:
+            ok = store._conn is not parent_conn and store.get('parent') == '{}'
+            store.put('child', '{}')
+            status = 0 if ok else 1
+        finally:
+            os._exit(status) # never return into pytest from the child
+    assert os.waitpid(pid, 0)[1] == 0
+    assert store._conn is parent_conn and store.get('child') == '{}'
+
+
+def test_sqlite_reads_only_write_when_the_recency_is_stale(tmp_path):
+    store = SQLiteFigureStore(str(tmp_path / "figures.db"), touch_interval=60)
+    store.put('pie', '{}')
+
+    def used_at():
+        return store._conn.execute("SELECT used_at FROM figures").fetchone()[0]
+
+    store._conn.execute("UPDATE figures SET used_at = used_at - 10")
+    stored = used_at()
+    assert store.get('pie') == '{}' and used_at() == stored # recent enough: no write
+    store._conn.execute("UPDATE figures SET used_at = used_at - 60")
+    assert store.get('pie') == '{}' and used_at() > stored
+
+
+def test_counters_are_exact_under_concurrent_callbacks(tmp_path):
+    cache = FigureCache(max_entries=1, store=SQLiteFigureStore(str(tmp_path / "figures.db")))
+    sites = ['A', 'B', 'C'] * 100
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda site: cache.get_or_build('pie', site, None, 'v1', Builder()), sites))
+    assert cache.hits + cache.store_hits + cache.misses == len(sites)
+
+
+def test_figure_cache_from_config(tmp_path):
+    cache = figure_cache_from_config({'figure_cache_backend': 'sqlite', 'figure_cache_path': str(tmp_path / "f.db"),
+                                      'figure_cache_max_entries': 10})
+    assert isinstance(cache.store, SQLiteFigureStore) and cache.max_entries == 10
+    with pytest.raises(ValueError):
+        figure_cache_from_config({'figure_cache_backend': 'redis'})
+
+
+def test_dashboard_serves_cached_figures_and_stats():
+    from src.eda.dashboard import create_app
+    cube = LaunchCube(pd.DataFrame({'launch_site': ['A', 'B', 'A'], 'payload_mass': [100.0, 2000.0, 5000.0],
+                                    'class': [0, 1, 1], 'booster_version': ['v1', 'v1', 'B5']}))
+    cache = FigureCache()
+    app = create_app(cube, cache)
+    client = app.server.test_client()
+    body = {'output': 'success-pie-chart.figure', 'outputs': {'id': 'success-pie-chart', 'property': 'figure'},
+            'inputs': [{'id': 'site-dropdown', 'property': 'value', 'value': 'A'},
+                       {'id': 'data-version', 'property': 'data', 'value': cube.version}], 'changedPropIds': []}
+    for _ in range(3):
+        assert client.post('/_dash-update-component', json=body).status_code == 200
+    stats = json.loads(client.get('/_figure_cache').data)
+    assert (stats['misses'], stats['hits']) == (1, 2)
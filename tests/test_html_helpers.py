@@ -1,11 +1,39 @@
 # tests/test_html_helpers.py
 
+import json
+import os
+
 import pytest
 from bs4 import BeautifulSoup
-from src.collect_web import extract_column_name_from_header, extract_table_headers, fetch_html
+from src.collect_web import (
+    extract_column_name_from_header,
+    extract_table_headers,
+    extract_table_headers_lxml,
+    fetch_html,
+    parse_html_lxml,
+    parse_page,
+    scrape_pages,
+)
+from src.utils.instrumentation import Metrics
+from src.utils.table_store import TableStore
+
+WIKIPEDIA_PAGE = """
+<html>
+    <head><title>List of Falcon 9 and Falcon Heavy launches - Wikipedia</title></head>
+    <body>
+        <table><tr><td>Contents</td></tr></table>
+        <table><tr><td>Rocket configurations</td></tr></table>
+        <table class="wikitable">
+            <tr><th>Flight No.</th><th>Date and time (<a href="#">UTC</a>)</th><th>Launch site</th></tr>
+        </table>
+    </body>
+</html>
+"""
+
 
-def test_soup_title():
+def test_soup_title(offline_cache):
     url = "https://en.wikipedia.org/wiki/List_of_Falcon_9_and_Falcon_Heavy_launches"
+    offline_cache.store("GET", url, WIKIPEDIA_PAGE.encode(), encoding="utf-8")
     html = fetch_html(url)
     _, soup = extract_table_headers(html, return_soup=True)
     print(soup.title.string) # to check
@@ -58,3 +86,84 @@ def test_extract_table_headers_with_return_soup():
     assert headers == ["Foo", "Bar"]
     assert isinstance(soup, BeautifulSoup)
 
+
+FIXTURE_PAGE = os.path.join(os.path.dirname(__file__), "fixtures", "falcon9_launches.html")
+
+
+@pytest.fixture
+def launch_page():
+    with open(FIXTURE_PAGE, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_lxml_headers_match_beautifulsoup(launch_page):
+    tree = parse_html_lxml(launch_page)
+    assert extract_table_headers_lxml(tree) == extract_table_headers(launch_page)
+
+
+def test_parser_backends_extract_the_same_records(launch_page):
+    lxml_dict = parse_page(launch_page, backend="lxml")
+    bs4_dict = parse_page(launch_page, backend="bs4")
+    assert lxml_dict == bs4_dict
+    assert lxml_dict["Flight No."] == ["1", "2", "3", "4", "5"]
+    assert lxml_dict["Payload mass"] == ["0 kg", "525 kg", "525 kg", "4,877 kg", "500 kg"]
+    assert lxml_dict["Booster landing"][2] == "No attempt"
+
+
+def test_parse_page_rejects_unknown_backend(launch_page):
+    with pytest.raises(ValueError):
+        parse_page(launch_page, backend="regex")
+
+
+def test_scrape_pages_concatenates_pages_in_order(offline_cache, launch_page):
+    urls = [f"https://en.wikipedia.org/wiki/Launches_{i}" for i in range(3)]
+    pages = [launch_page.replace(">1</th>", f">{i}1</th>") for i in range(3)]
+    for url, page in zip(urls, pages):
+        offline_cache.store("GET", url, page.encode(), encoding="utf-8")
+    df = scrape_pages(urls, max_workers=2)
+    assert list(df["Flight No."][::5]) == ["01", "11", "21"]
+    assert len(df) == 15
+
+
+def test_backends_count_skipped_rows_alike(launch_page):
+    counters = {}
+    for backend in ("lxml", "bs4"):
+        metrics = Metrics()
+        parse_page(launch_page, backend=backend, metrics=metrics)
+        counters[backend] = json.loads(metrics.summary(as_json=True))["counters"]
+    assert counters["lxml"]["rows_skipped"] == counters["bs4"]["rows_skipped"] > 0
+
+
+def test_scrape_pages_without_urls_is_empty():
+    assert scrape_pages([]).empty
+
+
+def test_parse_page_records_counters_and_timers(launch_page):
+    metrics = Metrics()
+    parse_page(launch_page, backend="lxml", metrics=metrics)
+    parse_page(launch_page, backend="bs4", metrics=metrics)
+    summary = json.loads(metrics.summary(as_json=True))
+    assert summary["counters"]["rows_parsed"] == 10
+    assert summary["counters"]["pages_parsed"] == 2
+    assert summary["counters"]["tables_parsed"] == 2 + 5
+    assert summary["timers"]["parse_page"]["count"] == 2
+    worker = Metrics()
+    worker.merge(metrics.snapshot())
+    assert worker.summary() == metrics.summary()
+
+
+@pytest.mark.parametrize("backend", ["lxml", "bs4"])
+def test_unchanged_tables_are_read_from_the_table_store(tmp_path, launch_page, backend):
+    store = TableStore(str(tmp_path))
+    first = Metrics()
+    expected = parse_page(launch_page, backend=backend, metrics=first, store=store)
+    assert "tables_reused" not in first.counters
+
+    # a new launch in the second table: only that table is parsed again
+    updated_page = launch_page.replace(">29 September 2013,", ">30 September 2013,")
+    second = Metrics()
+    launch_dict = parse_page(updated_page, backend=backend, metrics=second, store=store)
+    assert second.counters["tables_parsed"] == 1
+    assert second.counters["rows_reused"] == 3
+    assert launch_dict["Date"][-1] == "30 September 2013"
+    assert launch_dict["Flight No."] == expected["Flight No."]
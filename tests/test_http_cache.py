@@ -0,0 +1,79 @@
+# tests/test_http_cache.py
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from src.utils.http_cache import OfflineCacheMiss, ResponseCache
+
+
+class EtagHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        EtagHandler.requests_seen.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f"page {self.path}".encode()
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(('127.0.0.1', 0), EtagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    EtagHandler.requests_seen = []
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_fresh_responses_are_served_from_disk(tmp_path, server_url):
+    cache = ResponseCache(cache_dir=str(tmp_path))
+    assert cache.get(f"{server_url}/a").text == "page /a"
+    response = ResponseCache(cache_dir=str(tmp_path)).get(f"{server_url}/a")
+    assert response.from_cache and response.text == "page /a"
+    assert len(EtagHandler.requests_seen) == 1
+
+
+def test_stale_responses_are_revalidated_with_etag(tmp_path, server_url):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=0)
+    cache.get(f"{server_url}/a")
+    response = cache.get(f"{server_url}/a")
+    assert EtagHandler.requests_seen == [None, '"v1"']
+    assert response.from_cache and response.text == "page /a"
+
+
+def test_request_body_is_part_of_the_key():
+    assert ResponseCache.key("POST", "u", {"page": 1}) != ResponseCache.key("POST", "u", {"page": 2})
+    assert ResponseCache.key("POST", "u", {"a": 1, "b": 2}) == ResponseCache.key("POST", "u", {"b": 2, "a": 1})
+
+
+def test_lru_eviction_keeps_cache_under_max_bytes(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), max_bytes=25, offline=True)
+    cache.store("GET", "u1", b"x" * 10)
+    cache.store("GET", "u2", b"x" * 10)
+    os.utime(os.path.join(str(tmp_path), ResponseCache.key("GET", "u1") + ".body"), (0, 0))
+    cache.get("u2")
+    cache.store("GET", "u3", b"x" * 10)
+    assert cache.get("u2").content == b"x" * 10
+    assert cache.get("u3").content == b"x" * 10
+    with pytest.raises(OfflineCacheMiss):
+        cache.get("u1")
+
+
+def test_offline_mode_never_uses_the_network(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=0, offline=True)
+    cache.store("GET", "https://example.invalid/page", b"cached")
+    assert cache.get("https://example.invalid/page").text == "cached"
+    with pytest.raises(OfflineCacheMiss):
+        cache.get("https://example.invalid/other")
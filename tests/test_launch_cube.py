@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+from src.eda.launch_cube import ALL_SITES, LaunchCube
+
+
+@pytest.fixture
+def launches(launches):
+    return launches(500, boosters=['v1.0', 'v1.1', 'FT', 'B4', 'B5'], max_payload=9800.0, missing_payload=0.1,
+                    launch_site=lambda df: pd.Categorical(df['launch_site']),
+                    payload_mass=lambda df: df['payload_mass'].astype('float32'))
+
+
+def test_counts_match_groupby(launches):
+    cube = LaunchCube(launches)
+    assert cube.sites == ['CCAFS LC-40', 'KSC LC-39A', 'VAFB SLC-4E']
+    expected = launches.groupby('launch_site')['class'].sum()
+    assert cube.success_counts_by_site().tolist() == expected.tolist()
+    for site in cube.sites:
+        counts = launches.loc[launches['launch_site'] == site, 'class'].value_counts()
+        assert cube.outcome_counts(site).tolist() == [counts.get(0, 0), counts.get(1, 0)]
+
+
+def test_cells_cover_payload_bins(launches):
+    cube = LaunchCube(launches)
+    assert cube.counts.shape == (3, len(cube.bin_edges) + 1, 2) and cube.counts.sum() == len(launches)
+    site, bin = 1, 4 # KSC LC-39A, 4000 <= payload < 5000
+    rows = cube.rows.iloc[cube.cell_start[site, bin]:cube.cell_stop[site, bin]]
+    in_cell = launches[(launches['launch_site'] == 'KSC LC-39A') & (launches['payload_mass'] >= 4000)
+                       & (launches['payload_mass'] < 5000)]
+    assert len(rows) == len(in_cell) and rows['class'].sum() == cube.counts[site, bin, 1]
+    assert cube.counts[:, -1].sum() == launches['payload_mass'].isna().sum() # launches without payload
+
+
+@pytest.mark.parametrize('site', [ALL_SITES, 'CCAFS LC-40', 'VAFB SLC-4E'])
+@pytest.mark.parametrize('low, high', [(0, 10000), (2000, 5000), (3141.5, 3141.5), (9900, 10000)])
+def test_select_matches_filter(launches, site, low, high):
+    expected = launches[launches['payload_mass'].between(low, high)]
+    if site != ALL_SITES:
+        expected = expected[expected['launch_site'] == site]
+    selected = LaunchCube(launches).select(site, low, high)
+    assert selected['payload_mass'].is_monotonic_increasing
+    pd.testing.assert_frame_equal(
+        selected.sort_values(['payload_mass', 'launch_site', 'booster_version', 'class'], ignore_index=True),
+        expected.sort_values(['payload_mass', 'launch_site', 'booster_version', 'class'], ignore_index=True))
+
+
+def test_site_scatter_only_shows_the_site(launches):
+    from src.eda.dashboard import scatter_figure
+    cube = LaunchCube(launches)
+    figure = scatter_figure(cube, 'KSC LC-39A', [0, 10000])
+    points = sum(len(trace.x) for trace in figure.data)
+    assert points == ((launches['launch_site'] == 'KSC LC-39A') & launches['payload_mass'].notna()).sum()
+
+
+def test_launches_without_site_are_left_out_everywhere():
+    df = pd.DataFrame({'launch_site': ['CCAFS LC-40', None, 'KSC LC-39A'], 'payload_mass': [500.0, 600.0, 700.0],
+                       'class': [1, 1, 0], 'booster_version': ['FT', 'FT', 'B5']})
+    cube = LaunchCube(df)
+    assert len(cube.select(ALL_SITES, 0, 10000)) == cube.counts.sum() == 2 # the ALL scatter and pie agree
+    assert cube.success_counts_by_site().tolist() == [1, 0]
+    assert len(cube.by_payload) == len(cube.rows) == 2
@@ -0,0 +1,144 @@
+import time
+import pandas as pd
+import pytest
+from src.eda.dashboard import DASHBOARD_COLUMNS, create_app
+from src.eda.figure_cache import FigureCache
+from src.eda.live_reload import LiveCube, artifact_source, sqlite_source
+from src.utils.artifacts import write_artifact
+from src.utils.create_db_from_csv import connect_for_write, load_launches
+
+
+@pytest.fixture
+def launches(launches):
+    def make(extra=0):
+        """Four launches of two sites, plus `extra` heavy KSC LC-39A launches."""
+        df = launches(4, sites=['CCAFS LC-40', 'KSC LC-39A'], seed=None)
+        new = pd.DataFrame({'flight_number': range(5, 5 + extra), 'launch_site': 'KSC LC-39A', 'booster_version': 'B5',
+                            'orbit': 'LEO', 'payload_mass': 12500.0, 'class': 1})
+        return pd.concat([df, new], ignore_index=True) if extra else df
+    return make
+
+
+@pytest.fixture
+def data_path(tmp_path, launches):
+    path = str(tmp_path / "launches.parquet")
+    write_artifact(launches(), path)
+    return path
+
+
+def test_reload_swaps_the_cube_and_reports_changed_sites(data_path, launches):
+    live = LiveCube(*artifact_source(data_path, columns=DASHBOARD_COLUMNS))
+    first = live.cube
+    assert live.reload_if_changed() == []
+    write_artifact(launches(extra=2), data_path)
+    assert live.reload_if_changed() == ['KSC LC-39A', 'ALL']
+    assert len(live.cube.rows) == 6 and live.cube is not first
+    assert live.cube.site_versions['CCAFS LC-40'] == first.site_versions['CCAFS LC-40']
+
+
+def test_failed_reload_keeps_the_current_cube(data_path, monkeypatch, launches):
+    load, signature = artifact_source(data_path, columns=DASHBOARD_COLUMNS)
+    live = LiveCube(load, signature, cube=load())
+    cube = live.cube
+    live._load = lambda: pd.read_parquet("missing.parquet")
+    write_artifact(launches(extra=1), data_path)
+    assert live.reload_if_changed() == [] and live.cube is cube
+
+
+def test_background_watcher_picks_up_new_launches(data_path, launches):
+    live = LiveCube(*artifact_source(data_path, columns=DASHBOARD_COLUMNS), interval=0.02).start()
+    try:
+        write_artifact(launches(extra=1), data_path)
+        deadline = time.time() + 5
+        while live.reloads == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        assert len(live.cube.rows) == 5
+    finally:
+        live.stop()
+
+
+def test_sqlite_source_follows_upserts(tmp_path, launches):
+    db_path = str(tmp_path / "SpaceX.db")
+    conn = connect_for_write(db_path)
+    load_launches(conn, launches())
+    live = LiveCube(*sqlite_source(db_path, DASHBOARD_COLUMNS))
+    assert live.reload_if_changed() == []
+    load_launches(conn, launches(extra=1), mode='upsert')
+    conn.close()
+    assert live.reload_if_changed() == ['KSC LC-39A', 'ALL'] and len(live.cube.rows) == 5
+
+
+def callback(client, outputs, inputs, state=()):
+    """POST a callback request as the Dash front end does; outputs, inputs and state are (id, property[, value])."""
+    names = [f"{id}.{property}" for id, property in outputs]
+    specs = [{'id': id, 'property': property} for id, property in outputs]
+    body = {'output': names[0] if len(names) == 1 else '..' + '...'.join(names) + '..',
+            'outputs': specs[0] if len(specs) == 1 else specs,
+            'inputs': [{'id': id, 'property': property, 'value': value} for id, property, value in inputs],
+            'state': [{'id': id, 'property': property, 'value': value} for id, property, value in state],
+            'changedPropIds': []}
+    return client.post('/_dash-update-component', json=body)
+
+
+CONTROLS = [('data-version', 'data'), ('site-dropdown', 'options'), ('payload-slider', 'max'),
+            ('payload-slider', 'marks'), ('site-dropdown', 'value'), ('payload-bounds', 'data'),
+            ('payload-slider', 'value')]
+
+
+def refresh_controls(client, version, site='KSC LC-39A', bounds=(500, 2000), payload_range=(500, 2000)):
+    """Reload check of a page showing `version` of the data, the launches of 500-2000 kg of the fixture."""
+    return callback(client, CONTROLS, [('reload-interval', 'n_intervals', 1)],
+                    [('data-version', 'data', version), ('site-dropdown', 'value', site),
+                     ('payload-bounds', 'data', list(bounds)), ('payload-slider', 'value', list(payload_range))])
+
+
+def test_dashboard_refreshes_controls_and_only_rebuilds_changed_figures(data_path, launches):
+    live = LiveCube(*artifact_source(data_path, columns=DASHBOARD_COLUMNS))
+    cache = FigureCache()
+    client = create_app(live, cache).server.test_client()
+    version = live.cube.version
+    assert refresh_controls(client, version).status_code == 204 # nothing changed
+
+    def pie(site):
+        return callback(client, [('success-pie-chart', 'figure')],
+                        [('site-dropdown', 'value', site), ('data-version', 'data', live.cube.version)])
+
+    pie('CCAFS LC-40'), pie('KSC LC-39A')
+    write_artifact(launches(extra=1), data_path)
+    live.reload_if_changed()
+    response = refresh_controls(client, version).get_json()['response']
+    assert response['data-version']['data'] == live.cube.version
+    assert response['payload-slider']['max'] == 13000
+    assert response['payload-slider']['value'] == [500, 12500] # was at the bounds: widened to the new launches
+    assert response['payload-bounds']['data'] == [500, 12500]
+    assert 'value' not in response['site-dropdown'] # the selected site is still there
+    pie('CCAFS LC-40'), pie('KSC LC-39A')
+    assert (cache.hits, cache.misses) == (1, 3) # only the changed site was rebuilt
+
+
+def test_dashboard_falls_back_to_all_sites_when_the_selected_site_is_gone(data_path, launches):
+    live = LiveCube(*artifact_source(data_path, columns=DASHBOARD_COLUMNS))
+    client = create_app(live, FigureCache()).server.test_client()
+    version = live.cube.version
+    data = launches()
+    write_artifact(data[data['launch_site'] != 'KSC LC-39A'], data_path)
+    live.reload_if_changed()
+    response = refresh_controls(client, version).get_json()['response']
+    assert response['site-dropdown']['value'] == 'ALL'
+    # callbacks fired with the stale value (e.g. before the dropdown update) show all sites instead of failing
+    for output in (('success-pie-chart', 'figure'), ('scatter-figure', 'data')):
+        response = callback(client, [output], [('site-dropdown', 'value', 'KSC LC-39A'),
+                                               ('data-version', 'data', live.cube.version)])
+        assert response.status_code == 200
+
+
+def test_dashboard_keeps_a_narrowed_payload_range(data_path, launches):
+    live = LiveCube(*artifact_source(data_path, columns=DASHBOARD_COLUMNS))
+    client = create_app(live, FigureCache()).server.test_client()
+    version = live.cube.version
+    write_artifact(launches(extra=1), data_path)
+    live.reload_if_changed()
+    response = refresh_controls(client, version, payload_range=(1000, 1500)).get_json()['response']
+    assert 'value' not in response['payload-slider']
+    response = refresh_controls(client, version, payload_range=(1000, 2000)).get_json()['response']
+    assert response['payload-slider']['value'] == [1000, 12500] # only the end at the old bound follows
@@ -0,0 +1,123 @@
+import functools
+import json
+import shutil
+import subprocess
+import numpy as np
+import pytest
+from src.eda import dashboard
+from src.eda.dashboard import FILTER_SCATTER_JS, bin_launches, create_app, scatter_figure
+from src.eda.figure_cache import FigureCache
+from src.eda.launch_cube import LaunchCube
+
+
+@pytest.fixture
+def launches(launches):
+    return functools.partial(launches, sites=['CCAFS LC-40', 'KSC LC-39A'])
+
+
+def test_small_scatter_keeps_svg_points(launches):
+    figure = scatter_figure(LaunchCube(launches(200)), 'ALL', (0, 10000))
+    assert {trace.type for trace in figure.data} == {'scatter'}
+    assert sum(len(trace.x) for trace in figure.data) == 200
+
+
+def test_large_scatter_uses_webgl(launches, monkeypatch):
+    monkeypatch.setattr(dashboard, 'WEBGL_THRESHOLD', 100)
+    figure = scatter_figure(LaunchCube(launches(200)), 'ALL', (0, 10000))
+    assert {trace.type for trace in figure.data} == {'scattergl'}
+    assert sum(len(trace.x) for trace in figure.data) == 200
+
+
+def test_very_large_scatter_is_binned(launches):
+    data = launches(dashboard.MAX_SCATTER_POINTS * 4)
+    figure = scatter_figure(LaunchCube(data), 'KSC LC-39A', (1000, 8000))
+    selected = data[(data['launch_site'] == 'KSC LC-39A') & data['payload_mass'].between(1000, 8000)]
+    points = sum(len(trace.x) for trace in figure.data)
+    assert points <= dashboard.MAX_SCATTER_POINTS
+    assert sum(trace.marker.size.sum() for trace in figure.data) == len(selected)
+    assert {trace.type for trace in figure.data} == {'scattergl'}
+    assert figure.layout.title.text.endswith("(binned)") # no launch count: the slider filters the points
+
+
+def test_binned_scatter_stays_within_the_point_budget_with_many_boosters(launches):
+    data = launches(dashboard.MAX_SCATTER_POINTS * 10, boosters=[f"B{1000 + i}" for i in range(400)])
+    figure = scatter_figure(LaunchCube(data), 'ALL', (0, 10000))
+    assert sum(len(trace.x) for trace in figure.data) <= dashboard.MAX_SCATTER_POINTS
+    assert sum(trace.marker.size.sum() for trace in figure.data) == len(data)
+    assert len(figure.data) == dashboard.SCATTER_BOOSTERS + 1
+    assert dashboard.OTHER_BOOSTERS in {trace.name for trace in figure.data}
+
+
+def test_bin_launches_folds_the_least_launched_boosters(launches):
+    data = launches(1000, boosters=['B1', 'B2', 'B3', 'B4'], seed=None) # last 100: 25 of each
+    data.loc[:599, 'booster_version'] = 'B1'
+    data.loc[600:899, 'booster_version'] = 'B2'
+    points = bin_launches(data, bins=50, max_points=40, max_boosters=2)
+    assert len(points) <= 36 # 3 booster groups x 2 outcomes: 6 bins
+    assert points.groupby('booster_version', observed=True)['launches'].sum().to_dict() == \
+        {'B1': 625, 'B2': 325, dashboard.OTHER_BOOSTERS: 50}
+
+
+def test_bin_launches_counts_and_spreads_boosters(launches):
+    data = launches(1000)
+    points = bin_launches(data, bins=10, jitter=0.3)
+    assert points['launches'].sum() == 1000
+    assert points.groupby(['booster_version', 'class'], observed=True)['launches'].sum().to_dict() == \
+        data.groupby(['booster_version', 'class'])['class'].size().to_dict()
+    assert (points['outcome'] - points['class']).abs().max() == pytest.approx(0.15)
+    assert points['payload_mass'].between(data['payload_mass'].min(), data['payload_mass'].max()).all()
+
+
+def run_filter(figure, payload_range):
+    """FILTER_SCATTER_JS run by node on the JSON of a figure, as in the browser."""
+    script = f"""
+        global.atob = (data) => Buffer.from(data, 'base64').toString('binary');
+        global.window = {{dash_clientside: {{no_update: null}}}};
+        const filter = {FILTER_SCATTER_JS};
+        const figure = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+        process.stdout.write(JSON.stringify(filter(figure, {json.dumps(payload_range)})));
+    """
+    result = subprocess.run(['node', '-e', script], input=figure.to_json(), capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node is not installed")
+def test_clientside_filter_keeps_points_in_the_slider_range(launches):
+    figure = scatter_figure(LaunchCube(launches(300)), 'ALL', (0, 10000))
+    filtered = run_filter(figure, [2000, 5000])
+    expected = {trace.name: sorted(x for x in trace.x if 2000 <= x <= 5000) for trace in figure.data}
+    assert {trace['name']: sorted(trace['x']) for trace in filtered['data']} == pytest.approx(expected)
+    assert all(len(trace['x']) == len(trace['y']) for trace in filtered['data'])
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node is not installed")
+def test_clientside_filter_keeps_the_hover_data_of_binned_points(launches):
+    figure = scatter_figure(LaunchCube(launches(dashboard.MAX_SCATTER_POINTS * 2)), 'ALL', (0, 10000))
+    for payload_range in ([0, 10000], [2000, 5000]):
+        filtered = run_filter(figure, payload_range)
+        for trace, source in zip(filtered['data'], figure.data):
+            keep = (source.x >= payload_range[0]) & (source.x <= payload_range[1])
+            # customdata holds one [class, launches] row per point
+            assert trace['customdata'] == np.asarray(source.customdata)[keep].tolist()
+            assert trace['marker']['size'] == source.marker.size[keep].tolist()
+            assert trace['x'] == pytest.approx(source.x[keep].tolist())
+
+
+def test_scatter_callback_sends_the_whole_site_once(launches):
+    from tests.test_live_reload import callback
+    data = launches(300)
+    cache = FigureCache()
+    client = create_app(LaunchCube(data), cache).server.test_client()
+    cube = LaunchCube(data)
+
+    def request(site):
+        return callback(client, [('scatter-figure', 'data')],
+                        [('site-dropdown', 'value', site), ('data-version', 'data', cube.version)])
+
+    response = request('KSC LC-39A')
+    assert response.status_code == 200
+    figure = response.get_json()['response']['scatter-figure']['data']
+    assert sum(len(trace['x']['bdata']) > 0 for trace in figure['data']) == len(figure['data'])
+    assert len(figure['data']) == data.loc[data['launch_site'] == 'KSC LC-39A', 'booster_version'].nunique()
+    request('KSC LC-39A')
+    assert (cache.hits, cache.misses) == (1, 1)
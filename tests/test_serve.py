@@ -0,0 +1,95 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.eda import serve
+from src.eda.launch_cube import LaunchCube, current_cube_path, publish_cube
+from src.eda.live_reload import LiveCube, cube_dir_source
+from src.eda.serve import CUBE_ENV, create_wsgi_app, cube_publisher, prepare_cube
+from src.utils.artifacts import write_artifact
+
+
+def as_text(series):
+    return series.astype(object).fillna('?').tolist()
+
+
+def memory_mapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array is not None
+
+
+@pytest.fixture
+def cube(launches):
+    return LaunchCube(launches(300, sites=['CCAFS LC-40', 'KSC LC-39A'], boosters=['v1.1', 'FT', None],
+                               launch_site=lambda df: pd.Categorical(df['launch_site']),
+                               payload_mass=lambda df: df['payload_mass'].astype('float32')))
+
+
+def test_saved_cube_is_attached_as_memory_maps(cube, tmp_path):
+    path = cube.save(str(tmp_path))
+    assert cube.save(str(tmp_path)) == path # saved once per data version
+    attached = LaunchCube.load(path)
+    assert attached.version == cube.version and attached.sites == cube.sites
+    assert memory_mapped(attached.counts)
+    for column in ('payload_mass', 'class'):
+        assert memory_mapped(attached.rows[column].to_numpy())
+    assert memory_mapped(attached.rows['booster_version'].array.codes) # text columns: categorical codes
+    for site in ('ALL', 'KSC LC-39A'):
+        expected = cube.select(site, 1000, 4000)
+        selected = attached.select(site, 1000, 4000)
+        assert selected['payload_mass'].tolist() == expected['payload_mass'].tolist()
+        assert as_text(selected['booster_version']) == as_text(expected['booster_version'])
+
+
+def test_wsgi_app_factory_attaches_the_cube(cube, tmp_path, monkeypatch):
+    publish_cube(cube, str(tmp_path / "cubes"))
+    monkeypatch.setenv(CUBE_ENV, str(tmp_path / "cubes"))
+    server = create_wsgi_app(config={'figure_cache_backend': 'sqlite', 'figure_cache_path': str(tmp_path / "f.db")})
+    client = server.test_client()
+    layout = client.get('/_dash-layout').get_json()
+    assert 'KSC LC-39A' in str(layout)
+    assert client.get('/_figure_cache').get_json()['store'] == 'SQLiteFigureStore'
+
+
+def test_wsgi_app_factory_needs_a_cube(monkeypatch):
+    monkeypatch.delenv(CUBE_ENV, raising=False)
+    with pytest.raises(RuntimeError):
+        create_wsgi_app(config={})
+
+
+def test_workers_attach_published_cubes_without_building_them(cube, launches, tmp_path, monkeypatch):
+    cube_dir = str(tmp_path / "cubes")
+    publish_cube(cube, cube_dir)
+    monkeypatch.setattr(LaunchCube, '__init__', None) # workers never build a cube
+    live = LiveCube(*cube_dir_source(cube_dir))
+    assert live.cube.version == cube.version and memory_mapped(live.cube.counts)
+    assert live.reload_if_changed() == []
+    monkeypatch.undo()
+    newer = LaunchCube(launches(50, seed=1))
+    publish_cube(newer, cube_dir) # by the watcher process
+    monkeypatch.setattr(LaunchCube, '__init__', None)
+    assert 'ALL' in live.reload_if_changed()
+    assert live.cube.version == newer.version and live.cube.path == current_cube_path(cube_dir)
+
+
+def test_several_workers_need_gunicorn(monkeypatch):
+    monkeypatch.setattr(serve, 'gunicorn_available', lambda: False)
+    with pytest.raises(RuntimeError, match='gunicorn'):
+        serve.serve(4)
+
+
+def test_superseded_cubes_are_deleted_after_the_swap(launches, tmp_path):
+    data_path, cube_dir = str(tmp_path / "launches.parquet"), str(tmp_path / "cubes")
+    write_artifact(launches(50, seed=1), data_path)
+    prepare_cube(data_path, cube_dir)
+    write_artifact(launches(60, seed=2), data_path)
+    prepare_cube(data_path, cube_dir) # the cube of the previous run is deleted
+    os.makedirs(os.path.join(cube_dir, "abc.123.tmp")) # being saved by another process
+    worker = LiveCube(*cube_dir_source(cube_dir))
+    publisher = cube_publisher(data_path, cube_dir)
+    write_artifact(launches(70, seed=3), data_path)
+    assert 'ALL' in publisher.reload_if_changed()
+    assert sorted(os.listdir(cube_dir)) == sorted([publisher.cube.version, "abc.123.tmp", "current"])
+    assert worker.cube.select('ALL', 0, 10000).shape[0] == 60 # still attached to the deleted cube
+    assert 'ALL' in worker.reload_if_changed() and len(worker.cube.rows) == 70
@@ -0,0 +1,119 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pytest
+from src.eda import sql_queries
+from src.eda.sql_queries import QueryService, run_query
+from src.utils.create_db_from_csv import connect_for_write, load_launches
+
+
+@pytest.fixture
+def launches(launches):
+    def make(rows=6):
+        return launches(rows, sites=['CCAFS SLC 40', 'VAFB SLC 4E', 'KSC LC 39A'],
+                        boosters=['F9 v1.0', 'F9 B5', 'F9 FT'], seed=None)
+    return make
+
+
+def build_database(path, df):
+    conn = connect_for_write(str(path))
+    try:
+        load_launches(conn, df)
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def database(tmp_path, launches):
+    path = tmp_path / "SpaceX.db"
+    build_database(path, launches())
+    return str(path)
+
+
+def test_payload_range_query_binds_parameters(database):
+    sql, params = sql_queries.get_success_rate_by_payload_range(1000, 2000.5)
+    assert '?' in sql and params == (1000.0, 2000.5)
+    df = run_query(database, (sql, params))
+    assert df['payload_mass'].tolist() == [1000.0, 1500.0, 2000.0]
+
+
+def test_repeated_queries_are_served_from_cache(database):
+    service = QueryService(database)
+    first = service.query(sql_queries.get_total_payload_by_site())
+    first.loc[0, 'total_payload'] = -1 # callers get copies
+    second = service.query(sql_queries.get_total_payload_by_site())
+    assert (service.hits, service.misses) == (1, 1)
+    assert (second['total_payload'] > 0).all()
+    service.close()
+
+
+def test_cache_is_invalidated_by_writes(database, launches):
+    service = QueryService(database)
+    assert service.query("SELECT COUNT(*) AS n FROM SPACEXTBL")['n'][0] == 6
+    conn = connect_for_write(database)
+    load_launches(conn, launches().assign(flight_number=lambda df: df['flight_number'] + 10), mode='upsert')
+    conn.close()
+    assert service.query("SELECT COUNT(*) AS n FROM SPACEXTBL")['n'][0] == 12
+    assert service.misses == 2
+    service.close()
+
+
+def test_replaced_database_file_is_reopened(database, tmp_path, launches):
+    service = QueryService(database)
+    assert service.query("SELECT COUNT(*) AS n FROM SPACEXTBL")['n'][0] == 6
+    build_database(tmp_path / "new.db", launches(3))
+    os.replace(tmp_path / "new.db", database)
+    assert service.query("SELECT COUNT(*) AS n FROM SPACEXTBL")['n'][0] == 3
+    service.close()
+
+
+def test_pool_is_bounded_and_thread_safe(database):
+    service = QueryService(database, pool_size=2, cache_size=0)
+    queries = [sql_queries.get_success_rate_by_payload_range(0, 500 * (i % 6 + 1)) for i in range(40)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sizes = list(executor.map(lambda query: len(service.query(query)), queries))
+    assert sizes == [i % 6 + 1 for i in range(40)]
+    assert service._opened <= 2
+    service.close()
+
+
+def test_connections_are_read_only(database):
+    service = QueryService(database)
+    with pytest.raises((sqlite3.OperationalError, pd.errors.DatabaseError)):
+        service.query("DELETE FROM SPACEXTBL")
+    service.close()
+
+
+def test_aggregates_read_the_summary_tables(database):
+    service = QueryService(database)
+    by_site = service.query(sql_queries.get_avg_success_by_site())
+    expected = service.query("SELECT launch_site, AVG(class) AS success_rate FROM SPACEXTBL "
+                             "GROUP BY launch_site ORDER BY success_rate DESC")
+    pd.testing.assert_frame_equal(by_site.sort_values('launch_site', ignore_index=True),
+                                  expected.sort_values('launch_site', ignore_index=True))
+    assert service.query(sql_queries.get_max_payload_site()).values.tolist() == [['KSC LC 39A', 3000.0]]
+    assert service.query(sql_queries.get_payload_histogram())['launches'].tolist() == [1, 2, 2, 1]
+    plan = service.query("EXPLAIN QUERY PLAN " + sql_queries.get_total_payload_by_site())
+    assert 'SPACEXTBL_by_launch_site' in ' '.join(plan['detail']) and 'SCAN SPACEXTBL ' not in ' '.join(plan['detail'])
+    service.close()
+
+
+def test_profile_reports_plan_timing_and_cache(database):
+    service = QueryService(database)
+    _, first = service.query(sql_queries.get_unique_boosters(), profile=True)
+    df, second = service.query(sql_queries.get_unique_boosters(), profile=True)
+    assert (first.cache, second.cache) == ('miss', 'hit')
+    assert second.rows == len(df) == 3 and first.seconds > 0
+    assert first.full_scans == ['SPACEXTBL'] # DISTINCT reads the whole booster_version index
+    _, ranged = service.query(sql_queries.get_success_rate_by_payload_range(1000, 2000), profile=True)
+    assert ranged.full_scans == [] and 'idx_SPACEXTBL_payload_mass' in ranged.plan[0]
+    service.close()
+
+
+def test_sql_bench_compares_databases(database):
+    from src.eda.sql_bench import BENCH_QUERIES, run_bench
+    table = run_bench(sizes=[300], db_paths=[database], repeat=1)
+    assert len(table) == 2 * len(BENCH_QUERIES)
+    assert set(table.loc[table['full scan'] == 'yes', 'query']) == {'all_launches', 'unique_boosters'}
+    assert (table['cache'] == 'miss / hit').all()